@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+boto3 클라이언트 풀 효과 측정
+
+여러 계정(프로필) x 리전을 조회하는 작업을 여러 번 반복하면서 다음 두 방식을 비교한다.
+
+    naive  매번 boto3.Session() 과 session.client() 를 새로 만든다 (이전 방식)
+    pool   bssm.clients.ClientPool 로 세션/클라이언트와 HTTP 연결을 재사용한다
+
+조회 한 번은 SSM 페이지 1회 + describe_instances 를 동시에 --workers 개 호출한다.
+항목별로 전체 시간, 클라이언트 생성 시간, 새로 맺은 HTTP 연결 수를 출력한다.
+가짜 엔드포인트는 HTTP 이므로 연결 수는 실제 AWS(HTTPS)에서 TLS 핸드셰이크 수와 같다.
+
+사용법:
+    python benchmarks/clients.py [--profiles 4] [--regions 4] [--rounds 3] [--workers 16]
+                                 [--latency-ms 5] [--output clients-report.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Dict
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(BENCH_DIR.parent / 'src'))
+
+from fleet import generate_fleet, REGIONS  # noqa: E402
+from fake_aws import FakeAWS  # noqa: E402
+
+class ConnectionCounter(logging.Handler):
+    """urllib3 가 새 연결을 맺을 때 남기는 로그 수 세기"""
+
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.count = 0
+
+    def emit(self, record):
+        if record.getMessage().startswith('Starting new HTTP'):
+            self.count += 1
+
+def _write_profiles(home: Path, count: int) -> List[str]:
+    """가짜 자격증명으로 프로필 count 개 생성"""
+    aws_dir = home / '.aws'
+    aws_dir.mkdir(parents=True, exist_ok=True)
+    profiles = [f"bench{i}" for i in range(count)]
+    (aws_dir / 'config').write_text(''.join(f"[profile {p}]\nregion = us-east-1\n" for p in profiles))
+    (aws_dir / 'credentials').write_text(''.join(
+        f"[{p}]\naws_access_key_id = bench{p}\naws_secret_access_key = bench\n" for p in profiles
+    ))
+    return profiles
+
+def run(mode: str, profiles: List[str], regions: List[str], rounds: int, workers: int,
+        instance_ids: List[str]) -> Dict:
+    """한 방식으로 rounds 번 조회 (시간은 초)"""
+    import boto3
+    from bssm.clients import ClientPool
+    from bssm.ratelimit import client_config
+
+    pool = ClientPool()
+    counter = ConnectionCounter()
+    urllib3_logger = logging.getLogger('urllib3.connectionpool')
+    urllib3_logger.addHandler(counter)
+    urllib3_logger.setLevel(logging.DEBUG)
+
+    construction = 0.0
+    started = time.perf_counter()
+    try:
+        for _ in range(rounds):
+            for profile in profiles:
+                for region in regions:
+                    clock = time.perf_counter()
+                    if mode == 'naive':
+                        session = boto3.Session(profile_name=profile)
+                        ssm = session.client('ssm', region_name=region, config=client_config())
+                        ec2 = session.client('ec2', region_name=region, config=client_config())
+                    else:
+                        session = pool.session(profile)
+                        ssm = pool.client(session, 'ssm', region, profile)
+                        ec2 = pool.client(session, 'ec2', region, profile)
+                    construction += time.perf_counter() - clock
+
+                    ssm.describe_instance_information(MaxResults=50)
+                    with ThreadPoolExecutor(max_workers=workers) as executor:
+                        for _ in executor.map(lambda _: ec2.describe_instances(InstanceIds=instance_ids),
+                                              range(workers)):
+                            pass
+    finally:
+        urllib3_logger.removeHandler(counter)
+
+    return {
+        'mode': mode,
+        'total_s': round(time.perf_counter() - started, 3),
+        'construction_s': round(construction, 3),
+        'connections': counter.count,
+        'clients_created': pool.stats['clients'] if mode == 'pool' else rounds * len(profiles) * len(regions) * 2,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='boto3 클라이언트 풀 효과 측정')
+    parser.add_argument('--profiles', type=int, default=4, help='프로필(계정) 수 (기본값: 4)')
+    parser.add_argument('--regions', type=int, default=4, help=f'리전 수 (최대 {len(REGIONS)}, 기본값: 4)')
+    parser.add_argument('--rounds', type=int, default=3, help='반복 횟수 (agent 갱신 주기 등, 기본값: 3)')
+    parser.add_argument('--workers', type=int, default=16, help='동시에 호출할 describe_instances 수 (기본값: 16)')
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='가짜 엔드포인트 요청 지연 (ms)')
+    parser.add_argument('--output', help='결과 JSON 파일')
+    args = parser.parse_args()
+
+    fleet = generate_fleet(100)
+    fake = FakeAWS(fleet, latency=args.latency_ms / 1000).start()
+    try:
+        with tempfile.TemporaryDirectory(prefix='bssm-bench-') as tmp:
+            home = Path(tmp)
+            profiles = _write_profiles(home, args.profiles)
+            os.environ.update({
+                'AWS_ENDPOINT_URL': fake.url,
+                'AWS_CONFIG_FILE': str(home / '.aws' / 'config'),
+                'AWS_SHARED_CREDENTIALS_FILE': str(home / '.aws' / 'credentials'),
+            })
+            for key in ('AWS_PROFILE', 'AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY', 'AWS_SESSION_TOKEN'):
+                os.environ.pop(key, None)
+
+            regions = REGIONS[:max(1, min(args.regions, len(REGIONS)))]
+            instance_ids = [instance['InstanceId'] for instance in fleet[:20]]
+            results = [
+                run(mode, profiles, regions, args.rounds, args.workers, instance_ids)
+                for mode in ('naive', 'pool')
+            ]
+    finally:
+        fake.stop()
+
+    print(f"{args.profiles} 프로필 x {len(regions)} 리전 x {args.rounds} 회, 동시 호출 {args.workers}")
+    print(f"{'방식':<8}{'전체(s)':>10}{'생성(s)':>10}{'클라이언트':>12}{'새 연결':>10}")
+    for result in results:
+        print(f"{result['mode']:<8}{result['total_s']:>10.3f}{result['construction_s']:>10.3f}"
+              f"{result['clients_created']:>12}{result['connections']:>10}")
+    naive, pooled = results
+    print(f"생성 시간 {naive['construction_s'] - pooled['construction_s']:.3f}s 절약, "
+          f"새 연결(TLS 핸드셰이크) {naive['connections'] - pooled['connections']}개 절약")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2, ensure_ascii=False)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+벤치마크용 가짜 AWS 엔드포인트 (SSM / EC2 / STS)
+
+bssm 이 사용하는 API 만 흉내 내는 로컬 HTTP 서버다. 요청마다 지연 시간을 더하고
+일정 비율로 스로틀링 오류를 돌려줄 수 있다. botocore 1.31 이상은 AWS_ENDPOINT_URL
+환경 변수로 모든 서비스의 엔드포인트를 이 서버로 바꿀 수 있다.
+
+지원 API:
+    SSM  DescribeInstanceInformation (Filters, MaxResults/NextToken 페이지네이션),
+         StartSession, TerminateSession (세션 토큰만 발급, 실제 연결은 없음)
+    EC2  DescribeInstances (InstanceIds, Filters), DescribeRegions
+    STS  GetCallerIdentity
+    SSO  RegisterClient, StartDeviceAuthorization, CreateToken (sso-oidc, 바로 승인),
+         GetRoleCredentials
+
+사용법:
+    python benchmarks/fake_aws.py --count 10000 --port 4566 --latency-ms 20 --quota 20
+    AWS_ENDPOINT_URL=http://127.0.0.1:4566 AWS_ACCESS_KEY_ID=x AWS_SECRET_ACCESS_KEY=x bssm list
+"""
+
+import argparse
+import fnmatch
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List, Dict, Optional
+from urllib.parse import parse_qs
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fleet import generate_fleet, REGIONS  # noqa: E402
+
+ACCOUNT_ID = '123456789012'
+EC2_NAMESPACE = 'http://ec2.amazonaws.com/doc/2016-11-15/'
+
+class FakeAWS:
+    """가짜 AWS HTTP 서버
+
+    Args:
+        fleet: generate_fleet() 결과
+        latency: 요청마다 더할 지연 시간 (초)
+        throttle_rate: 스로틀링 오류를 돌려줄 요청 비율 (0~1)
+        by_region: True 면 요청 리전에 속한 인스턴스만 반환 (False 면 모든 리전에서 전체 반환)
+        quota: (리전, API) 별 초당 허용 요청 수. 넘으면 스로틀링 오류 반환 (0 이면 제한 없음)
+    """
+
+    def __init__(self, fleet: List[Dict], latency: float = 0.0, throttle_rate: float = 0.0,
+                 by_region: bool = False, seed: int = 0, port: int = 0, quota: float = 0.0):
+        self.fleet = fleet
+        self.by_id = {instance['InstanceId']: instance for instance in fleet}
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.by_region = by_region
+        self.quota = quota
+        self._buckets = {}  # (리전, API) -> (남은 요청 수, 마지막 갱신 시각)
+        self._filtered = {}  # (리전, SSM Filters) -> 조건에 맞는 인스턴스 목록
+        self._pending_devices = set()  # 아직 승인 대기 응답을 한 번 돌려줄 디바이스 코드
+        self.random = random.Random(seed)
+        self.calls = Counter()  # API 이름 -> 호출 수
+        self.throttled = Counter()  # API 이름 -> 스로틀링 응답 수
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'FakeAWS':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-aws', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_counters(self):
+        with self._lock:
+            self.calls.clear()
+            self.throttled.clear()
+            self._buckets.clear()
+
+    def _instances_in(self, region: Optional[str]) -> List[Dict]:
+        if not self.by_region:
+            return self.fleet
+        return [instance for instance in self.fleet if instance['Region'] == region]
+
+    @staticmethod
+    def _tag_matches(instance: Dict, key: str, values: List[str], wildcard: bool) -> bool:
+        for tag in instance['Tags']:
+            if tag['Key'] == key:
+                if wildcard:
+                    return any(fnmatch.fnmatchcase(tag['Value'], value) for value in values)
+                return tag['Value'] in values
+        return False
+
+    def _ssm_matches(self, instance: Dict, filters: List[Dict]) -> bool:
+        for item in filters:
+            key, values = item['Key'], item['Values']
+            if key == 'PingStatus' and instance['PingStatus'] not in values:
+                return False
+            if key == 'PlatformTypes' and instance['PlatformType'] not in values:
+                return False
+            if key == 'InstanceIds' and instance['InstanceId'] not in values:
+                return False
+            if key.startswith('tag:') and not self._tag_matches(instance, key[4:], values, False):
+                return False
+        return True
+
+    def _ec2_matches(self, instance: Dict, filters: List[tuple]) -> bool:
+        for name, values in filters:
+            if name == 'instance-state-name' and instance['State'] not in values:
+                return False
+            if name == 'vpc-id' and instance['VpcId'] not in values:
+                return False
+            if name.startswith('tag:') and not self._tag_matches(instance, name[4:], values, True):
+                return False
+        return True
+
+    # --- API 구현 (상태 코드, Content-Type, 본문 반환) ---
+
+    def describe_instance_information(self, body: Dict, region: str):
+        instances = self._instances_in(region)
+        filters = body.get('Filters') or []
+        if filters:
+            key = (region, json.dumps(filters, sort_keys=True))
+            with self._lock:
+                filtered = self._filtered.get(key)
+            if filtered is None:
+                filtered = [instance for instance in instances if self._ssm_matches(instance, filters)]
+                with self._lock:
+                    self._filtered[key] = filtered
+            instances = filtered
+        start = int(body.get('NextToken') or 0)
+        size = min(int(body.get('MaxResults') or 50), 50)
+        page = instances[start:start + size]
+        result = {
+            'InstanceInformationList': [
+                {
+                    'InstanceId': instance['InstanceId'],
+                    'PingStatus': instance['PingStatus'],
+                    'PlatformType': instance['PlatformType'],
+                    'PlatformName': instance['PlatformName'],
+                    'PlatformVersion': instance['PlatformVersion'],
+                    'AgentVersion': instance['AgentVersion'],
+                    'ComputerName': instance['ComputerName'],
+                    'IPAddress': instance['PrivateIpAddress'],
+                    'ResourceType': 'EC2Instance',
+                }
+                for instance in page
+            ]
+        }
+        if start + size < len(instances):
+            result['NextToken'] = str(start + size)
+        return 200, 'application/x-amz-json-1.1', json.dumps(result)
+
+    def start_session(self, body: Dict, region: str):
+        with self._lock:
+            session_id = f"bench-{sum(self.calls.values())}"
+        result = {
+            'SessionId': session_id,
+            'TokenValue': 'bench-token',
+            'StreamUrl': f"wss://ssmmessages.{region}.amazonaws.com/v1/data-channel/{session_id}",
+        }
+        return 200, 'application/x-amz-json-1.1', json.dumps(result)
+
+    def terminate_session(self, body: Dict, region: str):
+        return 200, 'application/x-amz-json-1.1', json.dumps({'SessionId': body.get('SessionId')})
+
+    def describe_instances(self, params: Dict[str, List[str]], region: str):
+        ids = [values[0] for key, values in params.items() if key.startswith('InstanceId.')]
+        filters = []
+        for key, values in params.items():
+            # Filter.1.Name=tag:env, Filter.1.Value.1=prod
+            if key.startswith('Filter.') and key.endswith('.Name'):
+                prefix = key[:-len('Name')]
+                filter_values = [v[0] for k, v in sorted(params.items()) if k.startswith(prefix + 'Value.')]
+                filters.append((values[0], filter_values))
+        items = []
+        for instance_id in ids:
+            instance = self.by_id.get(instance_id)
+            if instance is None or not self._ec2_matches(instance, filters):
+                continue
+            tags = ''.join(
+                f"<item><key>{escape(tag['Key'])}</key><value>{escape(tag['Value'])}</value></item>"
+                for tag in instance['Tags']
+            )
+            public_ip = (
+                f"<ipAddress>{instance['PublicIpAddress']}</ipAddress>" if instance['PublicIpAddress'] else ''
+            )
+            items.append(
+                f"<item><instanceId>{instance_id}</instanceId>"
+                f"<instanceType>{instance['InstanceType']}</instanceType>"
+                f"<instanceState><code>16</code><name>{instance['State']}</name></instanceState>"
+                f"<privateIpAddress>{instance['PrivateIpAddress']}</privateIpAddress>{public_ip}"
+                f"<vpcId>{instance['VpcId']}</vpcId>"
+                f"<launchTime>{instance['LaunchTime']}</launchTime>"
+                f"<tagSet>{tags}</tagSet></item>"
+            )
+        body = (
+            f'<DescribeInstancesResponse xmlns="{EC2_NAMESPACE}"><requestId>bench</requestId>'
+            f'<reservationSet><item><reservationId>r-bench</reservationId><ownerId>{ACCOUNT_ID}</ownerId>'
+            f'<instancesSet>{"".join(items)}</instancesSet></item></reservationSet>'
+            f'</DescribeInstancesResponse>'
+        )
+        return 200, 'text/xml', body
+
+    def describe_regions(self, params: Dict[str, List[str]], region: str):
+        items = ''.join(
+            f"<item><regionName>{name}</regionName><regionEndpoint>ec2.{name}.amazonaws.com</regionEndpoint></item>"
+            for name in REGIONS
+        )
+        body = (
+            f'<DescribeRegionsResponse xmlns="{EC2_NAMESPACE}"><requestId>bench</requestId>'
+            f'<regionInfo>{items}</regionInfo></DescribeRegionsResponse>'
+        )
+        return 200, 'text/xml', body
+
+    def get_caller_identity(self, params: Dict[str, List[str]], region: str):
+        body = (
+            '<GetCallerIdentityResponse xmlns="https://sts.amazonaws.com/doc/2011-06-15/">'
+            f'<GetCallerIdentityResult><Arn>arn:aws:iam::{ACCOUNT_ID}:user/bench</Arn>'
+            f'<UserId>AIDABENCH</UserId><Account>{ACCOUNT_ID}</Account></GetCallerIdentityResult>'
+            '<ResponseMetadata><RequestId>bench</RequestId></ResponseMetadata></GetCallerIdentityResponse>'
+        )
+        return 200, 'text/xml', body
+
+    # --- SSO (REST JSON, 경로로 구분) ---
+
+    def register_client(self, body: Dict):
+        result = {
+            'clientId': f"bench-client-{body.get('clientName', '')}",
+            'clientSecret': 'bench-secret',
+            'clientIdIssuedAt': int(time.time()),
+            'clientSecretExpiresAt': int(time.time()) + 90 * 24 * 60 * 60,
+        }
+        return 200, 'application/json', json.dumps(result)
+
+    def start_device_authorization(self, body: Dict):
+        with self._lock:
+            device_code = f"bench-device-{sum(self.calls.values())}"
+            self._pending_devices.add(device_code)
+        result = {
+            'deviceCode': device_code,
+            'userCode': 'BENC-HMRK',
+            'verificationUri': 'https://device.sso.example.com/',
+            'verificationUriComplete': 'https://device.sso.example.com/?user_code=BENC-HMRK',
+            'expiresIn': 600,
+            'interval': 1,
+        }
+        return 200, 'application/json', json.dumps(result)
+
+    def create_token(self, body: Dict):
+        device_code = body.get('deviceCode')
+        with self._lock:
+            pending = device_code in self._pending_devices
+            self._pending_devices.discard(device_code)
+        if pending:
+            # 사용자가 승인하기 전 첫 폴링
+            return 400, 'application/json', json.dumps({'__type': 'AuthorizationPendingException'})
+        result = {
+            'accessToken': f"bench-access-{int(time.time() * 1000)}",
+            'tokenType': 'Bearer',
+            'expiresIn': 3600,
+            'refreshToken': 'bench-refresh',
+        }
+        return 200, 'application/json', json.dumps(result)
+
+    def get_role_credentials(self, params: Dict[str, List[str]]):
+        result = {
+            'roleCredentials': {
+                'accessKeyId': 'ASIABENCH',
+                'secretAccessKey': 'bench-secret',
+                'sessionToken': 'bench-session',
+                'expiration': int((time.time() + 3600) * 1000),
+            }
+        }
+        return 200, 'application/json', json.dumps(result)
+
+    @staticmethod
+    def _throttle_response(protocol: str):
+        if protocol == 'json':
+            body = json.dumps({'__type': 'ThrottlingException', 'message': 'Rate exceeded'})
+            return 400, 'application/x-amz-json-1.1', body
+        if protocol == 'ec2':
+            body = (
+                '<Response><Errors><Error><Code>RequestLimitExceeded</Code>'
+                '<Message>Request limit exceeded.</Message></Error></Errors>'
+                '<RequestID>bench</RequestID></Response>'
+            )
+            return 503, 'text/xml', body
+        body = (
+            '<ErrorResponse><Error><Type>Sender</Type><Code>Throttling</Code>'
+            '<Message>Rate exceeded</Message></Error><RequestId>bench</RequestId></ErrorResponse>'
+        )
+        return 400, 'text/xml', body
+
+    def dispatch(self, headers, raw_body: bytes, path: str = '/'):
+        """요청을 API 구현으로 전달 (상태 코드, Content-Type, 본문 반환)"""
+        sso_actions = {
+            '/client/register': self.register_client,
+            '/device_authorization': self.start_device_authorization,
+            '/token': self.create_token,
+        }
+        route, _, query = path.partition('?')
+        if route in sso_actions or route == '/federation/credentials':
+            action = route
+            with self._lock:
+                self.calls[action] += 1
+            if self.latency:
+                time.sleep(self.latency)
+            if route == '/federation/credentials':
+                return self.get_role_credentials(parse_qs(query))
+            return sso_actions[route](json.loads(raw_body or b'{}'))
+
+        # 서명의 Credential 범위에서 리전 추출 (.../20240101/us-east-1/ssm/aws4_request)
+        match = re.search(r'Credential=[^/]+/\d+/([^/]+)/', headers.get('Authorization', ''))
+        region = match.group(1) if match else 'us-east-1'
+
+        target = headers.get('X-Amz-Target')
+        if target:
+            protocol = 'json'
+            action = target.split('.')[-1]
+            body = json.loads(raw_body or b'{}')
+        else:
+            params = parse_qs(raw_body.decode('utf-8'))
+            action = params.get('Action', [''])[0]
+            protocol = 'sts' if action == 'GetCallerIdentity' else 'ec2'
+
+        with self._lock:
+            self.calls[action] += 1
+            throttle = self.throttle_rate and self.random.random() < self.throttle_rate
+            if self.quota and not throttle:
+                # 실제 AWS 처럼 (리전, API) 별 토큰 버킷으로 초당 요청 수 제한
+                now = time.monotonic()
+                tokens, updated = self._buckets.get((region, action), (self.quota, now))
+                tokens = min(self.quota, tokens + (now - updated) * self.quota)
+                throttle = tokens < 1
+                self._buckets[(region, action)] = (tokens if throttle else tokens - 1, now)
+            if throttle:
+                self.throttled[action] += 1
+
+        if self.latency:
+            time.sleep(self.latency)
+        if throttle:
+            return self._throttle_response(protocol)
+
+        if action == 'DescribeInstanceInformation':
+            return self.describe_instance_information(body, region)
+        if action == 'StartSession':
+            return self.start_session(body, region)
+        if action == 'TerminateSession':
+            return self.terminate_session(body, region)
+        if action == 'DescribeInstances':
+            return self.describe_instances(params, region)
+        if action == 'DescribeRegions':
+            return self.describe_regions(params, region)
+        if action == 'GetCallerIdentity':
+            return self.get_caller_identity(params, region)
+        return 400, 'application/json', json.dumps({'__type': 'UnknownOperationException', 'message': action})
+
+    def _handler_class(self):
+        fake = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # 헤더와 본문을 따로 보내므로 Nagle 알고리즘을 끄지 않으면 응답마다 약 40ms 지연된다
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                status, content_type, body = fake.dispatch(self.headers, self.rfile.read(length), self.path)
+                data = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST
+
+            def log_message(self, format, *args):
+                pass
+
+        return _Handler
+
+def main():
+    parser = argparse.ArgumentParser(description='벤치마크용 가짜 AWS 엔드포인트')
+    parser.add_argument('--count', type=int, default=1000, help='인스턴스 수 (기본값: 1000)')
+    parser.add_argument('--port', type=int, default=4566, help='포트 (기본값: 4566)')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='요청마다 더할 지연 시간 (ms)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='스로틀링 오류 비율 (0~1)')
+    parser.add_argument('--by-region', action='store_true', help='요청 리전에 속한 인스턴스만 반환')
+    parser.add_argument('--quota', type=float, default=0.0, help='(리전, API) 별 초당 허용 요청 수 (0: 제한 없음)')
+    args = parser.parse_args()
+
+    fake = FakeAWS(
+        generate_fleet(args.count),
+        latency=args.latency_ms / 1000,
+        throttle_rate=args.throttle_rate,
+        by_region=args.by_region,
+        port=args.port,
+        quota=args.quota
+    )
+    print(f"가짜 AWS 엔드포인트: {fake.url} (인스턴스 {args.count}개)")
+    try:
+        fake._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
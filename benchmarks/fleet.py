@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+벤치마크용 가상 EC2/SSM 인스턴스 생성기
+
+실제 조직에서 볼 수 있는 형태의 이름/태그(env, team, service, role 등)와
+인스턴스 타입, 플랫폼, 상태 분포를 가진 인스턴스 목록을 만든다.
+같은 seed 로 만들면 항상 같은 목록이 나온다.
+
+사용법:
+    python benchmarks/fleet.py --count 10000 > fleet.json
+"""
+
+import argparse
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict
+
+ENVIRONMENTS = ('prod', 'stg', 'dev', 'qa')
+TEAMS = ('platform', 'payments', 'search', 'data', 'growth', 'identity', 'ml', 'infra')
+SERVICES = (
+    'api', 'web', 'worker', 'batch', 'gateway', 'kafka', 'redis', 'postgres', 'elastic',
+    'airflow', 'spark', 'jenkins', 'gitlab', 'nginx', 'grafana', 'prometheus', 'vault', 'consul'
+)
+ROLES = ('app', 'db', 'cache', 'queue', 'bastion', 'monitoring', 'ci')
+INSTANCE_TYPES = (
+    't3.micro', 't3.small', 't3.medium', 't3.large', 'm5.large', 'm5.xlarge', 'm6i.2xlarge',
+    'c5.xlarge', 'c6g.2xlarge', 'r5.xlarge', 'r6i.4xlarge', 'g4dn.xlarge'
+)
+REGIONS = ('ap-northeast-2', 'us-east-1', 'us-west-2', 'eu-west-1')
+
+def generate_fleet(count: int, seed: int = 42) -> List[Dict]:
+    """가상 인스턴스 목록 생성
+
+    각 항목은 EC2 describe_instances 와 SSM describe_instance_information 응답을
+    만드는 데 필요한 값을 모두 담고 있다.
+    """
+    rng = random.Random(seed)
+    base_time = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    fleet = []
+
+    for i in range(count):
+        env = rng.choice(ENVIRONMENTS)
+        team = rng.choice(TEAMS)
+        service = rng.choice(SERVICES)
+        role = rng.choice(ROLES)
+        windows = rng.random() < 0.08
+        name = f"{env}-{team}-{service}-{role}-{i:05d}"
+
+        tags = [
+            {'Key': 'Name', 'Value': name},
+            {'Key': 'env', 'Value': env},
+            {'Key': 'team', 'Value': team},
+            {'Key': 'service', 'Value': service},
+            {'Key': 'role', 'Value': role},
+            {'Key': 'cost-center', 'Value': f"cc-{rng.randint(1000, 1040)}"},
+            {'Key': 'owner', 'Value': f"{team}@example.com"},
+        ]
+        if rng.random() < 0.4:
+            cluster = f"{env}-{team}-eks"
+            tags.extend([
+                {'Key': 'eks:cluster-name', 'Value': cluster},
+                {'Key': f'kubernetes.io/cluster/{cluster}', 'Value': 'owned'},
+                {'Key': 'aws:autoscaling:groupName', 'Value': f"{cluster}-ng-{rng.randint(1, 6)}"},
+            ])
+        if rng.random() < 0.2:
+            tags.append({'Key': 'backup', 'Value': rng.choice(('daily', 'weekly'))})
+
+        launch_time = base_time + timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+        region = rng.choice(REGIONS)
+        fleet.append({
+            'InstanceId': f"i-{rng.getrandbits(68):017x}",
+            'Name': name,
+            'Tags': tags,
+            'InstanceType': rng.choice(INSTANCE_TYPES),
+            # 대부분 실행 중이고, 일부는 SSM 에서 연결이 끊긴 상태
+            'State': 'running' if rng.random() < 0.97 else 'stopped',
+            'PingStatus': 'Online' if rng.random() < 0.95 else 'ConnectionLost',
+            'PrivateIpAddress': f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+            'PublicIpAddress': (
+                f"3.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+                if role == 'bastion' else None
+            ),
+            'LaunchTime': launch_time.isoformat().replace('+00:00', 'Z'),
+            'PlatformType': 'Windows' if windows else 'Linux',
+            'PlatformName': 'Microsoft Windows Server 2022 Datacenter' if windows else 'Amazon Linux',
+            'PlatformVersion': '10.0.20348' if windows else '2023',
+            'AgentVersion': rng.choice(('3.2.1630.0', '3.2.1705.0', '3.3.40.0')),
+            'ComputerName': f"ip-{i:05d}.ec2.internal",
+            'Region': region,
+            # 환경/리전마다 VPC 하나
+            'VpcId': f"vpc-{ENVIRONMENTS.index(env)}{REGIONS.index(region)}{'0' * 15}",
+        })
+
+    return fleet
+
+def main():
+    parser = argparse.ArgumentParser(description='벤치마크용 가상 인스턴스 목록 생성')
+    parser.add_argument('--count', type=int, default=1000, help='인스턴스 수 (기본값: 1000)')
+    parser.add_argument('--seed', type=int, default=42, help='난수 seed (기본값: 42)')
+    args = parser.parse_args()
+
+    print(json.dumps(generate_fleet(args.count, args.seed), ensure_ascii=False))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+인스턴스 목록 메모리 사용량 비교
+
+캐시에서 읽은 것과 같은 형태의 인스턴스 N개(기본 10만 개)를
+dict 목록으로 보관할 때와 Instance(__slots__, intern) 목록으로 보관할 때의
+메모리를 tracemalloc 으로 측정한다.
+
+사용법:
+    python benchmarks/memory.py [--count 100000]
+"""
+
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from bssm.models import Instance  # noqa: E402
+
+STATES = ('running', 'stopped', 'pending')
+TYPES = ('t3.micro', 't3.large', 'm5.xlarge', 'c6g.2xlarge', 'r6i.4xlarge')
+PLATFORMS = ('Linux', 'Windows')
+REGIONS = ('ap-northeast-2', 'us-east-1', 'eu-west-1')
+ACCOUNTS = ('111111111111', '222222222222', '333333333333', '444444444444')
+
+def make_payload(count: int) -> str:
+    """캐시 파일과 같은 형태의 JSON (읽을 때마다 문자열이 새로 만들어진다)"""
+    rows = [
+        {
+            'InstanceId': f"i-{i:017x}",
+            'Name': f"service-{i % 500}-worker-{i}",
+            'State': STATES[i % len(STATES)],
+            'InstanceType': TYPES[i % len(TYPES)],
+            'PrivateIpAddress': f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}",
+            'PublicIpAddress': 'N/A',
+            'LaunchTime': '2024-01-01 00:00:00+00:00',
+            'SSMStatus': 'Online',
+            'Platform': PLATFORMS[i % len(PLATFORMS)],
+            'Region': REGIONS[i % len(REGIONS)],
+            'Account': ACCOUNTS[i % len(ACCOUNTS)],
+        }
+        for i in range(count)
+    ]
+    return json.dumps(rows)
+
+def measure(build) -> float:
+    """build() 가 반환한 객체가 차지하는 메모리 (MB)"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current / (1024 * 1024)
+
+def main():
+    parser = argparse.ArgumentParser(description='bssm 인스턴스 목록 메모리 사용량 비교')
+    parser.add_argument('--count', type=int, default=100000, help='인스턴스 수 (기본값: 100000)')
+    args = parser.parse_args()
+
+    payload = make_payload(args.count)
+
+    dict_mb = measure(lambda: json.loads(payload))
+    slots_mb = measure(lambda: [Instance.from_dict(row) for row in json.loads(payload)])
+
+    print(f"인스턴스 {args.count}개")
+    print(f"  dict 목록        {dict_mb:8.1f} MB")
+    print(f"  Instance 목록    {slots_mb:8.1f} MB ({slots_mb / dict_mb:.0%})")
+
+if __name__ == '__main__':
+    main()
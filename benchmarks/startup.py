@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+CLI 시작 시간 회귀 검사
+
+AWS 를 사용하지 않는 명령(--version, --help, favorites)이 boto3/botocore 를
+import 하지 않고, import 시간이 예산 안에 들어오는지 `python -X importtime` 으로 확인한다.
+
+사용법:
+    python benchmarks/startup.py [--budget-ms 200]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+
+# AWS 를 사용하지 않는 명령
+COMMANDS = [
+    ['--version'],
+    ['--help'],
+    ['favorites'],
+]
+
+# 위 명령에서 import 되면 안 되는 모듈
+FORBIDDEN_MODULES = ('boto3', 'botocore', 's3transfer')
+
+def measure(args, home):
+    """명령 하나의 import 시간(ms)과 import 된 모듈 목록 측정"""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = str(SRC_DIR)
+    env['HOME'] = home
+    env['USERPROFILE'] = home
+    
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'bssm.cli'] + args,
+        capture_output=True,
+        text=True,
+        env=env
+    )
+    
+    total_us = 0
+    modules = []
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules.append(name.strip())
+        # 최상위 import 만 합산 (하위 import 는 cumulative 에 포함됨)
+        if not name.startswith('  '):
+            total_us += int(cumulative)
+    
+    return total_us / 1000, modules
+
+def main():
+    parser = argparse.ArgumentParser(description='bssm CLI 시작 시간 검사')
+    parser.add_argument('--budget-ms', type=float, default=200.0,
+                        help='명령별 import 시간 예산 (ms, 기본값: 200)')
+    args = parser.parse_args()
+    
+    failed = False
+    with tempfile.TemporaryDirectory() as home:
+        for command in COMMANDS:
+            elapsed_ms, modules = measure(command, home)
+            forbidden = sorted({m.split('.')[0] for m in modules} & set(FORBIDDEN_MODULES))
+            
+            ok = elapsed_ms <= args.budget_ms and not forbidden
+            failed = failed or not ok
+            
+            status = 'OK  ' if ok else 'FAIL'
+            detail = f" (금지된 import: {', '.join(forbidden)})" if forbidden else ''
+            print(f"{status} bssm {' '.join(command):<12} {elapsed_ms:7.1f} ms / {args.budget_ms:.0f} ms{detail}")
+    
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
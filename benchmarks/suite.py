@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+bssm 벤치마크 모음
+
+가상 인스턴스(fleet.py)를 가짜 AWS 엔드포인트(fake_aws.py)로 제공하고
+다음 항목의 실행 시간을 측정하여 JSON 보고서로 저장한다.
+
+    list_cold         캐시 없이 `bssm list --output ndjson` (프로세스 시작 포함)
+    list_warm         캐시가 있을 때 `bssm list --output ndjson`
+    list_incremental  `bssm list --refresh` (증분 동기화)
+    ssm_pagination    describe_instance_information 페이지네이션만
+    fetch_instances   SSMManager.fetch_instances() (SSM + EC2)
+    render_page       50개 페이지 테이블 렌더링
+    search            검색 인덱스 생성 + 검색어 10개
+    query             --where 태그/필드 역색인 생성 + 조건 식 6개
+    config_ops        Config 즐겨찾기/히스토리/설정 읽기쓰기
+
+보고서는 릴리스 사이의 비교에 쓸 수 있도록 항목별 중앙값/최솟값과 API 호출 수를 담는다.
+--compare 로 이전 보고서를 주면 항목별 변화율을 출력하고, --max-regression 을 넘으면
+실패(종료 코드 1)로 끝난다.
+
+AWS_ENDPOINT_URL 을 사용하므로 botocore 1.31 이상이 필요하다.
+
+사용법:
+    python benchmarks/suite.py [--sizes 1000,10000,100000] [--latency-ms 0] [--throttle-rate 0] [--quota 0]
+                               [--repeat 3] [--output report.json]
+                               [--compare baseline.json] [--max-regression 0.2]
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Callable, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCH_DIR.parent / 'src'
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(SRC_DIR))
+
+from fleet import generate_fleet  # noqa: E402
+from fake_aws import FakeAWS  # noqa: E402
+
+REGION = 'us-east-1'
+SEARCH_QUERIES = ('p', 'pr', 'prod', 'prod-pay', 'prod-payments-api', 'i-0', '10.1', 'redis', 'c6g', 'xyz-none')
+WHERE_QUERIES = (
+    'tag:env=prod',
+    'env=prod AND (service=pay* OR team=search) AND NOT state=stopped',
+    'tag:backup AND NOT platform=windows',
+    'team=ml,data role=db',
+    'tag:eks:cluster-name=prod-* OR type=c6g*',
+    'ip=10.1.*',
+)
+
+def _write_aws_config(home: Path):
+    """가짜 자격증명으로 default 프로필 생성"""
+    aws_dir = home / '.aws'
+    aws_dir.mkdir(parents=True, exist_ok=True)
+    (aws_dir / 'config').write_text(f"[default]\nregion = {REGION}\n")
+    (aws_dir / 'credentials').write_text("[default]\naws_access_key_id = bench\naws_secret_access_key = bench\n")
+
+def _env(home: Path, endpoint: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        'HOME': str(home),
+        'USERPROFILE': str(home),
+        'PYTHONPATH': str(SRC_DIR),
+        'AWS_ENDPOINT_URL': endpoint,
+        'AWS_CONFIG_FILE': str(home / '.aws' / 'config'),
+        'AWS_SHARED_CREDENTIALS_FILE': str(home / '.aws' / 'credentials'),
+    })
+    for key in ('AWS_PROFILE', 'AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY', 'AWS_SESSION_TOKEN'):
+        env.pop(key, None)
+    return env
+
+def _timed(fn: Callable[[], object], repeat: int, setup: Optional[Callable[[], None]] = None) -> Dict:
+    """fn 을 repeat 번 실행한 시간 통계 (setup 은 매번 측정 전에 실행)"""
+    samples = []
+    extra = None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        extra = fn()
+        samples.append(time.perf_counter() - start)
+    result = {
+        'median_s': round(statistics.median(samples), 6),
+        'min_s': round(min(samples), 6),
+        'runs': len(samples),
+    }
+    if isinstance(extra, dict):
+        result.update(extra)
+    return result
+
+def _run_cli(args: List[str], env: Dict[str, str]) -> Dict:
+    result = subprocess.run(
+        [sys.executable, '-m', 'bssm.cli'] + args,
+        env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"bssm {' '.join(args)} 실패: {result.stderr.strip()}")
+    return {'rows': sum(1 for line in result.stdout.splitlines() if line.startswith('{'))}
+
+def bench_size(size: int, args) -> List[Dict]:
+    """인스턴스 수 하나에 대한 전체 측정"""
+    import boto3
+    from rich.console import Console
+    from bssm.ssm import SSMManager
+    from bssm.ui import UI
+    from bssm.search import SearchIndex
+    from bssm.query import Query, QueryIndex
+
+    fleet = generate_fleet(size, seed=args.seed)
+    fake = FakeAWS(fleet, latency=args.latency_ms / 1000, throttle_rate=args.throttle_rate,
+                   quota=args.quota).start()
+    results = []
+
+    def record(name: str, stats: Dict):
+        stats = dict(stats, name=name, size=size)
+        stats['api_calls'] = dict(fake.calls)
+        if fake.throttled:
+            stats['throttled'] = dict(fake.throttled)
+        results.append(stats)
+        print(f"  {name:<18} {size:>7}  {stats['median_s'] * 1000:10.1f} ms  (min {stats['min_s'] * 1000:.1f} ms)")
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            home = Path(tmp)
+            _write_aws_config(home)
+            env = _env(home, fake.url)
+            cache_dir = home / '.bssm' / 'cache'
+
+            def _clear_cache():
+                fake.reset_counters()
+                for path in cache_dir.glob('*.json'):
+                    path.unlink()
+
+            # 종단간 list (프로세스 시작 포함)
+            record('list_cold', _timed(lambda: _run_cli(['list', '--output', 'ndjson'], env),
+                                       args.repeat, setup=_clear_cache))
+            record('list_warm', _timed(lambda: _run_cli(['list', '--output', 'ndjson'], env),
+                                       args.repeat, setup=fake.reset_counters))
+            record('list_incremental', _timed(lambda: _run_cli(['list', '--output', 'ndjson', '--refresh'], env),
+                                              args.repeat, setup=fake.reset_counters))
+
+            # 프로세스 안에서 조회 단계만 측정
+            saved_env = dict(os.environ)
+            os.environ.update({key: env[key] for key in (
+                'HOME', 'AWS_ENDPOINT_URL', 'AWS_CONFIG_FILE', 'AWS_SHARED_CREDENTIALS_FILE'
+            )})
+            try:
+                session = boto3.Session(profile_name='default', region_name=REGION)
+                manager = SSMManager(session, REGION)
+
+                def _paginate():
+                    pages = 0
+                    for _ in manager.iter_ssm_pages():
+                        pages += 1
+                    return {'pages': pages}
+
+                record('ssm_pagination', _timed(_paginate, args.repeat, setup=fake.reset_counters))
+
+                instances = []
+
+                def _fetch():
+                    instances[:] = manager.fetch_instances()
+                    return {'rows': len(instances)}
+
+                record('fetch_instances', _timed(_fetch, args.repeat, setup=fake.reset_counters))
+                fake.reset_counters()
+
+                # 렌더링 (가운데 페이지)
+                ui = UI()
+                ui.console = Console(file=io.StringIO(), width=160, height=50, force_terminal=True)
+                middle = max(1, len(instances) // 50 // 2)
+                record('render_page', _timed(
+                    lambda: ui.show_instances_table(instances, limit=50, page=middle), args.repeat
+                ))
+
+                def _search():
+                    index = SearchIndex(instances).build()
+                    for query in SEARCH_QUERIES:
+                        index.search(query, limit=50)
+
+                record('search', _timed(_search, args.repeat))
+
+                where_queries = [Query.parse([expression]) for expression in WHERE_QUERIES]
+
+                def _query():
+                    index = QueryIndex(instances)
+                    return {'matches': sum(len(index.select(query)) for query in where_queries)}
+
+                record('query', _timed(_query, args.repeat))
+
+                record('config_ops', _timed(lambda: _config_ops(instances), args.repeat))
+            finally:
+                os.environ.clear()
+                os.environ.update(saved_env)
+    finally:
+        fake.stop()
+
+    return results
+
+def _config_ops(instances) -> Dict:
+    """즐겨찾기/히스토리/설정 읽기쓰기 (새 설정 DB 에서 시작)"""
+    from bssm.config import Config
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['HOME'] = tmp
+        config = Config()
+        sample = instances[:200]
+        for instance in sample[:50]:
+            config.add_favorite(instance.instance_id)
+        for instance in sample:
+            config.add_history(instance.instance_id, instance.name)
+        for _ in range(100):
+            config.get_favorites()
+            config.get_history()
+            config.get_setting('cache_ttl')
+        return {'operations': 50 + len(sample) + 300}
+
+def compare(report: Dict, baseline: Dict, max_regression: Optional[float]) -> bool:
+    """이전 보고서와 비교하여 변화율 출력 (허용치를 넘는 느려짐이 있으면 False)"""
+    previous = {(item['name'], item['size']): item for item in baseline.get('results', [])}
+    ok = True
+    print(f"\n이전 보고서와 비교 ({baseline.get('bssm_commit') or baseline.get('timestamp')})")
+    for item in report['results']:
+        before = previous.get((item['name'], item['size']))
+        if not before or not before['median_s']:
+            continue
+        change = item['median_s'] / before['median_s'] - 1
+        regressed = max_regression is not None and change > max_regression
+        ok = ok and not regressed
+        mark = 'FAIL' if regressed else '    '
+        print(f"{mark} {item['name']:<18} {item['size']:>7}  {before['median_s'] * 1000:10.1f} ms -> "
+              f"{item['median_s'] * 1000:10.1f} ms  ({change:+.1%})")
+    return ok
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=str(BENCH_DIR),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description='bssm 벤치마크')
+    parser.add_argument('--sizes', default='1000,10000', help='인스턴스 수 (콤마 구분, 기본값: 1000,10000)')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='API 요청마다 더할 지연 시간 (ms)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='스로틀링 오류 비율 (0~1)')
+    parser.add_argument('--quota', type=float, default=0.0,
+                        help='가짜 엔드포인트의 (리전, API) 별 초당 허용 요청 수 (0: 제한 없음)')
+    parser.add_argument('--repeat', type=int, default=3, help='항목별 반복 횟수 (기본값: 3)')
+    parser.add_argument('--seed', type=int, default=42, help='가상 인스턴스 seed')
+    parser.add_argument('--output', help='JSON 보고서 저장 경로')
+    parser.add_argument('--compare', help='비교할 이전 JSON 보고서')
+    parser.add_argument('--max-regression', type=float,
+                        help='--compare 에서 허용할 최대 느려짐 비율 (예: 0.2 = 20%%)')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    print(f"{'항목':<20} {'인스턴스':>7}  {'중앙값':>13}")
+    results = []
+    for size in sizes:
+        results.extend(bench_size(size, args))
+
+    import boto3
+    import botocore
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'bssm_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'boto3': boto3.__version__,
+        'botocore': botocore.__version__,
+        'params': {
+            'sizes': sizes,
+            'latency_ms': args.latency_ms,
+            'throttle_rate': args.throttle_rate,
+            'quota': args.quota,
+            'repeat': args.repeat,
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        print(f"\n보고서 저장: {args.output}")
+
+    ok = True
+    if args.compare:
+        ok = compare(report, json.loads(Path(args.compare).read_text()), args.max_regression)
+    sys.exit(0 if ok else 1)
+
+if __name__ == '__main__':
+    main()
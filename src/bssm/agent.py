@@ -0,0 +1,279 @@
+"""
+bssm agent: 인스턴스 목록을 메모리에 유지하고 Unix 소켓으로 CLI 요청에 응답하는 백그라운드 프로세스
+
+CLI 는 요청마다 Python 시작, boto3 클라이언트 생성, 자격증명 확인, 목록 조회 비용을 낸다.
+agent 는 한 번 조회한 (프로필, 리전) 조합을 기억해 두고 주기적으로 증분 동기화하며,
+list/connect 는 ~/.bssm/agent.sock 으로 바로 결과를 받아 간다. agent 가 없으면
+CLI 는 기존처럼 직접 조회한다.
+
+프로토콜: 요청/응답 모두 한 줄짜리 JSON
+    {"op": "ping"} / {"op": "list", ...} / {"op": "stop"}
+"""
+
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List, Dict, Optional
+
+from .models import Instance
+
+# list 요청 응답 대기 시간 (처음 보는 조합은 전체 조회가 필요하므로 길게)
+LIST_TIMEOUT = 300.0
+PING_TIMEOUT = 1.0
+# 이 시간 동안 요청이 없던 조합은 주기적 갱신 대상에서 제외 (초)
+VIEW_IDLE_TIMEOUT = 24 * 60 * 60
+
+def default_socket_path() -> Path:
+    return Path.home() / '.bssm' / 'agent.sock'
+
+def agent_supported() -> bool:
+    """Unix 도메인 소켓을 쓸 수 있는 환경인지 확인"""
+    return hasattr(socket, 'AF_UNIX')
+
+class AgentClient:
+    """agent 에 요청을 보내는 클라이언트 (agent 가 없으면 None 반환)"""
+
+    def __init__(self, socket_path: Optional[Path] = None):
+        self.socket_path = socket_path or default_socket_path()
+
+    def request(self, op: str, timeout: float = PING_TIMEOUT, **params) -> Optional[Dict]:
+        if not agent_supported() or not self.socket_path.exists():
+            return None
+
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(timeout)
+                sock.connect(str(self.socket_path))
+                sock.sendall(json.dumps(dict(params, op=op)).encode('utf-8') + b'\n')
+                with sock.makefile('rb') as reader:
+                    line = reader.readline()
+        except OSError:
+            return None
+
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None
+
+    def ping(self) -> Optional[Dict]:
+        return self.request('ping')
+
+    def list_instances(self, **params) -> Optional[Dict]:
+        return self.request('list', timeout=LIST_TIMEOUT, **params)
+
+class RemoteInventory:
+    """agent 응답으로 만든 인벤토리 (InventoryLoader 와 같은 load/iter_load/session_for 제공)"""
+
+    def __init__(self, response: Dict, profile: str, region: Optional[str] = None, console=None):
+        self.instances = [Instance.from_dict(row) for row in response.get('instances', [])]
+        self.accounts = response.get('accounts', {})  # 계정 ID -> 프로필
+        self.errors = response.get('errors', [])
+        self.fetched_at = response.get('fetched_at', time.time())
+        self.profile = profile
+        self.region = region
+        self.console = console
+        self._sessions = {}
+
+    def _print(self, message: str):
+        if self.console is not None:
+            self.console.print(message)
+        else:
+            from rich import print as rprint
+            rprint(message)
+
+    def load(self, targets=None, regions=None) -> List[Instance]:
+        from rich.markup import escape
+
+        for error in self.errors:
+            self._print(f"[red]❌ {escape(error)}[/red]")
+        age = int(max(0, time.time() - self.fetched_at))
+        self._print(f"[dim]⚡ bssm agent 에서 가져온 인스턴스 목록 ({len(self.instances)}개, {age}초 전 갱신)[/dim]")
+        return self.instances
+
+    def iter_load(self, targets=None, regions=None):
+        yield from self.load(targets, regions)
+
+    def session_for(self, instance: Instance):
+        """인스턴스가 속한 계정 프로필의 세션 (인증은 agent 가 이미 확인)"""
+        from .auth import SSOAuth
+
+        profile = self.accounts.get(instance.account or '', self.profile)
+        if profile not in self._sessions:
+            self._sessions[profile] = SSOAuth(profile_name=profile, region=self.region).create_session()
+        return self._sessions[profile]
+
+class _View:
+    """agent 가 유지하는 (프로필, 리전) 조합 하나의 목록"""
+
+    def __init__(self, params: Dict):
+        self.params = params
+        self.lock = threading.Lock()
+        self.response = None
+        self.last_request = time.time()
+
+class InventoryAgent:
+    """인스턴스 목록을 주기적으로 갱신하며 소켓 요청에 응답"""
+
+    def __init__(self, interval: float, socket_path: Optional[Path] = None):
+        from rich.console import Console
+
+        self.interval = interval
+        self.socket_path = socket_path or default_socket_path()
+        self.console = Console(stderr=True)
+        self.views = {}
+        self.views_lock = threading.Lock()
+        self.started_at = time.time()
+        self.server = None
+
+    @staticmethod
+    def _key(params: Dict) -> str:
+        return json.dumps(params, sort_keys=True)
+
+    def _fetch(self, params: Dict, full: bool = False) -> Dict:
+        """인증 후 목록 조회 (캐시를 스냅샷으로 증분 동기화, 디스크 캐시도 함께 갱신)"""
+        from .cache import InventoryCache
+        from .filters import InstanceFilter
+        from .inventory import InventoryLoader, authenticate_profiles
+
+        profiles = params.get('profiles') or [params.get('profile') or 'default']
+        targets = authenticate_profiles(profiles, region=params.get('region'))
+        instance_filter = InstanceFilter.parse(params.get('filters') or ())
+        cache = InventoryCache(ttl=self.interval, variant=instance_filter.cache_key())
+        loader = InventoryLoader(cache, refresh=True, console=self.console, incremental=not full,
+                                 filters=instance_filter)
+        instances = loader.load(targets, params.get('regions'))
+        return {
+            'ok': True,
+            'instances': [instance.to_dict() for instance in instances],
+            'accounts': {target.account: target.label for target in targets if target.account},
+            'errors': [f"[{target.label}] 인증 실패: {target.error}" for target in targets if target.error],
+            'fetched_at': time.time()
+        }
+
+    def _refresh(self, view: _View, full: bool = False):
+        with view.lock:
+            view.response = self._fetch(view.params, full)
+
+    def handle(self, request: Dict) -> Dict:
+        op = request.get('op')
+        if op == 'ping':
+            with self.views_lock:
+                views = [
+                    {'params': view.params, 'fetched_at': (view.response or {}).get('fetched_at')}
+                    for view in self.views.values()
+                ]
+            return {'ok': True, 'pid': os.getpid(), 'started_at': self.started_at,
+                    'interval': self.interval, 'views': views}
+
+        if op == 'stop':
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return {'ok': True}
+
+        if op == 'list':
+            params = {key: request.get(key) for key in ('profile', 'profiles', 'region', 'regions', 'filters')}
+            with self.views_lock:
+                view = self.views.setdefault(self._key(params), _View(params))
+            view.last_request = time.time()
+
+            if view.response is None or request.get('refresh') or request.get('full_refresh'):
+                self._refresh(view, full=bool(request.get('full_refresh')))
+            return view.response
+
+        return {'ok': False, 'error': f"알 수 없는 요청: {op}"}
+
+    def _refresh_loop(self):
+        """요청된 적 있는 조합을 주기적으로 갱신 (오래 쓰지 않은 조합은 제거)"""
+        while True:
+            time.sleep(self.interval)
+            now = time.time()
+            with self.views_lock:
+                for key in [key for key, view in self.views.items()
+                            if now - view.last_request > VIEW_IDLE_TIMEOUT]:
+                    del self.views[key]
+                views = [*self.views.values()]
+            for view in views:
+                try:
+                    self._refresh(view)
+                except Exception as e:
+                    self.console.print(f"[red]❌ 갱신 실패 {view.params}: {e}[/red]")
+
+    def serve_forever(self):
+        import socketserver
+
+        agent = self
+
+        class _Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                try:
+                    request = json.loads(self.rfile.readline() or b'{}')
+                    response = agent.handle(request)
+                except Exception as e:
+                    response = {'ok': False, 'error': str(e)}
+                self.wfile.write(json.dumps(response, ensure_ascii=False, default=str).encode('utf-8') + b'\n')
+
+        class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.socket_path.exists():
+            if AgentClient(self.socket_path).ping() is not None:
+                raise RuntimeError("bssm agent 가 이미 실행 중입니다.")
+            # 비정상 종료로 남은 소켓 파일
+            self.socket_path.unlink()
+
+        # 다른 사용자가 접근하지 못하도록 0600 으로 생성
+        old_umask = os.umask(0o177)
+        try:
+            self.server = _Server(str(self.socket_path), _Handler)
+        finally:
+            os.umask(old_umask)
+
+        threading.Thread(target=self._refresh_loop, name='bssm-agent-refresh', daemon=True).start()
+        self.console.print(f"[green]✅ bssm agent 시작 (pid {os.getpid()}, {self.socket_path})[/green]")
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            try:
+                self.socket_path.unlink()
+            except OSError:
+                pass
+            self.console.print("[yellow]👋 bssm agent 종료[/yellow]")
+
+def spawn_agent(interval: float, log_path: Optional[Path] = None) -> int:
+    """agent 를 터미널과 분리된 백그라운드 프로세스로 실행"""
+    import subprocess
+
+    log_path = log_path or Path.home() / '.bssm' / 'agent.log'
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    if getattr(sys, 'frozen', False):
+        # PyInstaller 실행 파일은 sys.executable 이 bssm 자신이라 -m 을 쓸 수 없다
+        command = [sys.executable, 'agent', '_serve', str(interval)]
+    else:
+        command = [sys.executable, '-m', 'bssm.agent', str(interval)]
+    with open(log_path, 'ab') as log:
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            close_fds=True,
+            start_new_session=True
+        )
+    return process.pid
+
+def serve(interval: float):
+    """백그라운드 agent 프로세스 본체 (SIGTERM 을 받으면 소켓을 정리하고 종료)"""
+    import signal
+
+    agent = InventoryAgent(interval)
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(
+        target=agent.server.shutdown, daemon=True).start() if agent.server else sys.exit(0))
+    agent.serve_forever()
+
+if __name__ == '__main__':
+    serve(float(sys.argv[1]) if len(sys.argv) > 1 else 300)
@@ -2,37 +2,97 @@
 AWS SSO 인증 관리
 """
 
-import boto3
 import subprocess
 import sys
-from botocore.exceptions import TokenRetrievalError, NoCredentialsError, ProfileNotFound
+from botocore.exceptions import TokenRetrievalError, NoCredentialsError, ProfileNotFound, ClientError, SSOError
 from rich import print as rprint
 
+from . import trace
+from .clients import get_client, get_pool
+from .identity import IdentityCache
+from .sso import SSOLogin
+
+# 자격증명이 유효하지 않을 때 AWS 가 반환하는 오류 코드
+AUTH_ERROR_CODES = {
+    'ExpiredToken', 'ExpiredTokenException', 'InvalidClientTokenId',
+    'UnrecognizedClientException', 'SignatureDoesNotMatch', 'AuthFailure',
+}
+
+def is_auth_error(error: Exception) -> bool:
+    """자격증명 만료/무효로 인한 오류인지 확인"""
+    if isinstance(error, (TokenRetrievalError, SSOError, NoCredentialsError)):
+        return True
+    if isinstance(error, ClientError):
+        return error.response.get('Error', {}).get('Code') in AUTH_ERROR_CODES
+    return False
+
 class SSOAuth:
     def __init__(self, profile_name='default', region=None):
         self.profile_name = profile_name
         self.region = region
+        self.identity = None
         
-    def get_session(self):
-        """AWS 세션 가져오기 (SSO 지원)"""
-        try:
-            # 세션 생성
-            session_kwargs = {'profile_name': self.profile_name}
-            if self.region:
-                session_kwargs['region_name'] = self.region
-                
-            session = boto3.Session(**session_kwargs)
+    def create_session(self):
+        """자격증명 검증 없이 AWS 세션 생성 (네트워크 호출 없음)"""
+        # 같은 프로필/리전 세션은 공용 풀에서 재사용 (클라이언트와 연결도 함께 재사용된다)
+        return get_pool().session(self.profile_name, self.region or None)
+        
+    def authenticate(self, use_cache: bool = True):
+        """세션 생성 및 자격증명 검증 (SSO 재로그인 없이 실패 시 예외 발생)
+        
+        같은 자격증명으로 이미 검증한 적이 있고 만료 전이면 STS 호출을 생략한다.
+        """
+        with trace.span('auth.authenticate', profile=self.profile_name) as span:
+            session = self.create_session()
+            self._refresh_sso_token_if_expiring(session)
+            identity_cache = IdentityCache()
+            
+            if use_cache:
+                cached = identity_cache.lookup(self.profile_name, session)
+                if cached:
+                    self.identity = cached
+                    span.set(cached=True)
+                    return session
             
-            # 자격증명 테스트
-            sts = session.client('sts')
-            sts.get_caller_identity()
+            try:
+                sts = get_client(session, 'sts')
+                self.identity = sts.get_caller_identity()
+            except Exception as e:
+                if is_auth_error(e):
+                    identity_cache.invalidate(self.profile_name)
+                raise
             
+            identity_cache.store(self.profile_name, session, self.identity)
             return session
+        
+    @staticmethod
+    def _refresh_sso_token_if_expiring(session):
+        """SSO 토큰이 곧 만료되면 refresh token 으로 미리 갱신 (브라우저 로그인은 하지 않음)"""
+        try:
+            login = SSOLogin.from_session(session)
+            if login is not None:
+                login.ensure_token()
+        except Exception:
+            # 갱신하지 못해도 기존 토큰으로 진행하고, 만료되었으면 get_session 에서 로그인
+            pass
+        
+    def invalidate_cache(self):
+        """캐시된 자격증명 정보 삭제 (인증 오류 발생 시)"""
+        IdentityCache().invalidate(self.profile_name)
+        
+    def get_session(self, use_cache: bool = True):
+        """AWS 세션 가져오기 (SSO 지원)"""
+        try:
+            # 세션 생성 및 자격증명 테스트
+            return self.authenticate(use_cache=use_cache)
             
-        except TokenRetrievalError:
+        except (TokenRetrievalError, SSOError):
+            self.invalidate_cache()
             rprint(f"[yellow]🔐 SSO 토큰이 만료되었습니다. 다시 로그인합니다...[/yellow]")
             self._refresh_sso_token()
-            return boto3.Session(profile_name=self.profile_name)
+            get_pool().invalidate(self.profile_name)
+            # 로그인 후 같은 프로필/리전으로 세션을 다시 만들어 검증
+            return self.authenticate(use_cache=False)
             
         except Exception as e:
             error_msg = str(e)
@@ -68,24 +128,23 @@ class SSOAuth:
             sys.exit(1)
             
     def _refresh_sso_token(self):
-        """SSO 토큰 갱신"""
+        """SSO 토큰 갱신 (refresh token 이 있으면 사용하고, 없으면 디바이스 인증으로 로그인)"""
+        login = SSOLogin.from_session(self.create_session())
+        if login is None:
+            rprint(f"[red]❌ '{self.profile_name}' 프로필에 SSO 설정(sso_session 또는 sso_start_url)이 없습니다.[/red]")
+            sys.exit(1)
+        
         try:
-            rprint(f"[blue]🔄 AWS SSO 로그인을 실행합니다...[/blue]")
-            result = subprocess.run(
-                ['aws', 'sso', 'login', '--profile', self.profile_name],
-                capture_output=False,
-                text=True
-            )
-            
-            if result.returncode != 0:
-                rprint(f"[red]❌ SSO 로그인에 실패했습니다.[/red]")
-                sys.exit(1)
-                
+            rprint(f"[blue]🔄 AWS SSO 로그인을 시작합니다...[/blue]")
+            with trace.span('auth.sso_login', profile=self.profile_name):
+                login.ensure_token(interactive=True, force=True)
             rprint(f"[green]✅ SSO 로그인이 완료되었습니다.[/green]")
             
-        except FileNotFoundError:
-            rprint("[red]❌ AWS CLI가 설치되어 있지 않습니다.[/red]")
-            rprint("[yellow]💡 AWS CLI를 설치해주세요: https://aws.amazon.com/cli/[/yellow]")
+        except KeyboardInterrupt:
+            rprint("\n[yellow]👋 SSO 로그인이 취소되었습니다.[/yellow]")
+            sys.exit(1)
+        except Exception as e:
+            rprint(f"[red]❌ SSO 로그인에 실패했습니다: {str(e)}[/red]")
             sys.exit(1)
             
     def _show_available_profiles(self):
@@ -109,6 +168,24 @@ class SSOAuth:
             
     def get_current_identity(self):
         """현재 AWS 자격증명 정보 반환"""
-        session = self.get_session()
-        sts = session.client('sts')
-        return sts.get_caller_identity()
\ No newline at end of file
+        self.get_session()
+        return self.identity
+        
+    def get_account_id(self, session=None) -> str:
+        """현재 AWS 계정 ID 반환 (get_session 에서 조회한 값 재사용)"""
+        if self.identity is None:
+            sts = get_client(session or self.get_session(), 'sts')
+            self.identity = sts.get_caller_identity()
+        return self.identity['Account']
+
+def assume_role(sts_client, role_arn: str, region=None, session_name: str = 'bssm'):
+    """AssumeRole 로 다른 계정의 임시 자격증명 세션 생성"""
+    with trace.span('auth.assume_role', role_arn=role_arn):
+        response = sts_client.assume_role(RoleArn=role_arn, RoleSessionName=session_name)
+    credentials = response['Credentials']
+    return get_pool().new_session(
+        region=region,
+        aws_access_key_id=credentials['AccessKeyId'],
+        aws_secret_access_key=credentials['SecretAccessKey'],
+        aws_session_token=credentials['SessionToken']
+    )
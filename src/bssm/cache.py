@@ -0,0 +1,137 @@
+"""
+인스턴스 목록 로컬 캐시
+"""
+
+import re
+import time
+from pathlib import Path
+from typing import List, Dict, Optional, Set
+
+from .fileutil import atomic_write_json, read_json
+from .models import Instance
+
+DEFAULT_TTL = 300  # 초
+EMPTY_REGION_TTL = 24 * 60 * 60  # 인스턴스가 없는 리전을 건너뛰는 기간 (초)
+
+class InventoryCache:
+    """프로필/계정/리전 별 인스턴스 목록 캐시 (~/.bssm/cache)
+    
+    variant 를 주면 (--filter 조건별) 별도 파일에 저장하여 전체 목록 캐시와 섞이지 않게 한다.
+    """
+    
+    def __init__(self, ttl: int = DEFAULT_TTL, cache_dir: Optional[Path] = None, variant: str = ''):
+        self.ttl = ttl
+        self.cache_dir = cache_dir or Path.home() / '.bssm' / 'cache'
+        self.variant = variant
+        
+    @staticmethod
+    def _safe(value: str) -> str:
+        """파일 이름에 쓸 수 없는 문자 치환"""
+        return re.sub(r'[^A-Za-z0-9._-]', '_', value or 'default')
+    
+    def _suffix(self) -> str:
+        return f"__{self._safe(self.variant)}" if self.variant else ''
+    
+    def _path(self, profile: str, account: str, region: str) -> Path:
+        name = f"{self._safe(profile)}__{self._safe(account)}__{self._safe(region)}{self._suffix()}"
+        return self.cache_dir / f"{name}.json"
+    
+    @staticmethod
+    def _read_entry(path: Path) -> Optional[Dict]:
+        """캐시 파일 읽기 (instances 는 Instance 목록으로 변환)"""
+        entry = read_json(path)
+        if not isinstance(entry, dict) or 'instances' not in entry:
+            return None
+        try:
+            entry['instances'] = [Instance.from_dict(row) for row in entry['instances']]
+        except (TypeError, AttributeError):
+            # 형식이 맞지 않는 캐시는 없는 것으로 취급
+            return None
+        return entry
+    
+    def load(self, profile: str, account: str, region: str) -> Optional[Dict]:
+        """캐시 항목 로드 (없으면 None)"""
+        return self._read_entry(self._path(profile, account, region))
+    
+    def find_latest(self, profile: str, region: str) -> Optional[Dict]:
+        """계정을 모르는 경우(오프라인) 해당 프로필/리전의 가장 최근 캐시 로드"""
+        pattern = f"{self._safe(profile)}__*__{self._safe(region)}{self._suffix()}.json"
+        candidates = sorted(
+            self.cache_dir.glob(pattern),
+            key=lambda p: p.stat().st_mtime,
+            reverse=True
+        )
+        for path in candidates:
+            entry = self._read_entry(path)
+            if entry is not None:
+                return entry
+        return None
+    
+    def save(self, profile: str, account: str, region: str, instances: List[Instance],
+             fingerprints: Optional[Dict[str, str]] = None, full_synced_at: Optional[float] = None,
+             sync_round: int = 0):
+        """캐시 항목 저장
+
+        Args:
+            fingerprints: 증분 동기화용 인스턴스별 SSM 정보 지문
+            full_synced_at: 마지막 전체 조회 시각 (기본값: 지금, 증분 동기화면 이전 값을 유지)
+            sync_round: 마지막 전체 조회 이후의 증분 동기화 횟수
+        """
+        now = time.time()
+        entry = {
+            'profile': profile,
+            'account': account,
+            'region': region,
+            'fetched_at': now,
+            'full_synced_at': full_synced_at or now,
+            'sync_round': sync_round,
+            'instances': [instance.to_dict() for instance in instances],
+            'fingerprints': fingerprints or {}
+        }
+        try:
+            atomic_write_json(self._path(profile, account, region), entry)
+        except OSError:
+            # 캐시는 최적화일 뿐이므로 저장 실패는 무시
+            pass
+    
+    def age(self, entry: Dict) -> float:
+        """캐시 항목 경과 시간 (초)"""
+        return max(0.0, time.time() - entry.get('fetched_at', 0))
+    
+    def full_sync_age(self, entry: Dict) -> float:
+        """마지막 전체 조회 이후 경과 시간 (초, 증분 동기화로 저장해도 줄지 않는다)"""
+        return max(0.0, time.time() - entry.get('full_synced_at', entry.get('fetched_at', 0)))
+    
+    def is_fresh(self, entry: Dict) -> bool:
+        """TTL 이내의 캐시인지 확인"""
+        return self.age(entry) < self.ttl
+    
+    def _empty_regions_path(self) -> Path:
+        return self.cache_dir / 'empty_regions.json'
+    
+    def get_empty_regions(self, profile: str, account: str) -> Set[str]:
+        """최근에 관리 인스턴스가 없었던 리전 목록"""
+        data = read_json(self._empty_regions_path(), {})
+        regions = data.get(f"{profile}:{account}", {}) if isinstance(data, dict) else {}
+        now = time.time()
+        return {region for region, checked_at in regions.items() if now - checked_at < EMPTY_REGION_TTL}
+    
+    def update_empty_regions(self, profile: str, account: str, counts: Dict[str, int]):
+        """리전별 인스턴스 수를 반영하여 빈 리전 목록 갱신"""
+        if self.variant:
+            # 필터에 맞는 인스턴스가 없을 뿐 리전이 비어 있는 것은 아니다
+            return
+        data = read_json(self._empty_regions_path(), {})
+        if not isinstance(data, dict):
+            data = {}
+        regions = data.setdefault(f"{profile}:{account}", {})
+        now = time.time()
+        for region, count in counts.items():
+            if count:
+                regions.pop(region, None)
+            else:
+                regions[region] = now
+        try:
+            atomic_write_json(self._empty_regions_path(), data)
+        except OSError:
+            pass
@@ -1,26 +1,251 @@
 #!/usr/bin/env python3
 """
 CLI interface for bssm
+
+boto3 와 rich 의 무거운 모듈은 실제로 필요한 명령에서만 import 한다.
+(--version, --help, favorites 등 AWS 를 사용하지 않는 명령의 시작 시간 단축)
 """
 
+import json
+import os
+
 import click
-from rich.console import Console
-from rich.table import Table
-from rich.prompt import Prompt
-from rich.panel import Panel
 from rich import print as rprint
 
-from .auth import SSOAuth
-from .ssm import SSMManager
+from . import trace
 from .config import Config
-from .ui import UI
 
-console = Console()
-ui = UI()
+_console = None
+_ui = None
+
+def get_console():
+    """공용 Console (처음 사용할 때 생성)"""
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
+
+def get_ui():
+    """공용 UI (처음 사용할 때 생성)"""
+    global _ui
+    if _ui is None:
+        from .ui import UI
+        _ui = UI()
+    return _ui
+
+def _parse_list(value):
+    """콤마로 구분된 옵션 값 파싱"""
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+def _parse_regions(value):
+    """--regions 옵션 파싱 ('all' 또는 콤마로 구분된 리전 목록)"""
+    if value and value.strip().lower() == 'all':
+        return 'all'
+    return _parse_list(value) or None
+
+def _inventory_options(f):
+    """connect/list 공통 인벤토리 옵션"""
+    options = [
+        click.option('--profile', default='default', help='AWS 프로필 이름'),
+        click.option('--region', help='AWS 리전 (기본값: 프로필 설정 사용)'),
+        click.option('--regions', help="여러 리전 동시 조회 (콤마 구분 또는 'all')"),
+        click.option('--profiles', help='여러 프로필(계정) 동시 조회 (콤마 구분)'),
+        click.option('--role-arn-template',
+                     help="--profile 자격증명으로 AssumeRole 할 역할 ARN (예: arn:aws:iam::{account_id}:role/ReadOnly)"),
+        click.option('--accounts', help='--role-arn-template 에 사용할 계정 ID (콤마 구분)'),
+        click.option('--refresh', is_flag=True, help='캐시를 무시하고 목록을 새로 가져오기 (바뀐 인스턴스만 EC2 조회, '
+                          '이름/태그 변경은 몇 번의 갱신에 걸쳐 반영되므로 바로 필요하면 --full-refresh)'),
+        click.option('--full-refresh', is_flag=True, help='증분 동기화 없이 전체 목록을 새로 가져오기'),
+        click.option('--offline', is_flag=True, help='AWS 호출 없이 캐시된 목록만 사용'),
+        click.option('--filter', 'filters', multiple=True, metavar='KEY=VALUE',
+                     help='AWS 에서 거를 조건 (여러 번 지정 가능): name=web-*, env=prod, tag:team=a,b, '
+                          'platform=Linux, state=running, vpc=vpc-0123'),
+    ]
+    for option in reversed(options):
+        f = option(f)
+    return f
+
+def _parse_where(ctx, param, value):
+    """--where 조건 파싱 (Query, 조건이 없으면 None)"""
+    if not value:
+        return None
+    from .query import Query
+    try:
+        return Query.parse(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e), ctx=ctx, param=param)
+
+def _where_option(f):
+    """list/connect 로컬 조회 조건 옵션"""
+    return click.option(
+        '--where', multiple=True, callback=_parse_where, metavar='EXPR',
+        help="조회된 목록에서 태그/필드로 거르기, AWS 호출 없음 (여러 번 지정 가능): "
+             "'tag:env=prod AND (service=pay* OR team=search) AND NOT state=stopped'"
+    )(f)
+
+def _untagged_warning(count: int) -> str:
+    return (f"[yellow]⚠️  태그를 저장하지 않던 이전 캐시의 인스턴스 {count}개는 tag: 조건에 맞지 않는 것으로 "
+            f"처리했습니다. 정확한 결과는 [blue]--refresh[/blue] 로 다시 조회하세요.[/yellow]")
+
+def _select_where(where, loader, targets, regions, instances, out=None):
+    """--where 조건으로 거르기
+    
+    이전 버전 캐시의 행은 태그가 없어(tags 가 None) tag: 조건에 항상 맞지 않는다. 그런 행이
+    있으면 목록을 새로 조회하고 (바뀌지 않은 인스턴스도 태그는 다시 가져온다), 새로 조회할 수
+    없으면 (오프라인, agent 목록, 조회 실패) 결과가 빠질 수 있다고 경고한다.
+    """
+    from .query import QueryIndex
+    
+    if where.uses_tags and any(instance.tags is None for instance in instances):
+        from .inventory import InventoryLoader
+        if isinstance(loader, InventoryLoader) and not loader.refresh and not loader.offline:
+            loader.refresh = True
+            instances = loader.load(targets, regions)
+        untagged = sum(1 for instance in instances if instance.tags is None)
+        if untagged:
+            (out or get_console()).print(_untagged_warning(untagged))
+    return QueryIndex(instances).select(where)
+
+def _agent_inventory(profile, region, regions, profiles, refresh, full_refresh, instance_filter, out):
+    """bssm agent 에서 인스턴스 목록 가져오기 (agent 가 없거나 실패하면 None)"""
+    from .agent import AgentClient, RemoteInventory
+    
+    client = AgentClient()
+    if not client.socket_path.exists():
+        return None
+    
+    with out.status("[bold green]bssm agent 에서 인스턴스 목록을 가져오는 중..."), trace.span('agent.list'):
+        response = client.list_instances(
+            profile=profile, profiles=_parse_list(profiles) or None, region=region,
+            regions=_parse_regions(regions), refresh=refresh, full_refresh=full_refresh,
+            filters=instance_filter.expressions() or None
+        )
+    if response is None:
+        return None
+    if not response.get('ok'):
+        out.print(f"[yellow]⚠️  bssm agent 오류로 직접 조회합니다: {response.get('error')}[/yellow]")
+        return None
+    return RemoteInventory(response, profile, region, console=out)
+
+def _prepare_inventory(profile, region, regions=None, profiles=None, role_arn_template=None,
+                       accounts=None, refresh=False, full_refresh=False, offline=False, filters=(),
+                       out=None, use_agent=True):
+    """인증 후 인스턴스 목록 조회 준비 (로컬 캐시 우선, 멀티 리전/멀티 계정 지원)
+    
+    Args:
+        filters: --filter 조건 (KEY=VALUE 목록, SSM/EC2 Filters 로 변환)
+        out: 상태 메시지를 출력할 콘솔 (기본값: stdout 콘솔)
+        use_agent: bssm agent 가 실행 중이면 agent 의 목록 사용
+    
+    Returns:
+        (InventoryLoader, 조회 대상 계정 목록, 조회 대상 리전)
+    """
+    out = out or get_console()
+    if role_arn_template and '{account_id}' not in role_arn_template:
+        raise click.BadParameter("'{account_id}' 자리표시자가 필요합니다.", param_hint='--role-arn-template')
+    if role_arn_template and not accounts:
+        raise click.BadParameter("--role-arn-template 사용 시 계정 ID가 필요합니다.", param_hint='--accounts')
+    
+    from .filters import InstanceFilter
+    try:
+        instance_filter = InstanceFilter.parse(filters or ())
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--filter')
+    
+    # bssm agent 가 실행 중이면 agent 의 목록 사용 (AssumeRole/오프라인은 직접 조회)
+    if use_agent and not role_arn_template and not offline:
+        remote = _agent_inventory(profile, region, regions, profiles, refresh, full_refresh, instance_filter, out)
+        if remote is not None:
+            return remote, [], _parse_regions(regions)
+    
+    from .auth import SSOAuth
+    from .cache import InventoryCache, DEFAULT_TTL
+    from .inventory import InventoryLoader, AccountTarget, authenticate_profiles, assume_role_targets
+    
+    config = Config()
+    cache = InventoryCache(ttl=config.get_setting('cache_ttl', DEFAULT_TTL), variant=instance_filter.cache_key())
+    loader = InventoryLoader(
+        cache, refresh=refresh or full_refresh, offline=offline, console=out,
+        incremental=not full_refresh, filters=instance_filter
+    )
+    
+    profile_list = _parse_list(profiles)
+    if profile_list:
+        # 여러 프로필은 SSO 재로그인 없이 병렬 인증 (실패한 계정만 제외)
+        with out.status("[bold green]계정 인증 중..."):
+            targets = authenticate_profiles(profile_list, region=region, offline=offline)
+    else:
+        auth = SSOAuth(profile_name=profile, region=region)
+        if offline:
+            base = AccountTarget(profile, auth.create_session())
+        else:
+            session = auth.get_session()
+            base = AccountTarget(profile, session, auth.get_account_id(session))
+        
+        if role_arn_template:
+            with out.status("[bold green]계정별 역할 전환 중..."):
+                targets = assume_role_targets(
+                    base.session, role_arn_template, _parse_list(accounts), offline=offline
+                )
+        else:
+            targets = [base]
+    
+    return loader, targets, _parse_regions(regions)
+
+def _start_diagnostics(ctx, timings, trace_file, profile_cpu):
+    """--timings/--trace/--profile-cpu 설정 (결과는 명령이 끝날 때 출력/저장)
+    
+    BSSM_TRACE 환경 변수가 1 이면 --timings, 그 밖의 값이면 --trace 경로로 사용한다.
+    """
+    env_trace = os.environ.get('BSSM_TRACE', '').strip()
+    if env_trace.lower() in ('1', 'true', 'yes'):
+        timings = True
+    elif env_trace and env_trace.lower() not in ('0', 'false', 'no'):
+        trace_file = trace_file or env_trace
+    
+    if timings or trace_file:
+        tracer = trace.start()
+        
+        def _finish_trace():
+            trace.stop()
+            if timings:
+                tracer.print_summary()
+            if trace_file:
+                tracer.write(trace_file)
+                click.echo(f"⏱  실행 기록 저장: {trace_file} (chrome://tracing 또는 ui.perfetto.dev)", err=True)
+        
+        ctx.call_on_close(_finish_trace)
+    
+    if profile_cpu:
+        import cProfile
+        
+        profiler = cProfile.Profile()
+        
+        def _finish_profile():
+            import io
+            import pstats
+            
+            profiler.disable()
+            profiler.dump_stats(profile_cpu)
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(20)
+            click.echo(out.getvalue().rstrip(), err=True)
+            click.echo(f"🔬 CPU 프로파일 저장: {profile_cpu} (python -m pstats {profile_cpu})", err=True)
+        
+        # 나중에 등록한 콜백이 먼저 실행되므로 요약 출력은 프로파일에 포함되지 않는다
+        ctx.call_on_close(_finish_profile)
+        profiler.enable()
 
 @click.group()
 @click.version_option(version="1.0.0")
-def cli():
+@click.option('--timings', is_flag=True, help='구간별 실행 시간과 AWS API 호출 시간을 stderr 에 출력')
+@click.option('--trace', 'trace_file', type=click.Path(dir_okay=False),
+              help='구간별 실행 기록을 Chrome trace 형식 JSON 파일로 저장')
+@click.option('--profile-cpu', type=click.Path(dir_okay=False),
+              help='메인 스레드의 cProfile 통계를 파일로 저장 (누적 시간 상위 함수는 stderr 에 출력)')
+@click.pass_context
+def cli(ctx, timings, trace_file, profile_cpu):
     """🚀 Better AWS SSM CLI Tool
     
     AWS SSM을 더 쉽고 빠르게 사용할 수 있는 CLI 도구입니다.
@@ -33,40 +258,178 @@ def cli():
     
     사용 예시:
       bssm connect --profile my-profile
+      bssm connect web-1
       bssm list --profile prod-profile
+      bssm run --name 'web-*' -- uptime
+      bssm tunnel up i-0123456789abcdef0 -r 5432
       bssm test-auth --profile dev-profile
+      bssm --timings connect --profile my-profile
     """
-    pass
+    _start_diagnostics(ctx, timings, trace_file, profile_cpu)
+
+def _index_scope(profile, region, regions, profiles, role_arn_template, accounts):
+    """connect <대상> 에서 인덱스를 찾을 (프로필 목록, 리전 목록)"""
+    if role_arn_template:
+        labels = [f"{profile}@{account}" for account in _parse_list(accounts)]
+    else:
+        labels = _parse_list(profiles) or [profile]
+    
+    region_list = _parse_regions(regions)
+    if region_list == 'all':
+        region_list = None
+    elif not region_list and region:
+        region_list = [region]
+    # 리전을 지정하지 않으면 지난 조회에서 본 모든 리전에서 찾는다
+    return labels, region_list
+
+def _resolve_target(target, labels, region_list, region):
+    """인덱스와 히스토리에서 대상 찾기 [(프로필, 인스턴스)]
+    
+    '-' 는 마지막으로 연결한 인스턴스, 히스토리에 있는 이름은 해당 인스턴스 ID 로 바꿔 찾는다.
+    """
+    from .index import InstanceIndex
+    from .models import Instance
+    
+    index = InstanceIndex()
+    matches = [] if target == '-' else index.find(target, labels, region_list)
+    if matches:
+        return matches
+    
+    history = Config().get_history()
+    if target == '-':
+        entries = history[:1]
+    else:
+        entries = [item for item in history if (item.get('instance_name') or '').lower() == target.lower()]
+    for entry in entries:
+        matches = index.find(entry['instance_id'], labels, region_list)
+        if matches:
+            return matches
+    if entries:
+        # 인덱스에 없는 히스토리 항목은 기본 프로필/리전에서 확인
+        entry = entries[0]
+        return [(labels[0], Instance(entry['instance_id'], entry.get('instance_name') or entry['instance_id'],
+                                     'unknown', '', region=region))]
+    return []
+
+def _connect_target(target, profile, region, regions, profiles, role_arn_template, accounts, offline) -> bool:
+    """목록 조회 없이 인덱스로 대상을 찾아 연결 (API 호출은 확인용 한 번)
+    
+    Returns:
+        처리했으면 True, 인덱스에 없거나 더 이상 연결할 수 없으면 False (목록 조회로 진행)
+    """
+    from .auth import SSOAuth
+    from .inventory import assume_role_targets
+    from .ssm import SSMManager
+    
+    labels, region_list = _index_scope(profile, region, regions, profiles, role_arn_template, accounts)
+    with trace.span('connect.resolve', target=target) as span:
+        matches = _resolve_target(target, labels, region_list, region)
+        span.set(matches=len(matches))
+    if not matches:
+        return False
+    
+    if len(matches) == 1:
+        label, instance = matches[0]
+    else:
+        config = Config()
+        selected = get_ui().select_instance(
+            [instance for _, instance in matches],
+            favorites=[fav['instance_id'] for fav in config.get_favorites()],
+            history=[item['instance_id'] for item in config.get_history()]
+        )
+        if selected is None:
+            return True
+        label, instance = next(match for match in matches if match[1] is selected)
+    
+    if role_arn_template:
+        base = SSOAuth(profile_name=profile, region=region).get_session()
+        assumed = assume_role_targets(base, role_arn_template, [instance.account], offline=offline)[0]
+        if assumed.error is not None:
+            raise assumed.error
+        session = assumed.session
+    elif offline:
+        session = SSOAuth(profile_name=label, region=region).create_session()
+    else:
+        session = SSOAuth(profile_name=label, region=region).get_session()
+    
+    ssm_manager = SSMManager(session, instance.region or region, instance.account)
+    if not offline:
+        # 인덱스는 지난 조회 결과이므로 연결 전에 해당 인스턴스만 확인
+        with get_console().status(f"[bold green]{instance.instance_id} 상태 확인 중..."):
+            info = ssm_manager.describe_instance(instance.instance_id)
+        if info is None:
+            rprint(f"[yellow]⚠️  {instance.name} ({instance.instance_id}) 에 SSM 으로 연결할 수 없습니다. "
+                   f"목록을 새로 조회합니다.[/yellow]")
+            return False
+    
+    rprint(f"[green]🎯 {instance.name} ({instance.instance_id}, {ssm_manager.region})[/green]")
+    Config().add_history(instance.instance_id, instance.name)
+    ssm_manager.start_session(instance.instance_id)
+    return True
 
 @cli.command()
-@click.option('--profile', default='default', help='AWS 프로필 이름')
-@click.option('--region', help='AWS 리전 (기본값: 프로필 설정 사용)')
-def connect(profile, region):
-    """EC2 인스턴스에 SSM으로 연결"""
+@click.argument('target', required=False)
+@_inventory_options
+@_where_option
+def connect(target, profile, region, regions, profiles, role_arn_template, accounts, refresh, full_refresh,
+            offline, filters, where):
+    """EC2 인스턴스에 SSM으로 연결
+    
+    TARGET(이름, 'web-*', 인스턴스 ID, IP, 이전에 연결한 이름 또는 '-')을 주면
+    전체 목록을 조회하지 않고 로컬 인덱스에서 찾아 바로 연결합니다.
+    """
+    from .index import matches_target
+    from .ssm import SSMManager
+    
+    ui = get_ui()
     try:
-        ui.show_header("AWS SSM 연결")
-        
-        # AWS 인증
-        auth = SSOAuth(profile_name=profile, region=region)
-        session = auth.get_session()
+        if target and not refresh and not full_refresh and not filters and not where:
+            if _connect_target(target, profile, region, regions, profiles, role_arn_template, accounts, offline):
+                return
+            # 인덱스가 오래되었을 수 있으므로 목록을 새로 조회 (바뀐 인스턴스만 EC2 조회)
+            refresh = not offline
         
-        # SSM 매니저 초기화
-        ssm_manager = SSMManager(session)
+        ui.show_header("AWS SSM 연결")
         
-        # 인스턴스 목록 가져오기
-        with console.status("[bold green]인스턴스 목록을 가져오는 중..."):
-            instances = ssm_manager.get_instances()
+        # 인스턴스 목록 가져오기 (AWS 인증 포함)
+        loader, targets, regions = _prepare_inventory(
+            profile, region, regions=regions, profiles=profiles,
+            role_arn_template=role_arn_template, accounts=accounts,
+            refresh=refresh, full_refresh=full_refresh, offline=offline, filters=filters
+        )
+        instances = loader.load(targets, regions)
+        if where:
+            instances = _select_where(where, loader, targets, regions, instances)
+        if target and target != '-':
+            instances = [instance for instance in instances if matches_target(target, instance)]
         
         if not instances:
-            rprint("[red]❌ SSM 연결 가능한 인스턴스가 없습니다.[/red]")
+            if target:
+                rprint(f"[red]❌ '{target}' 에 해당하는 SSM 연결 가능한 인스턴스가 없습니다.[/red]")
+            elif where:
+                rprint("[red]❌ --where 조건에 맞는 SSM 연결 가능한 인스턴스가 없습니다.[/red]")
+            else:
+                rprint("[red]❌ SSM 연결 가능한 인스턴스가 없습니다.[/red]")
             return
         
-        # 인스턴스 선택 UI
-        selected_instance = ui.select_instance(instances)
+        # 인스턴스 선택 UI (즐겨찾기/최근 접속 인스턴스 우선, 대상과 일치하는 인스턴스가 하나면 바로 연결)
+        config = Config()
+        if target and len(instances) == 1:
+            selected_instance = instances[0]
+        else:
+            selected_instance = ui.select_instance(
+                instances,
+                favorites=[fav['instance_id'] for fav in config.get_favorites()],
+                history=[item['instance_id'] for item in config.get_history()]
+            )
         
         if selected_instance:
-            # SSM 세션 시작
-            ssm_manager.start_session(selected_instance['InstanceId'])
+            config.add_history(selected_instance.instance_id, selected_instance.name)
+            
+            # 선택한 인스턴스의 계정/리전으로 SSM 세션 시작
+            session = loader.session_for(selected_instance)
+            ssm_manager = SSMManager(session, selected_instance.region or region, selected_instance.account)
+            ssm_manager.start_session(selected_instance.instance_id)
         
     except KeyboardInterrupt:
         rprint("\n[yellow]👋 연결이 취소되었습니다.[/yellow]")
@@ -74,22 +437,637 @@ def connect(profile, region):
         rprint(f"[red]❌ 오류가 발생했습니다: {str(e)}[/red]")
 
 @cli.command()
-@click.option('--profile', default='default', help='AWS 프로필 이름')
-def list(profile):
+@_inventory_options
+@_where_option
+@click.option('--output', 'output_format', type=click.Choice(['table', 'ndjson']), default='table',
+              help='출력 형식 (ndjson: 조회되는 대로 한 줄에 하나씩 JSON 출력)')
+@click.option('--limit', type=click.IntRange(min=1), help='한 페이지에 표시할 인스턴스 수 (해당 페이지만 출력)')
+@click.option('--page', type=click.IntRange(min=1), help='표시할 페이지 번호 (1부터, 기본 1)')
+def list(profile, region, regions, profiles, role_arn_template, accounts, refresh, full_refresh, offline,
+         filters, where, output_format, limit, page):
     """SSM 연결 가능한 인스턴스 목록 보기"""
+    from rich.console import Console
+    
+    # NDJSON 은 stdout 을 데이터 전용으로 쓰고 상태 메시지는 stderr 로 출력
+    out = Console(stderr=True) if output_format == 'ndjson' else get_console()
     try:
-        auth = SSOAuth(profile_name=profile)
-        session = auth.get_session()
-        ssm_manager = SSMManager(session)
+        loader, targets, regions = _prepare_inventory(
+            profile, region, regions=regions, profiles=profiles,
+            role_arn_template=role_arn_template, accounts=accounts,
+            refresh=refresh, full_refresh=full_refresh, offline=offline, filters=filters, out=out
+        )
+        
+        if output_format == 'ndjson':
+            untagged = 0
+            for instance in loader.iter_load(targets, regions):
+                if where and instance.tags is None and where.uses_tags:
+                    untagged += 1
+                if where and not where.matches(instance):
+                    continue
+                click.echo(json.dumps(instance.to_dict(), ensure_ascii=False, default=str))
+            if untagged:
+                out.print(_untagged_warning(untagged))
+            return
+        
+        # --limit 없이 --page 만 주면 한 화면 크기를 페이지 크기로 사용
+        ui = get_ui()
+        if page and not limit:
+            limit = ui.page_size()
+        instances = loader.load(targets, regions)
+        if where:
+            instances = _select_where(where, loader, targets, regions, instances, out)
+        ui.show_instances_table(instances, limit=limit, page=page)
+        
+    except Exception as e:
+        out.print(f"[red]❌ 오류가 발생했습니다: {str(e)}[/red]")
+
+@cli.command()
+@_inventory_options
+@click.option('--interval', type=click.IntRange(min=2), default=10, show_default=True, help='조회 주기 (초)')
+def watch(profile, region, regions, profiles, role_arn_template, accounts, refresh, full_refresh, offline,
+          filters, interval):
+    """인스턴스 목록을 주기적으로 조회하며 추가/제거/변경된 인스턴스만 갱신해서 보기"""
+    if offline:
+        raise click.BadParameter("watch 는 AWS 에서 목록을 다시 조회해야 합니다.", param_hint='--offline')
+    from rich.console import Console
+    from .watch import InventoryWatcher, WATCH_FULL_SYNC_INTERVAL
+    
+    out = get_console()
+    try:
+        # agent 는 자기 주기로만 갱신하므로 직접 조회 (매번 캐시를 기준으로 증분 동기화)
+        loader, targets, regions = _prepare_inventory(
+            profile, region, regions=regions, profiles=profiles,
+            role_arn_template=role_arn_template, accounts=accounts,
+            refresh=True, full_refresh=full_refresh, filters=filters, out=out, use_agent=False
+        )
+        # 조회 상태 메시지는 화면을 어지럽히므로 숨기고 오류만 watch 화면에 표시
+        loader.console = Console(quiet=True)
+        # SSM 정보에 드러나지 않는 이름/태그 변경도 몇 분 안에 보이도록 전체 조회를 자주 한다
+        loader.full_sync_interval = WATCH_FULL_SYNC_INTERVAL
+        InventoryWatcher(loader, targets, regions, interval, get_ui()).run()
+    except KeyboardInterrupt:
+        rprint("\n[yellow]👋 watch 를 종료합니다.[/yellow]")
+    except Exception as e:
+        out.print(f"[red]❌ 오류가 발생했습니다: {str(e)}[/red]")
+
+def _select_targets(instances, targets=None, name_pattern=None, all_instances=False):
+    """run 대상 인스턴스 선택 (ID 목록, 이름 패턴 또는 전체)"""
+    from fnmatch import fnmatchcase
+    
+    if all_instances:
+        return instances
+    
+    target_ids = set(_parse_list(targets))
+    pattern = name_pattern.lower() if name_pattern else None
+    return [
+        instance for instance in instances
+        if instance.instance_id in target_ids
+        or (pattern and fnmatchcase(instance.name.lower(), pattern))
+    ]
+
+@cli.command()
+@_inventory_options
+@click.argument('command', nargs=-1)
+@click.option('--targets', '-t', help='명령을 실행할 인스턴스 ID (콤마 구분)')
+@click.option('--name', 'name_pattern', help="이름 패턴으로 대상 선택 (예: 'web-*')")
+@click.option('--all', 'all_instances', is_flag=True, help='조회된 모든 인스턴스에서 실행')
+@click.option('--document', help='SSM 문서 이름 (기본값: Linux AWS-RunShellScript, Windows AWS-RunPowerShellScript)')
+@click.option('--parameter', 'parameters', multiple=True, metavar='KEY=VALUE',
+              help='--document 문서에 넘길 파라미터 (여러 번 지정 가능)')
+@click.option('--timeout', type=click.IntRange(min=30), default=600, show_default=True,
+              help='명령 실행 제한 시간 (초)')
+@click.option('--concurrency', type=click.IntRange(1, 64), default=16, show_default=True,
+              help='동시에 결과를 조회할 호출 수')
+@click.option('--output', 'output_format', type=click.Choice(['text', 'ndjson']), default='text',
+              help='출력 형식 (ndjson: 끝나는 대로 인스턴스마다 한 줄씩 JSON 출력)')
+@click.option('--yes', '-y', is_flag=True, help='확인 없이 바로 실행')
+def run(profile, region, regions, profiles, role_arn_template, accounts, refresh, full_refresh, offline,
+        filters, command, targets, name_pattern, all_instances, document, parameters, timeout, concurrency,
+        output_format, yes):
+    """여러 인스턴스에서 명령 실행 (SSM Run Command)
+    
+    --document 로 다른 문서를 쓰면 COMMAND 는 commands 파라미터로, --parameter 는 그대로 넘긴다.
+    
+    \b
+    예시:
+      bssm run --name 'web-*' -- systemctl is-active nginx
+      bssm run --all --regions all --output ndjson -- uptime
+      bssm run --name 'web-*' --document AWS-ConfigureAWSPackage --parameter action=Install --parameter name=AmazonCloudWatchAgent
+    """
+    import sys
+    from rich.console import Console
+    from .command import CommandRunner, OutputGroups, RUN_COMMAND_DOCUMENTS
+    from .clients import get_client
+    from .ratelimit import throttle_count
+    
+    if not (targets or name_pattern or all_instances):
+        raise click.UsageError("--targets, --name 또는 --all 중 하나로 대상을 지정하세요.")
+    custom_document = document and document not in RUN_COMMAND_DOCUMENTS
+    if not command and not custom_document:
+        raise click.UsageError("실행할 명령을 지정하세요. (예: bssm run --all -- uptime)")
+    if parameters and not custom_document:
+        raise click.UsageError("--parameter 는 --document 로 다른 문서를 지정할 때만 사용할 수 있습니다.")
+    document_parameters = {}
+    for parameter in parameters:
+        key, sep, value = parameter.partition('=')
+        if not sep or not key.strip():
+            raise click.BadParameter(f"'{parameter}' 형식이 잘못되었습니다. (KEY=VALUE)", param_hint='--parameter')
+        document_parameters.setdefault(key.strip(), []).append(value)
+    
+    # NDJSON 은 stdout 을 데이터 전용으로 쓰고 상태 메시지는 stderr 로 출력
+    out = Console(stderr=True) if output_format == 'ndjson' else get_console()
+    command = ' '.join(command)
+    if custom_document and command:
+        # 사용자가 명령을 준 경우에만 commands 파라미터로 넘긴다
+        document_parameters.setdefault('commands', [command])
+    failed = 0
+    try:
+        loader, account_targets, regions = _prepare_inventory(
+            profile, region, regions=regions, profiles=profiles,
+            role_arn_template=role_arn_template, accounts=accounts,
+            refresh=refresh, full_refresh=full_refresh, offline=offline, filters=filters, out=out
+        )
+        selected = _select_targets(loader.load(account_targets, regions), targets, name_pattern, all_instances)
+        if not selected:
+            out.print("[red]❌ 명령을 실행할 인스턴스가 없습니다.[/red]")
+            return
+        
+        out.print(f"[cyan]📋 대상 인스턴스 {len(selected)}개:[/cyan] {command or document}")
+        if not yes and not click.confirm(f"{len(selected)}개 인스턴스에서 실행할까요?", err=True):
+            out.print("[yellow]👋 실행이 취소되었습니다.[/yellow]")
+            return
+        
+        # 계정/리전별 클라이언트로 전송 (세션은 스레드 안전하지 않으므로 여기서 생성)
+        runner = CommandRunner(max_workers=concurrency)
+        by_client = {}
+        for instance in selected:
+            by_client.setdefault((instance.account, instance.region), []).append(instance)
         
-        with console.status("[bold green]인스턴스 목록을 가져오는 중..."):
-            instances = ssm_manager.get_instances()
+        invocations = []
+        results = []
+        for (account, instance_region), group in by_client.items():
+            client = get_client(loader.session_for(group[0]), 'ssm', instance_region, account)
+            sent, send_failures = runner.send(client, group, [command] if command else None,
+                                              document_name=document, timeout=timeout,
+                                              comment=f"bssm run: {command or document}",
+                                              parameters=document_parameters)
+            invocations.extend(sent)
+            results.extend(send_failures)
         
-        ui.show_instances_table(instances)
+        def _results():
+            yield from results
+            yield from runner.iter_results(invocations)
+        
+        groups = OutputGroups()
+        if output_format == 'ndjson':
+            for result in _results():
+                groups.add(result)
+                failed += not result.ok
+                click.echo(json.dumps(result.to_dict(), ensure_ascii=False))
+        else:
+            ui = get_ui()
+            with ui.console.status("[bold green]명령 실행 중...") as status:
+                for done, result in enumerate(_results(), 1):
+                    number, is_new = groups.add(result)
+                    failed += not result.ok
+                    # 이미 나온 출력과 같은 결과는 마지막 요약에만 표시
+                    if is_new:
+                        ui.show_command_result(result, number)
+                    status.update(f"[bold green]명령 실행 중... {done}/{len(selected)}")
+            ui.show_command_summary(groups)
+        
+        summary = f"성공 {len(selected) - failed}개, 실패 {failed}개, 출력 종류 {len(groups)}개"
+        # 포기한 조회는 양쪽에 모두 집계되므로 큰 값 사용
+        throttled = max(runner.throttled, throttle_count())
+        if throttled:
+            summary += f", 스로틀링 {throttled}회"
+        out.print(f"[{'red' if failed else 'green'}]{'❌' if failed else '✅'} {summary}[/]")
+        
+    except KeyboardInterrupt:
+        out.print("\n[yellow]👋 결과 조회가 중단되었습니다. (명령은 인스턴스에서 계속 실행됩니다)[/yellow]")
+    except Exception as e:
+        out.print(f"[red]❌ 오류가 발생했습니다: {str(e)}[/red]")
+    
+    if failed:
+        sys.exit(1)
+
+@cli.command()
+@_inventory_options
+@click.argument('source')
+@click.argument('destination')
+@click.option('--targets', '-t', help='파일을 주고받을 인스턴스 ID (콤마 구분)')
+@click.option('--name', 'name_pattern', help="이름 패턴으로 대상 선택 (예: 'web-*')")
+@click.option('--all', 'all_instances', is_flag=True, help='조회된 모든 인스턴스와 주고받기')
+@click.option('--concurrency', type=click.IntRange(1, 1000), default=100, show_default=True,
+              help='동시에 실행할 명령 호출 수 (인스턴스 x 조각)')
+@click.option('--window', type=click.IntRange(1, 32), default=4, show_default=True,
+              help='인스턴스 하나에 동시에 보낼 조각 수')
+@click.option('--timeout', type=click.IntRange(min=30), default=300, show_default=True,
+              help='명령 하나의 실행 제한 시간 (초)')
+@click.option('--yes', '-y', is_flag=True, help='확인 없이 바로 실행')
+def cp(profile, region, regions, profiles, role_arn_template, accounts, refresh, full_refresh, offline,
+       filters, source, destination, targets, name_pattern, all_instances, concurrency, window, timeout, yes):
+    """인스턴스와 파일 주고받기 (SSM Run Command, 원격 경로는 ':' 로 시작)
+    
+    파일은 압축/조각으로 나누어 체크섬을 확인하며 전송하고, 실패하거나 중단된 전송은
+    같은 명령을 다시 실행하면 이어서 진행한다. 가져온 파일은 <DESTINATION>/<인스턴스 ID>/ 에 저장된다.
+    
+    \b
+    예시:
+      bssm cp ./app.conf :/etc/app/app.conf --name 'web-*'
+      bssm cp :/var/log/app.log ./logs --all --filter env=prod
+    """
+    import sys
+    import time
+    from pathlib import Path
+    from rich.markup import escape
+    from .clients import get_client
+    from .transfer import PushTransfer, PullTransfer, TransferEngine
+    
+    pull = source.startswith(':')
+    if pull == destination.startswith(':'):
+        raise click.UsageError("SOURCE 와 DESTINATION 중 하나만 ':' 로 시작하는 원격 경로여야 합니다.")
+    if not (targets or name_pattern or all_instances):
+        raise click.UsageError("--targets, --name 또는 --all 중 하나로 대상을 지정하세요.")
+    remote_path = (source if pull else destination)[1:]
+    if not remote_path.startswith('/'):
+        raise click.BadParameter("원격 경로는 절대 경로여야 합니다. (예: :/var/log/app.log)")
+    if not pull and not os.path.isfile(source):
+        raise click.BadParameter(f"파일을 찾을 수 없습니다: {source}", param_hint='SOURCE')
+    
+    out = get_console()
+    failed = 0
+    jobs = []
+    transfer = None
+    try:
+        loader, account_targets, regions = _prepare_inventory(
+            profile, region, regions=regions, profiles=profiles,
+            role_arn_template=role_arn_template, accounts=accounts,
+            refresh=refresh, full_refresh=full_refresh, offline=offline, filters=filters, out=out
+        )
+        selected = _select_targets(loader.load(account_targets, regions), targets, name_pattern, all_instances)
+        if not selected:
+            out.print("[red]❌ 파일을 주고받을 인스턴스가 없습니다.[/red]")
+            return
+        
+        if pull:
+            transfer = PullTransfer(remote_path, Path(destination))
+            out.print(f"[cyan]📥 인스턴스 {len(selected)}개의 {escape(remote_path)} → {escape(destination)}/<인스턴스 ID>/[/cyan]")
+        else:
+            transfer = PushTransfer(Path(source), remote_path)
+            out.print(
+                f"[cyan]📤 {escape(source)} ({os.path.getsize(source):,}바이트, 압축 {transfer.size:,}바이트, "
+                f"조각 {transfer.chunks}개) → 인스턴스 {len(selected)}개의 {escape(remote_path)}[/cyan]"
+            )
+        if not yes and not click.confirm(f"{len(selected)}개 인스턴스와 파일을 주고받을까요?", err=True):
+            out.print("[yellow]👋 전송이 취소되었습니다.[/yellow]")
+            return
+        
+        ui = get_ui()
+        jobs = transfer.jobs(selected)
+        resumed = sum(1 for job in jobs if job.sent)
+        if resumed:
+            out.print(f"[dim]🔁 인스턴스 {resumed}개는 이전에 받은 조각부터 이어서 전송합니다.[/dim]")
+        
+        def _client_for(instance):
+            return get_client(loader.session_for(instance), 'ssm', instance.region, instance.account)
+        
+        started = time.time()
+        with ui.transfer_progress() as progress:
+            overall = progress.add_task("[bold]전체[/bold]", total=None)
+            tasks = {}
+            # 한 화면에 들어가는 만큼만 인스턴스별 막대 표시 (끝난 인스턴스는 숨긴다)
+            rows = max(1, ui.page_size() - 2)
+            
+            def _refresh():
+                visible = [job for job in jobs if not job.finished][:rows]
+                for job, task in tasks.items():
+                    if job not in visible:
+                        progress.update(task, visible=False)
+                for job in visible:
+                    if job not in tasks:
+                        tasks[job] = progress.add_task(escape(job.instance.name), total=None)
+                    progress.update(tasks[job], completed=job.sent, total=job.total or None, visible=True)
+                progress.update(
+                    overall, completed=sum(job.sent for job in jobs),
+                    total=sum(job.total for job in jobs) or None
+                )
+            
+            reported = set()
+            
+            def _on_progress(job):
+                nonlocal failed
+                if job.finished and job not in reported:
+                    reported.add(job)
+                    failed += job.error is not None
+                    message = f"→ {job.path}" + (" (이미 받은 파일과 같음)" if getattr(job, 'unchanged', False) else "")
+                    if getattr(job, 'cleanup_error', None):
+                        message += f" (원격 임시 파일 정리 실패: {job.cleanup_error})"
+                    ui.show_transfer_result(job, message)
+                _refresh()
+            
+            def _on_checkpoint():
+                if not pull:
+                    transfer.save(jobs)
+            
+            for job in jobs:
+                _on_progress(job)
+            engine = TransferEngine(_client_for, concurrency=concurrency, window=window, timeout=timeout,
+                                    on_progress=_on_progress, on_checkpoint=_on_checkpoint)
+            engine.run(jobs)
+        
+        summary = (
+            f"성공 {len(jobs) - failed}개, 실패 {failed}개 · {time.time() - started:.1f}초, "
+            f"send_command {engine.commands}회, 명령 실행 {engine.invocations}회"
+        )
+        out.print(f"[{'red' if failed else 'green'}]{'❌' if failed else '✅'} {summary}[/]")
+        if failed:
+            out.print("[dim]💡 같은 명령을 다시 실행하면 실패한 인스턴스는 받은 조각부터 이어서 전송합니다.[/dim]")
+        
+    except KeyboardInterrupt:
+        if transfer is not None and not pull and jobs:
+            transfer.save(jobs)
+        out.print("\n[yellow]👋 전송이 중단되었습니다. 같은 명령을 다시 실행하면 이어서 진행합니다.[/yellow]")
+    except Exception as e:
+        out.print(f"[red]❌ 오류가 발생했습니다: {str(e)}[/red]")
+    
+    if failed:
+        sys.exit(1)
+
+@cli.group()
+def tunnel():
+    """백그라운드 포트 포워딩 터널 관리 (up/ls/down)"""
+    pass
+
+@tunnel.command('up')
+@_inventory_options
+@click.argument('instance_id', required=False)
+@click.option('--remote-port', '-r', type=click.IntRange(1, 65535), required=True, help='인스턴스의 포트')
+@click.option('--local-port', '-l', type=click.IntRange(1, 65535),
+              help='로컬 포트 (기본값: 원격 포트와 같은 번호, 사용 중이면 빈 포트)')
+def tunnel_up(profile, region, regions, profiles, role_arn_template, accounts, refresh, full_refresh, offline,
+              filters, instance_id, remote_port, local_port):
+    """백그라운드 터널 시작 (같은 인스턴스/포트 터널이 있으면 재사용)
+    
+    \b
+    예시:
+      bssm tunnel up i-0123456789abcdef0 -r 5432
+      bssm tunnel up -r 3306 -l 13306      (인스턴스 선택 UI)
+    """
+    from .ssm import SSMManager, port_forward_request
+    from .tunnel import TunnelManager, check_local_port, tunnel_key
+    
+    manager = TunnelManager()
+    
+    def _show(entry, reused):
+        label = f"{entry.get('name') or entry['instance_id']}:{entry['remote_port']}"
+        if reused:
+            rprint(f"[green]♻️  기존 터널 재사용: localhost:{entry['local_port']} -> {label}[/green]")
+        else:
+            rprint(f"[green]🔗 터널 시작: localhost:{entry['local_port']} -> {label}[/green]")
+    
+    # 이미 떠 있는 터널은 인증/조회 없이 바로 재사용
+    if instance_id:
+        existing = manager.get(tunnel_key(instance_id, remote_port))
+        if existing is not None:
+            try:
+                check_local_port(existing, local_port)
+            except ValueError as e:
+                rprint(f"[red]❌ {e}[/red]")
+                return
+            _show(existing, True)
+            return
+    
+    try:
+        loader, targets, regions = _prepare_inventory(
+            profile, region, regions=regions, profiles=profiles,
+            role_arn_template=role_arn_template, accounts=accounts,
+            refresh=refresh, full_refresh=full_refresh, offline=offline, filters=filters
+        )
+        
+        if instance_id and len(targets) == 1 and not regions:
+            # 계정/리전이 하나뿐이면 목록 조회 없이 바로 시작
+            session, instance_region, name = targets[0].session, region, None
+            account = targets[0].account
+        else:
+            instances = loader.load(targets, regions)
+            if instance_id:
+                selected = next((i for i in instances if i.instance_id == instance_id), None)
+                if selected is None:
+                    rprint(f"[red]❌ {instance_id} 인스턴스를 찾을 수 없습니다.[/red]")
+                    return
+            else:
+                config = Config()
+                selected = get_ui().select_instance(
+                    instances,
+                    favorites=[fav['instance_id'] for fav in config.get_favorites()],
+                    history=[item['instance_id'] for item in config.get_history()]
+                )
+                if selected is None:
+                    return
+            instance_id, name = selected.instance_id, selected.name
+            session, instance_region = loader.session_for(selected), selected.region or region
+            account = selected.account
+        
+        ssm_manager = SSMManager(session, instance_region, account)
+        env = ssm_manager._session_env()
+        role = {}
+        if role_arn_template and not offline and env:
+            # 감독 프로세스가 재시작할 때마다 --profile 자격증명으로 다시 AssumeRole 한다
+            # (지금 받은 임시 자격증명을 넘기면 만료된 뒤에는 재시작할 수 없다)
+            role = dict(source_profile=profile, role_arn=role_arn_template.format(account_id=account))
+            env = None
+        entry, reused = manager.up(
+            instance_id, remote_port,
+            lambda port: port_forward_request(instance_id, port, remote_port),
+            local_port=local_port,
+            name=name,
+            env=env,
+            # AssumeRole 자격증명(env)을 쓰는 세션은 프로필을 지정하면 환경 변수가 무시된다
+            profile=None if env or role else getattr(session, 'profile_name', None),
+            region=ssm_manager.region,
+            account=account,
+            **role
+        )
+        _show(entry, reused)
+        
+        if not reused:
+            with get_console().status("[bold green]로컬 포트가 열리기를 기다리는 중..."):
+                ready = manager.wait_ready(entry)
+            if ready:
+                rprint("[green]✅ 터널이 준비되었습니다. 종료하려면 [blue]bssm tunnel down[/blue] 을 사용하세요.[/green]")
+            else:
+                rprint(f"[yellow]⏳ 아직 연결되지 않았습니다. 상태: [blue]bssm tunnel ls[/blue], "
+                       f"로그: {manager.log_path(entry['key'])}[/yellow]")
         
     except Exception as e:
         rprint(f"[red]❌ 오류가 발생했습니다: {str(e)}[/red]")
 
+@tunnel.command('ls')
+def tunnel_ls():
+    """실행 중인 터널 목록"""
+    import time
+    from rich.table import Table
+    from .tunnel import TunnelManager
+    
+    entries = TunnelManager().entries()
+    if not entries:
+        rprint("[yellow]📝 실행 중인 터널이 없습니다.[/yellow]")
+        return
+    
+    status_styles = {
+        'running': "[green]running[/green]",
+        'starting': "[yellow]starting[/yellow]",
+        'restarting': "[yellow]restarting[/yellow]",
+        'failed': "[red]failed[/red]",
+        'dead': "[red]dead (정리됨)[/red]",
+    }
+    
+    table = Table(title=f"포트 포워딩 터널 ({len(entries)}개)")
+    table.add_column("ID", style="cyan")
+    table.add_column("이름", style="green")
+    table.add_column("로컬", style="magenta", justify="right")
+    table.add_column("원격", style="magenta", justify="right")
+    table.add_column("상태", style="yellow")
+    table.add_column("재시작", justify="right")
+    table.add_column("실행 시간", style="white", justify="right")
+    
+    for entry in entries:
+        uptime = int(time.time() - entry.get('started_at', time.time()))
+        table.add_row(
+            entry['key'],
+            entry.get('name') or '',
+            str(entry['local_port']),
+            str(entry['remote_port']),
+            status_styles.get(entry.get('status'), entry.get('status') or ''),
+            str(entry.get('restarts', 0)),
+            f"{uptime // 3600}h {uptime % 3600 // 60}m" if uptime >= 3600 else f"{uptime // 60}m {uptime % 60}s"
+        )
+    
+    get_console().print(table)
+    
+    failed = [entry for entry in entries if entry.get('status') == 'failed']
+    for entry in failed:
+        rprint(f"[red]❌ {entry['key']}: {entry.get('error')}[/red]")
+    if failed:
+        rprint("[yellow]💡 다시 로그인하면 감독 프로세스가 자동으로 재시작합니다.[/yellow]")
+
+@tunnel.command('down')
+@click.argument('target', required=False)
+@click.option('--all', 'down_all', is_flag=True, help='모든 터널 종료')
+def tunnel_down(target, down_all):
+    """터널 종료 (TARGET: 터널 ID, 인스턴스 ID, 이름 또는 로컬 포트)"""
+    from .tunnel import TunnelManager
+    
+    manager = TunnelManager()
+    if down_all:
+        entries = manager.entries()
+    elif target:
+        entries = manager.find(target)
+    else:
+        raise click.UsageError("종료할 터널을 지정하거나 --all 을 사용하세요.")
+    
+    if not entries:
+        rprint("[yellow]📝 종료할 터널이 없습니다.[/yellow]")
+        return
+    
+    for entry in entries:
+        if manager.down(entry['key']):
+            rprint(f"[green]✅ 터널 종료: localhost:{entry['local_port']} -> {entry['key']}[/green]")
+
+@tunnel.command('_supervise', hidden=True)
+@click.argument('key')
+def tunnel_supervise(key):
+    """터널 감독 프로세스 (tunnel up 이 실행, 실행 파일 빌드에서 python -m 대신 사용)"""
+    from .tunnel import supervise
+    
+    supervise(key)
+
+@cli.group()
+def agent():
+    """인스턴스 목록을 미리 조회해 두는 백그라운드 agent 관리 (start/status/stop)"""
+    pass
+
+@agent.command('start')
+@click.option('--foreground', is_flag=True, help='백그라운드로 분리하지 않고 현재 터미널에서 실행')
+@click.option('--interval', type=click.IntRange(min=30), help='목록 갱신 주기 (초, 기본값: cache_ttl 설정)')
+def agent_start(foreground, interval):
+    """agent 시작 (list/connect 가 agent 의 목록을 바로 사용)"""
+    import time
+    from .agent import AgentClient, InventoryAgent, agent_supported, spawn_agent
+    from .cache import DEFAULT_TTL
+    
+    if not agent_supported():
+        rprint("[red]❌ 이 환경에서는 Unix 소켓을 사용할 수 없어 agent 를 실행할 수 없습니다.[/red]")
+        return
+    
+    client = AgentClient()
+    status = client.ping()
+    if status is not None:
+        rprint(f"[yellow]💡 bssm agent 가 이미 실행 중입니다. (pid {status['pid']})[/yellow]")
+        return
+    
+    interval = interval or Config().get_setting('cache_ttl', DEFAULT_TTL)
+    if foreground:
+        try:
+            InventoryAgent(interval).serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+    
+    pid = spawn_agent(interval)
+    # 소켓이 열릴 때까지 잠시 대기
+    for _ in range(50):
+        status = client.ping()
+        if status is not None:
+            break
+        time.sleep(0.1)
+    if status is None:
+        rprint(f"[red]❌ agent 시작을 확인하지 못했습니다. (pid {pid}, 로그: ~/.bssm/agent.log)[/red]")
+        return
+    rprint(f"[green]✅ bssm agent 가 시작되었습니다. (pid {status['pid']}, 갱신 주기 {interval}초)[/green]")
+
+@agent.command('_serve', hidden=True)
+@click.argument('interval', type=float)
+def agent_serve(interval):
+    """agent 프로세스 (agent start 가 실행, 실행 파일 빌드에서 python -m 대신 사용)"""
+    from .agent import serve
+    
+    serve(interval)
+
+@agent.command('status')
+def agent_status():
+    """agent 상태 보기"""
+    import time
+    from .agent import AgentClient
+    
+    status = AgentClient().ping()
+    if status is None:
+        rprint("[yellow]📝 bssm agent 가 실행 중이 아닙니다. ([blue]bssm agent start[/blue])[/yellow]")
+        return
+    
+    uptime = int(time.time() - status['started_at'])
+    rprint(f"[green]✅ bssm agent 실행 중[/green] (pid {status['pid']}, {uptime // 60}분 경과, "
+           f"갱신 주기 {status['interval']}초)")
+    for view in status['views']:
+        params = view['params']
+        name = ','.join(params.get('profiles') or []) or params.get('profile') or 'default'
+        regions = params.get('regions') or params.get('region') or '기본 리전'
+        if not isinstance(regions, str):
+            regions = ','.join(regions)
+        fetched = f"{int(time.time() - view['fetched_at'])}초 전 갱신" if view['fetched_at'] else "조회 중"
+        rprint(f"  • {name} / {regions}: {fetched}")
+
+@agent.command('stop')
+def agent_stop():
+    """agent 종료"""
+    from .agent import AgentClient
+    
+    if AgentClient().request('stop') is None:
+        rprint("[yellow]📝 bssm agent 가 실행 중이 아닙니다.[/yellow]")
+        return
+    rprint("[green]✅ bssm agent 를 종료했습니다.[/green]")
+
 @cli.command()
 @click.argument('instance_id')
 def add_favorite(instance_id):
@@ -108,6 +1086,8 @@ def favorites():
         rprint("[yellow]📝 즐겨찾기가 비어있습니다.[/yellow]")
         return
     
+    from rich.table import Table
+    
     table = Table(title="즐겨찾기 인스턴스")
     table.add_column("Instance ID", style="cyan")
     table.add_column("추가 날짜", style="green")
@@ -115,22 +1095,22 @@ def favorites():
     for fav in favs:
         table.add_row(fav['instance_id'], fav['added_at'])
     
-    console.print(table)
+    get_console().print(table)
 
 @cli.command()
 @click.option('--profile', help='테스트할 AWS 프로필')
 def test_auth(profile):
     """AWS 인증 테스트"""
+    from .auth import SSOAuth
+    
     try:
         profile = profile or 'default'
         auth = SSOAuth(profile_name=profile)
         
-        with console.status(f"[bold green]{profile} 프로필로 인증 테스트 중..."):
-            session = auth.get_session()
-            
-            # STS로 현재 자격증명 확인
-            sts = session.client('sts')
-            identity = sts.get_caller_identity()
+        with get_console().status(f"[bold green]{profile} 프로필로 인증 테스트 중..."):
+            # 캐시를 쓰지 않고 STS로 현재 자격증명 확인 (결과는 캐시에 저장)
+            auth.get_session(use_cache=False)
+            identity = auth.identity
         
         rprint(f"[green]✅ 인증 성공![/green]")
         rprint(f"[cyan]Account ID:[/cyan] {identity['Account']}")
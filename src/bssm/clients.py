@@ -0,0 +1,107 @@
+"""
+boto3 세션/클라이언트 공용 풀 (프로세스 공용)
+
+클라이언트를 만들 때마다 botocore 가 서비스 모델(JSON)을 읽고 파싱하며, 새 클라이언트는
+HTTP 연결도 새로 맺는다 (HTTPS 면 TLS 핸드셰이크). 여러 계정/리전을 조회하거나 agent 처럼
+같은 조회를 반복하면 이 비용이 계속 쌓이므로,
+
+- 세션은 (프로필, 리전) 별로, 클라이언트는 (세션, 리전, 서비스) 별로 한 번만 만들어 재사용하고
+- 모든 세션이 서비스 모델 loader 하나를 공유하여 계정이 늘어도 모델은 한 번만 파싱하며
+- 클라이언트의 연결 풀 크기를 (계정, 리전) 별 동시 요청 수 제한과 같게 두어
+  동시에 호출해도 연결을 버리고 다시 맺지 않게 한다.
+
+boto3 클라이언트는 스레드 안전하지만 세션에서 클라이언트를 만드는 과정은 그렇지 않으므로
+생성은 잠금 안에서 한다.
+"""
+
+import threading
+from collections import Counter
+from typing import Optional
+
+from . import trace
+from .ratelimit import MAX_IN_FLIGHT, client_config, get_limiter
+
+# 클라이언트 하나가 유지하는 최대 HTTP 연결 수 (botocore 기본값 10)
+MAX_POOL_CONNECTIONS = MAX_IN_FLIGHT
+
+class ClientPool:
+    """세션/클라이언트 캐시"""
+
+    def __init__(self, max_pool_connections: int = MAX_POOL_CONNECTIONS):
+        self.max_pool_connections = max_pool_connections
+        self.stats = Counter()  # 생성/재사용 횟수 (sessions, clients, clients_reused)
+        self._loader = None
+        self._sessions = {}  # (프로필, 리전) -> 세션
+        self._clients = {}  # (id(세션), 리전, 서비스) -> (세션, 클라이언트)
+        self._lock = threading.RLock()
+
+    def _config(self):
+        from botocore.config import Config as BotoConfig
+        return client_config().merge(BotoConfig(max_pool_connections=self.max_pool_connections))
+
+    def new_session(self, profile: Optional[str] = None, region: Optional[str] = None, **credentials):
+        """서비스 모델 loader 를 공유하는 새 세션 (캐시하지 않음, AssumeRole 자격증명 등)"""
+        import boto3
+        import botocore.session
+        from botocore.loaders import create_loader
+
+        with self._lock:
+            if self._loader is None:
+                self._loader = create_loader()
+            botocore_session = botocore.session.get_session()
+            botocore_session.register_component('data_loader', self._loader)
+            session = boto3.Session(
+                profile_name=profile, region_name=region, botocore_session=botocore_session, **credentials
+            )
+            # boto3 는 세션마다 자기 data 경로를 loader 에 추가하므로 중복 제거
+            search_paths = self._loader.search_paths
+            search_paths[:] = list(dict.fromkeys(search_paths))
+            self.stats['sessions'] += 1
+        return trace.instrument(session)
+
+    def session(self, profile: Optional[str], region: Optional[str] = None):
+        """(프로필, 리전) 세션 (처음 요청할 때 생성)"""
+        key = (profile, region)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._sessions[key] = self.new_session(profile, region)
+            return session
+
+    def invalidate(self, profile: Optional[str]):
+        """프로필의 세션과 클라이언트 삭제 (SSO 재로그인 후 새 자격증명으로 다시 만든다)"""
+        with self._lock:
+            for key in [key for key in self._sessions if key[0] == profile]:
+                session = self._sessions.pop(key)
+                for client_key in [k for k, (s, _) in self._clients.items() if s is session]:
+                    del self._clients[client_key]
+
+    def client(self, session, service: str, region: Optional[str] = None, account: Optional[str] = None):
+        """속도 제한이 적용된 클라이언트 (같은 세션/리전/서비스는 재사용)
+
+        account 를 모르면 세션의 프로필 이름을 대신 사용한다.
+        """
+        region = region or session.region_name
+        # 세션을 함께 보관하므로 id 가 다른 세션에 재사용되지 않는다
+        key = (id(session), region, service)
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is not None:
+                self.stats['clients_reused'] += 1
+                return entry[1]
+            client = session.client(service, region_name=region, config=self._config())
+            account = account or getattr(session, 'profile_name', None) or 'default'
+            get_limiter().attach(client, account)
+            self._clients[key] = (session, client)
+            self.stats['clients'] += 1
+            return client
+
+_pool = ClientPool()
+
+def get_pool() -> ClientPool:
+    """프로세스 공용 ClientPool"""
+    return _pool
+
+def get_client(session, service: str, region: Optional[str] = None, account: Optional[str] = None):
+    """공용 풀에서 클라이언트 가져오기"""
+    return _pool.client(session, service, region, account)
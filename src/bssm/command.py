@@ -0,0 +1,307 @@
+"""
+여러 인스턴스에 명령 실행 (SSM Run Command)
+"""
+
+import hashlib
+import heapq
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Optional, Iterator, Tuple
+
+from botocore.exceptions import ClientError
+
+from .models import Instance
+
+# send_command 한 번에 지정할 수 있는 최대 인스턴스 수 (API 제한)
+SEND_COMMAND_MAX_TARGETS = 50
+# 동시에 실행할 get_command_invocation 호출 수
+MAX_POLL_WORKERS = 16
+# 첫 조회까지의 대기 시간과 최대 조회 간격 (초)
+POLL_INTERVAL = 1.0
+MAX_POLL_INTERVAL = 15.0
+# 아직 끝나지 않은 호출의 조회 간격 증가 배율
+POLL_BACKOFF = 1.5
+# 스로틀링 시 전체 조회 간격에 곱하는 배율의 상한
+MAX_THROTTLE_FACTOR = 8.0
+# timeout 을 주지 않았을 때 명령 실행 제한 시간 (SSM 기본값과 같음, 초)
+DEFAULT_TIMEOUT = 3600
+# 실행 제한 시간이 지난 뒤 결과를 더 기다리는 시간 (초). 이때까지 끝나지 않으면 TimedOut 으로 처리
+DEADLINE_GRACE = 60
+# 호출이 등록되지 않았다는 응답(InvocationDoesNotExist)을 다시 조회하는 최대 횟수
+MAX_MISSING_RETRIES = 10
+
+# 플랫폼별 기본 문서
+DEFAULT_DOCUMENTS = {
+    'Windows': 'AWS-RunPowerShellScript',
+}
+DEFAULT_DOCUMENT = 'AWS-RunShellScript'
+# commands/executionTimeout 파라미터를 받는 문서 (다른 문서는 선언하지 않은 파라미터를 거부한다)
+RUN_COMMAND_DOCUMENTS = {'AWS-RunShellScript', 'AWS-RunPowerShellScript'}
+
+# 아직 실행 중인 상태 (그 외 상태는 완료로 취급)
+PENDING_STATUSES = {'Pending', 'InProgress', 'Delayed', 'Cancelling'}
+THROTTLING_ERROR_CODES = {'Throttling', 'ThrottlingException', 'RequestLimitExceeded', 'TooManyRequestsException'}
+
+def _chunks(items: List, size: int) -> Iterator[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+class CommandResult:
+    """인스턴스 한 개의 명령 실행 결과"""
+
+    __slots__ = ('instance', 'command_id', 'status', 'response_code', 'stdout', 'stderr')
+
+    def __init__(self, instance: Instance, command_id: Optional[str], status: str,
+                 response_code: int = -1, stdout: str = '', stderr: str = ''):
+        self.instance = instance
+        self.command_id = command_id
+        self.status = status
+        self.response_code = response_code
+        self.stdout = stdout
+        self.stderr = stderr
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 'Success' and self.response_code == 0
+
+    @property
+    def output_hash(self) -> str:
+        """상태/종료 코드/출력이 같은 결과를 묶기 위한 해시"""
+        digest = hashlib.sha256()
+        for part in (self.status, str(self.response_code), self.stdout, self.stderr):
+            digest.update(part.encode('utf-8', 'replace'))
+            digest.update(b'\x00')
+        return digest.hexdigest()[:16]
+
+    def to_dict(self) -> Dict:
+        """NDJSON 출력용 dict"""
+        return {
+            'InstanceId': self.instance.instance_id,
+            'Name': self.instance.name,
+            'Account': self.instance.account,
+            'Region': self.instance.region,
+            'CommandId': self.command_id,
+            'Status': self.status,
+            'ResponseCode': self.response_code,
+            'StandardOutput': self.stdout,
+            'StandardError': self.stderr,
+            'OutputHash': self.output_hash,
+        }
+
+class _Invocation:
+    """조회 대기 중인 (명령, 인스턴스)"""
+
+    __slots__ = ('client', 'command_id', 'instance', 'interval', 'deadline', 'missing')
+
+    def __init__(self, client, command_id: str, instance: Instance, interval: float, deadline: float):
+        self.client = client
+        self.command_id = command_id
+        self.instance = instance
+        self.interval = interval
+        self.deadline = deadline  # 이 시각(clock 기준)까지 끝나지 않으면 TimedOut
+        self.missing = 0  # InvocationDoesNotExist 응답 수
+
+class OutputGroups:
+    """출력이 같은 결과 묶음 (처음 나온 순서대로 1번부터 번호 부여)"""
+
+    def __init__(self):
+        self.groups = {}  # 출력 해시 -> [번호, 대표 결과, 결과 목록]
+
+    def add(self, result: CommandResult) -> Tuple[int, bool]:
+        """결과 추가 후 (그룹 번호, 새 그룹 여부) 반환"""
+        key = result.output_hash
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = [len(self.groups) + 1, result, []]
+            group[2].append(result)
+            return group[0], True
+        group[2].append(result)
+        return group[0], False
+
+    def __iter__(self) -> Iterator[Tuple[int, CommandResult, List[CommandResult]]]:
+        """(번호, 대표 결과, 결과 목록) 을 인스턴스가 많은 그룹부터 반환"""
+        return iter(sorted((tuple(group) for group in self.groups.values()), key=lambda g: (-len(g[2]), g[0])))
+
+    def __len__(self):
+        return len(self.groups)
+
+class CommandRunner:
+    """send_command 로 명령을 보내고 get_command_invocation 을 병렬로 조회
+
+    SSM 클라이언트는 호출하는 쪽에서 만들어 넘기므로 (계정/리전마다 하나)
+    botocore Stubber 를 붙인 클라이언트로도 동작을 확인할 수 있다.
+    sleep/clock 도 바꿔 넣을 수 있다.
+    """
+
+    def __init__(self, max_workers: int = MAX_POLL_WORKERS, poll_interval: float = POLL_INTERVAL,
+                 max_poll_interval: float = MAX_POLL_INTERVAL, sleep=time.sleep, clock=time.monotonic):
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.sleep = sleep
+        self.clock = clock
+        self.throttle_factor = 1.0
+        self.throttled = 0  # 스로틀링 응답 수
+
+    def send(self, ssm_client, instances: List[Instance], commands: Optional[List[str]],
+             document_name: Optional[str] = None, timeout: Optional[int] = None,
+             comment: Optional[str] = None,
+             parameters: Optional[Dict[str, List[str]]] = None) -> Tuple[List[_Invocation], List[CommandResult]]:
+        """명령 전송 (플랫폼별 문서, 50개씩 나누어 전송)
+
+        commands 와 executionTimeout 은 RUN_COMMAND_DOCUMENTS 에만 넣는다. 다른 문서에는
+        parameters 로 직접 준 파라미터만 보낸다 (timeout 은 TimeoutSeconds 로만 사용).
+
+        Returns:
+            (조회할 호출 목록, 전송에 실패한 인스턴스의 결과 목록)
+        """
+        by_document = {}
+        for instance in instances:
+            document = document_name or DEFAULT_DOCUMENTS.get(instance.platform, DEFAULT_DOCUMENT)
+            by_document.setdefault(document, []).append(instance)
+
+        invocations = []
+        failures = []
+        for document, document_instances in by_document.items():
+            for chunk in _chunks(document_instances, SEND_COMMAND_MAX_TARGETS):
+                document_parameters = {}
+                if document in RUN_COMMAND_DOCUMENTS:
+                    if commands:
+                        document_parameters['commands'] = commands
+                    if timeout:
+                        document_parameters['executionTimeout'] = [str(timeout)]
+                document_parameters.update(parameters or {})
+                params = {
+                    'InstanceIds': [instance.instance_id for instance in chunk],
+                    'DocumentName': document,
+                }
+                if document_parameters:
+                    params['Parameters'] = document_parameters
+                if timeout:
+                    params['TimeoutSeconds'] = timeout
+                if comment:
+                    params['Comment'] = comment[:100]
+
+                try:
+                    response = ssm_client.send_command(**params)
+                except ClientError as e:
+                    failures.extend(
+                        CommandResult(instance, None, 'SendFailed', stderr=str(e)) for instance in chunk
+                    )
+                    continue
+
+                command_id = response['Command']['CommandId']
+                deadline = self.clock() + (timeout or DEFAULT_TIMEOUT) + DEADLINE_GRACE
+                invocations.extend(
+                    _Invocation(ssm_client, command_id, instance, self.poll_interval, deadline)
+                    for instance in chunk
+                )
+        return invocations, failures
+
+    def _poll(self, invocation: _Invocation) -> Tuple[Optional[CommandResult], Optional[bool]]:
+        """호출 상태 조회
+
+        조회 스레드에서 실행되므로 runner 의 상태는 바꾸지 않고, 스로틀링 여부를 함께 돌려주어
+        iter_results 에서 반영한다.
+
+        Returns:
+            (결과, 스로틀링 여부). 결과는 아직 실행 중이면 None, 스로틀링 여부는 스로틀링이면
+            True, 정상 응답이면 False, 그 밖의 오류면 None
+        """
+        try:
+            response = invocation.client.get_command_invocation(
+                CommandId=invocation.command_id,
+                InstanceId=invocation.instance.instance_id
+            )
+        except ClientError as e:
+            code = e.response.get('Error', {}).get('Code')
+            if code == 'InvocationDoesNotExist':
+                # send_command 직후에는 아직 호출이 등록되지 않았을 수 있다
+                invocation.missing += 1
+                if invocation.missing > MAX_MISSING_RETRIES:
+                    return CommandResult(invocation.instance, invocation.command_id, 'Undeliverable',
+                                         stderr="명령 호출이 인스턴스에 등록되지 않았습니다."), None
+                return None, None
+            if code in THROTTLING_ERROR_CODES:
+                return None, True
+            return CommandResult(invocation.instance, invocation.command_id, 'Failed', stderr=str(e)), None
+
+        status = response.get('Status', 'Pending')
+        if status in PENDING_STATUSES:
+            return None, False
+        return CommandResult(
+            invocation.instance,
+            invocation.command_id,
+            status,
+            response_code=response.get('ResponseCode', -1),
+            stdout=response.get('StandardOutputContent', ''),
+            stderr=response.get('StandardErrorContent', '')
+        ), False
+
+    def iter_results(self, invocations: List[_Invocation]) -> Iterator[CommandResult]:
+        """호출 결과를 끝나는 대로 반환
+
+        호출마다 다음 조회 시각을 두고, 아직 실행 중이면 조회 간격을 POLL_BACKOFF 배씩
+        늘린다 (최대 max_poll_interval). 스로틀링 응답을 받으면 모든 호출의 간격을
+        함께 늘린다. 실행 제한 시간에 DEADLINE_GRACE 를 더한 시각까지 끝나지 않은
+        호출(에이전트가 응답하지 않는 인스턴스 등)은 TimedOut 결과로 반환한다.
+
+        결과를 받는 쪽에서 반복 중에 invocations 에 호출을 추가하면 그 호출도 함께 조회한다
+        (bssm cp 가 끝난 인스턴스에 다음 조각을 바로 보낼 때 사용).
+        """
+        counter = itertools.count()
+        schedule = []
+        taken = 0  # 일정에 넣은 invocations 수
+
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='bssm-run') as executor:
+            while schedule or running or taken < len(invocations):
+                now = self.clock()
+                for invocation in invocations[taken:]:
+                    heapq.heappush(schedule, (now + invocation.interval, next(counter), invocation))
+                taken = len(invocations)
+                while schedule and schedule[0][0] <= now and len(running) < self.max_workers:
+                    invocation = heapq.heappop(schedule)[2]
+                    running[executor.submit(self._poll, invocation)] = invocation
+
+                if not running:
+                    self.sleep(max(0.0, schedule[0][0] - now))
+                    continue
+
+                timeout = None
+                if schedule and len(running) < self.max_workers:
+                    timeout = max(0.0, schedule[0][0] - now)
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    invocation = running.pop(future)
+                    result, throttled = future.result()
+                    if throttled:
+                        self.throttled += 1
+                        self.throttle_factor = min(self.throttle_factor * 2, MAX_THROTTLE_FACTOR)
+                    elif throttled is not None:
+                        # 정상 응답이 오면 스로틀링 배율을 서서히 되돌린다
+                        self.throttle_factor = max(1.0, self.throttle_factor * 0.9)
+                    if result is not None:
+                        yield result
+                        continue
+                    if self.clock() >= invocation.deadline:
+                        yield CommandResult(invocation.instance, invocation.command_id, 'TimedOut',
+                                            stderr="제한 시간 안에 결과를 받지 못했습니다.")
+                        continue
+                    interval = invocation.interval
+                    invocation.interval = min(interval * POLL_BACKOFF, self.max_poll_interval)
+                    heapq.heappush(schedule, (
+                        self.clock() + interval * self.throttle_factor, next(counter), invocation
+                    ))
+
+    def run(self, ssm_client, instances: List[Instance], commands: Optional[List[str]],
+            document_name: Optional[str] = None, timeout: Optional[int] = None,
+            comment: Optional[str] = None,
+            parameters: Optional[Dict[str, List[str]]] = None) -> Iterator[CommandResult]:
+        """명령 전송 후 결과를 끝나는 대로 반환 (클라이언트 하나)"""
+        invocations, failures = self.send(ssm_client, instances, commands, document_name, timeout, comment,
+                                          parameters)
+        yield from failures
+        yield from self.iter_results(invocations)
@@ -1,114 +1,281 @@
 """
 설정 관리
+
+즐겨찾기, 히스토리, 설정값은 ~/.bssm/config.db (SQLite, WAL 모드)에 저장한다.
+여러 bssm 프로세스가 동시에 실행되어도 서로의 변경을 덮어쓰지 않으며,
+인스턴스 ID 로 인덱스 조회가 가능하다. 이전 버전의 config.json 은 처음 실행할 때
+자동으로 가져온 뒤 config.json.migrated 로 이름을 바꾼다.
 """
 
 import json
 import os
+import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+# DB 스키마 버전 (PRAGMA user_version). 스키마 생성과 JSON 마이그레이션을 마친 DB 는 이 값을
+# 가지므로, 이후의 연결은 쓰기 잠금 없이 버전만 읽고 바로 사용한다
+SCHEMA_VERSION = 1
+
+DEFAULT_SETTINGS = {
+    'default_profile': 'default',
+    'max_history': 50,
+    'cache_ttl': 300
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS favorites (
+    instance_id TEXT PRIMARY KEY,
+    added_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS history (
+    instance_id TEXT PRIMARY KEY,
+    instance_name TEXT,
+    connected_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_connected_at ON history (connected_at);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
 
 class Config:
     def __init__(self):
         self.config_dir = Path.home() / '.bssm'
-        self.config_file = self.config_dir / 'config.json'
+        self.config_file = self.config_dir / 'config.json'  # 이전 버전 설정 파일 (마이그레이션 용)
+        self.db_file = self.config_dir / 'config.db'
         self.ensure_config_dir()
-        
+        self._conn = None
+        self._lock = threading.RLock()
+
     def ensure_config_dir(self):
         """설정 디렉토리 생성"""
         self.config_dir.mkdir(exist_ok=True)
-        
-    def load_config(self) -> Dict:
-        """설정 파일 로드"""
+
+    def _connect(self) -> sqlite3.Connection:
+        """DB 연결 (처음 사용할 때 스키마 생성 및 JSON 마이그레이션)"""
+        if self._conn is None:
+            # isolation_level=None: 트랜잭션은 _transaction() 에서 직접 관리
+            conn = sqlite3.connect(
+                str(self.db_file),
+                timeout=10,
+                isolation_level=None,
+                check_same_thread=False
+            )
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn = conn
+            if conn.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+                conn.executescript(SCHEMA)
+                try:
+                    os.chmod(self.db_file, 0o600)
+                except OSError:
+                    pass
+                self._migrate_json()
+        return self._conn
+
+    @contextmanager
+    def _transaction(self):
+        """쓰기 트랜잭션 (BEGIN IMMEDIATE 로 다른 프로세스의 쓰기와 직렬화)"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+
+    def _query(self, sql: str, params=()) -> List[tuple]:
+        with self._lock:
+            return self._connect().execute(sql, params).fetchall()
+
+    def _migrate_json(self):
+        """이전 버전 config.json 을 DB 로 가져오기 (한 번만 실행)
+
+        user_version 이 SCHEMA_VERSION 보다 낮을 때만 호출된다. 여러 프로세스가 동시에 처음
+        연결할 수 있으므로 쓰기 잠금을 잡은 뒤 meta 를 다시 확인한다.
+        """
+        conn = self._conn
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            migrated = conn.execute("SELECT 1 FROM meta WHERE key = 'schema_initialized'").fetchone()
+            if not migrated:
+                for key, value in DEFAULT_SETTINGS.items():
+                    conn.execute(
+                        'INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)',
+                        (key, json.dumps(value))
+                    )
+                legacy = self._read_legacy_json()
+                if legacy:
+                    self._write_all(conn, legacy)
+                conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('schema_initialized', ?)",
+                    (datetime.now().isoformat(),)
+                )
+            conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+        if not migrated and self.config_file.exists():
+            try:
+                self.config_file.replace(self.config_file.with_name('config.json.migrated'))
+            except OSError:
+                pass
+
+    def _read_legacy_json(self) -> Optional[Dict]:
+        """이전 버전 config.json 읽기"""
         if not self.config_file.exists():
-            return {
-                'favorites': [],
-                'history': [],
-                'settings': {
-                    'default_profile': 'default',
-                    'max_history': 50
-                }
-            }
-        
+            return None
         try:
             with open(self.config_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                data = json.load(f)
+            return data if isinstance(data, dict) else None
         except (json.JSONDecodeError, IOError):
-            return self.load_config()  # 기본값 반환
-    
+            return None
+
+    @staticmethod
+    def _write_all(conn: sqlite3.Connection, config: Dict):
+        """설정 전체를 DB 에 기록 (트랜잭션 안에서 호출)"""
+        conn.execute('DELETE FROM favorites')
+        conn.executemany(
+            'INSERT OR IGNORE INTO favorites (instance_id, added_at) VALUES (?, ?)',
+            [(fav['instance_id'], str(fav.get('added_at', ''))) for fav in config.get('favorites', [])]
+        )
+
+        conn.execute('DELETE FROM history')
+        # 히스토리는 최근 항목이 앞에 있으므로 역순으로 넣어 rowid 순서를 맞춘다
+        conn.executemany(
+            'INSERT OR IGNORE INTO history (instance_id, instance_name, connected_at) VALUES (?, ?, ?)',
+            [
+                (item['instance_id'], item.get('instance_name'), str(item.get('connected_at', '')))
+                for item in reversed(config.get('history', []))
+            ]
+        )
+
+        for key, value in config.get('settings', {}).items():
+            conn.execute(
+                'INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)',
+                (key, json.dumps(value, default=str))
+            )
+
+    def load_config(self) -> Dict:
+        """설정 전체 로드 (이전 config.json 과 같은 형태)"""
+        return {
+            'favorites': self.get_favorites(),
+            'history': self.get_history(),
+            'settings': {
+                key: json.loads(value)
+                for key, value in self._query('SELECT key, value FROM settings')
+            }
+        }
+
     def save_config(self, config: Dict):
-        """설정 파일 저장"""
+        """설정 전체 저장"""
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False, default=str)
-        except IOError as e:
+            with self._transaction() as conn:
+                self._write_all(conn, config)
+        except sqlite3.Error as e:
             print(f"설정 저장 실패: {e}")
-    
+
     def add_favorite(self, instance_id: str):
         """즐겨찾기 추가"""
-        config = self.load_config()
-        
-        # 중복 체크
-        for fav in config['favorites']:
-            if fav['instance_id'] == instance_id:
-                return
-        
-        config['favorites'].append({
-            'instance_id': instance_id,
-            'added_at': datetime.now().isoformat()
-        })
-        
-        self.save_config(config)
-    
+        try:
+            with self._transaction() as conn:
+                # 중복은 무시
+                conn.execute(
+                    'INSERT OR IGNORE INTO favorites (instance_id, added_at) VALUES (?, ?)',
+                    (instance_id, datetime.now().isoformat())
+                )
+        except sqlite3.Error as e:
+            print(f"설정 저장 실패: {e}")
+
     def remove_favorite(self, instance_id: str):
         """즐겨찾기 제거"""
-        config = self.load_config()
-        config['favorites'] = [
-            fav for fav in config['favorites'] 
-            if fav['instance_id'] != instance_id
-        ]
-        self.save_config(config)
-    
+        try:
+            with self._transaction() as conn:
+                conn.execute('DELETE FROM favorites WHERE instance_id = ?', (instance_id,))
+        except sqlite3.Error as e:
+            print(f"설정 저장 실패: {e}")
+
     def get_favorites(self) -> List[Dict]:
         """즐겨찾기 목록 반환"""
-        config = self.load_config()
-        return config['favorites']
-    
+        return [
+            {'instance_id': instance_id, 'added_at': added_at}
+            for instance_id, added_at in self._query(
+                'SELECT instance_id, added_at FROM favorites ORDER BY rowid'
+            )
+        ]
+
+    def is_favorite(self, instance_id: str) -> bool:
+        """즐겨찾기 여부 확인"""
+        return bool(self._query('SELECT 1 FROM favorites WHERE instance_id = ?', (instance_id,)))
+
     def add_history(self, instance_id: str, instance_name: str):
         """연결 히스토리 추가"""
-        config = self.load_config()
-        
-        # 기존 항목 제거 (중복 방지)
-        config['history'] = [
-            item for item in config['history'] 
-            if item['instance_id'] != instance_id
-        ]
-        
-        # 새 항목 추가 (맨 앞에)
-        config['history'].insert(0, {
-            'instance_id': instance_id,
-            'instance_name': instance_name,
-            'connected_at': datetime.now().isoformat()
-        })
-        
-        # 최대 개수 제한
-        max_history = config['settings'].get('max_history', 50)
-        config['history'] = config['history'][:max_history]
-        
-        self.save_config(config)
-    
+        max_history = self.get_setting('max_history', 50)
+        try:
+            with self._transaction() as conn:
+                # 기존 항목은 교체 (중복 방지)
+                conn.execute('DELETE FROM history WHERE instance_id = ?', (instance_id,))
+                conn.execute(
+                    'INSERT INTO history (instance_id, instance_name, connected_at) VALUES (?, ?, ?)',
+                    (instance_id, instance_name, datetime.now().isoformat())
+                )
+
+                # 최대 개수 제한
+                conn.execute(
+                    'DELETE FROM history WHERE rowid NOT IN '
+                    '(SELECT rowid FROM history ORDER BY connected_at DESC, rowid DESC LIMIT ?)',
+                    (max_history,)
+                )
+        except sqlite3.Error as e:
+            print(f"설정 저장 실패: {e}")
+
     def get_history(self) -> List[Dict]:
-        """연결 히스토리 반환"""
-        config = self.load_config()
-        return config['history']
-    
+        """연결 히스토리 반환 (최근 항목 먼저)"""
+        return [
+            {'instance_id': instance_id, 'instance_name': instance_name, 'connected_at': connected_at}
+            for instance_id, instance_name, connected_at in self._query(
+                'SELECT instance_id, instance_name, connected_at FROM history '
+                'ORDER BY connected_at DESC, rowid DESC'
+            )
+        ]
+
+    def get_history_entry(self, instance_id: str) -> Optional[Dict]:
+        """인스턴스 ID 로 히스토리 항목 조회"""
+        rows = self._query(
+            'SELECT instance_id, instance_name, connected_at FROM history WHERE instance_id = ?',
+            (instance_id,)
+        )
+        if not rows:
+            return None
+        instance_id, instance_name, connected_at = rows[0]
+        return {'instance_id': instance_id, 'instance_name': instance_name, 'connected_at': connected_at}
+
     def get_setting(self, key: str, default=None):
         """설정값 가져오기"""
-        config = self.load_config()
-        return config['settings'].get(key, default)
-    
+        rows = self._query('SELECT value FROM settings WHERE key = ?', (key,))
+        return json.loads(rows[0][0]) if rows else default
+
     def set_setting(self, key: str, value):
         """설정값 저장"""
-        config = self.load_config()
-        config['settings'][key] = value
-        self.save_config(config)
\ No newline at end of file
+        try:
+            with self._transaction() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)',
+                    (key, json.dumps(value, default=str))
+                )
+        except sqlite3.Error as e:
+            print(f"설정 저장 실패: {e}")
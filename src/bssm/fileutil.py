@@ -0,0 +1,66 @@
+"""
+파일 저장 유틸리티
+"""
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+def atomic_write_json(path: Path, data, mode: int = 0o600):
+    """임시 파일에 쓴 뒤 rename 하여 JSON 파일을 원자적으로 저장"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, default=str)
+        os.chmod(tmp_path, mode)
+        # 같은 디렉토리 내 rename 은 원자적이므로 읽는 쪽은 항상 완전한 파일을 본다
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def read_json(path: Path, default=None):
+    """JSON 파일 읽기 (없거나 손상된 경우 기본값 반환)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+@contextmanager
+def file_lock(path: Path):
+    """프로세스 간 배타적 파일 잠금 (path + '.lock' 파일 사용)"""
+    lock_path = Path(f"{path}.lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    with open(lock_path, 'a+b') as lock_file:
+        if os.name == 'nt':
+            import msvcrt
+            lock_file.seek(0)
+            # LK_LOCK 은 최대 10초간 재시도하므로 그 이상 기다리도록 반복
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,116 @@
+"""
+인스턴스 목록 서버 측 필터 (--filter)
+
+`--filter KEY=VALUE` 를 SSM describe_instance_information 과 EC2 describe_instances 의
+Filters 파라미터로 바꾼다. 조건에 맞지 않는 인스턴스는 AWS 에서 걸러지므로 SSM 페이지 수와
+EC2 응답 크기가 함께 줄어든다.
+
+    name=web-*           Name 태그 (와일드카드 * ? 지원)
+    env=prod             tag:env 와 같음 (예약된 키가 아니면 태그로 취급)
+    tag:team=a,b         태그 값 중 하나
+    platform=Linux       SSM 플랫폼 (Linux, Windows, MacOS)
+    state=running        EC2 인스턴스 상태
+    vpc=vpc-0123         VPC ID
+
+같은 키를 여러 번 쓰거나 값을 콤마로 나열하면 그중 하나와 일치(OR)하고,
+서로 다른 키는 모두 만족(AND)해야 한다.
+"""
+
+import hashlib
+from typing import List, Dict, Iterable
+
+# SSM PlatformTypes 값 (대소문자 구분 없이 입력 받음)
+PLATFORM_TYPES = {'linux': 'Linux', 'windows': 'Windows', 'macos': 'MacOS'}
+INSTANCE_STATES = {'pending', 'running', 'shutting-down', 'terminated', 'stopping', 'stopped'}
+# 태그가 아닌 키
+RESERVED_KEYS = {'name', 'platform', 'state', 'vpc'}
+
+def _has_wildcard(values: Iterable[str]) -> bool:
+    return any('*' in value or '?' in value for value in values)
+
+class InstanceFilter:
+    """--filter 조건 (SSM/EC2 Filters 변환)"""
+
+    def __init__(self, conditions: Dict[str, List[str]]):
+        # 키 -> 값 목록 ('tag:<키>' 또는 예약된 키)
+        self.conditions = conditions
+
+    @classmethod
+    def parse(cls, expressions: Iterable[str]) -> 'InstanceFilter':
+        """KEY=VALUE[,VALUE...] 목록 파싱 (형식이 잘못되면 ValueError)"""
+        conditions = {}
+        for expression in expressions:
+            key, sep, value = expression.partition('=')
+            key = key.strip()
+            values = [item.strip() for item in value.split(',') if item.strip()]
+            if not sep or not key or not values:
+                raise ValueError(f"'{expression}' 형식이 잘못되었습니다. (KEY=VALUE)")
+
+            lowered = key.lower()
+            if lowered == 'platform':
+                unknown = [v for v in values if v.lower() not in PLATFORM_TYPES]
+                if unknown:
+                    raise ValueError(f"알 수 없는 플랫폼: {', '.join(unknown)} (Linux, Windows, MacOS)")
+                values = [PLATFORM_TYPES[v.lower()] for v in values]
+            elif lowered == 'state':
+                values = [v.lower() for v in values]
+                unknown = [v for v in values if v not in INSTANCE_STATES]
+                if unknown:
+                    raise ValueError(f"알 수 없는 상태: {', '.join(unknown)} ({', '.join(sorted(INSTANCE_STATES))})")
+
+            if lowered in RESERVED_KEYS:
+                key = lowered
+            elif not key.startswith('tag:'):
+                key = f"tag:{key}"
+            if key == 'tag:Name':
+                key = 'name'
+
+            existing = conditions.setdefault(key, [])
+            existing.extend(v for v in values if v not in existing)
+        return cls(conditions)
+
+    def __bool__(self):
+        return bool(self.conditions)
+
+    def ssm_filters(self) -> List[Dict]:
+        """describe_instance_information Filters (SSM 은 와일드카드를 지원하지 않는다)"""
+        filters = [{'Key': 'PingStatus', 'Values': ['Online']}]
+        for key, values in sorted(self.conditions.items()):
+            if key == 'platform':
+                filters.append({'Key': 'PlatformTypes', 'Values': values})
+            elif key == 'name' and not _has_wildcard(values):
+                filters.append({'Key': 'tag:Name', 'Values': values})
+            elif key.startswith('tag:') and not _has_wildcard(values):
+                filters.append({'Key': key, 'Values': values})
+        return filters
+
+    def ec2_filters(self) -> List[Dict]:
+        """describe_instances Filters (SSM 에서 이미 거른 조건도 함께 보내 응답을 줄인다)"""
+        filters = []
+        for key, values in sorted(self.conditions.items()):
+            if key == 'name':
+                filters.append({'Name': 'tag:Name', 'Values': values})
+            elif key == 'state':
+                filters.append({'Name': 'instance-state-name', 'Values': values})
+            elif key == 'vpc':
+                filters.append({'Name': 'vpc-id', 'Values': values})
+            elif key.startswith('tag:'):
+                filters.append({'Name': key, 'Values': values})
+        return filters
+
+    def ec2_only(self) -> bool:
+        """SSM 에서 거를 수 없어 EC2 조회 결과로만 제외되는 조건이 있는지"""
+        return any(
+            key in ('state', 'vpc') or (key != 'platform' and _has_wildcard(values))
+            for key, values in self.conditions.items()
+        )
+
+    def expressions(self) -> List[str]:
+        """--filter 형식으로 되돌린 조건 (agent 요청/표시용)"""
+        return [f"{key}={','.join(values)}" for key, values in sorted(self.conditions.items())]
+
+    def cache_key(self) -> str:
+        """조건별 캐시 구분자 (조건이 없으면 빈 문자열)"""
+        if not self.conditions:
+            return ''
+        return hashlib.sha256('\n'.join(self.expressions()).encode('utf-8')).hexdigest()[:12]
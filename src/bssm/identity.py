@@ -0,0 +1,87 @@
+"""
+검증된 AWS 자격증명 정보 로컬 캐시
+"""
+
+import hashlib
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from .fileutil import atomic_write_json, file_lock, read_json
+
+# 만료 시간을 알 수 없는 자격증명(Access Key 등)의 캐시 유효 시간 (초)
+STATIC_IDENTITY_TTL = 60 * 60
+# 자격증명 만료 직전에는 캐시를 쓰지 않도록 두는 여유 시간 (초)
+EXPIRY_MARGIN = 60
+
+class IdentityCache:
+    """프로필 별 get_caller_identity 결과 캐시 (~/.bssm/identity.json, 0600)
+    
+    자격증명(Access Key ID)이 바뀌지 않았고 만료 전이면 STS 호출을 건너뛸 수 있다.
+    Access Key 자체는 저장하지 않고 해시만 비교한다.
+    """
+    
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or Path.home() / '.bssm' / 'identity.json'
+        
+    @staticmethod
+    def _credential_info(session):
+        """세션 자격증명의 (지문, 만료 시각) 반환"""
+        credentials = session.get_credentials()
+        if credentials is None:
+            return None, None
+        
+        # SSO/AssumeRole 자격증명은 여기서 실제로 발급/갱신되며 만료 시각이 채워진다
+        frozen = credentials.get_frozen_credentials()
+        fingerprint = hashlib.sha256(frozen.access_key.encode('utf-8')).hexdigest()[:32]
+        
+        expiry = getattr(credentials, '_expiry_time', None)
+        expires_at = expiry.timestamp() if expiry is not None else time.time() + STATIC_IDENTITY_TTL
+        return fingerprint, expires_at
+    
+    def lookup(self, profile: str, session) -> Optional[Dict]:
+        """유효한 캐시가 있으면 identity 반환"""
+        entry = (read_json(self.path, {}) or {}).get(profile)
+        if not isinstance(entry, dict):
+            return None
+        
+        fingerprint, _ = self._credential_info(session)
+        if fingerprint is None or entry.get('fingerprint') != fingerprint:
+            return None
+        if time.time() >= entry.get('expires_at', 0) - EXPIRY_MARGIN:
+            return None
+        return entry.get('identity')
+    
+    def store(self, profile: str, session, identity: Dict):
+        """검증된 identity 저장"""
+        fingerprint, expires_at = self._credential_info(session)
+        if fingerprint is None:
+            return
+        
+        entry = {
+            'identity': {key: identity[key] for key in ('Account', 'Arn', 'UserId') if key in identity},
+            'fingerprint': fingerprint,
+            'expires_at': expires_at
+        }
+        self._update(profile, entry)
+    
+    def invalidate(self, profile: str):
+        """인증 오류 발생 시 해당 프로필 캐시 삭제"""
+        self._update(profile, None)
+    
+    def _update(self, profile: str, entry: Optional[Dict]):
+        try:
+            with file_lock(self.path):
+                data = read_json(self.path, {})
+                if not isinstance(data, dict):
+                    data = {}
+                if entry is None:
+                    if profile not in data:
+                        return
+                    data.pop(profile)
+                else:
+                    data[profile] = entry
+                atomic_write_json(self.path, data)
+        except OSError:
+            # 캐시는 최적화일 뿐이므로 저장 실패는 무시
+            pass
@@ -0,0 +1,154 @@
+"""
+인스턴스 이름/IP -> ID 로컬 인덱스
+
+`bssm connect <대상>` 이 전체 목록을 조회하지 않고 바로 연결할 수 있도록, 조회했던
+인스턴스를 ~/.bssm/cache/index.db (SQLite) 에 프로필/계정/리전과 함께 기록해 둔다.
+인벤토리 캐시를 저장할 때마다 해당 (프로필, 계정, 리전) 의 행을 교체하므로
+사라진 인스턴스도 다음 조회 때 정리된다.
+
+대상 형식:
+    i-0123456789abcdef0   인스턴스 ID
+    10.0.1.23             사설/공인 IP
+    web-1, 'web-*'        Name 태그 (대소문자 무시, 와일드카드 * ? [] 는 대소문자 구분)
+"""
+
+import fnmatch
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .models import Instance
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS instances (
+    profile TEXT NOT NULL,
+    account TEXT NOT NULL DEFAULT '',
+    region TEXT NOT NULL DEFAULT '',
+    instance_id TEXT NOT NULL,
+    name TEXT,
+    private_ip TEXT,
+    public_ip TEXT,
+    data TEXT NOT NULL,
+    seen_at REAL NOT NULL,
+    PRIMARY KEY (profile, instance_id)
+);
+CREATE INDEX IF NOT EXISTS idx_instances_name ON instances (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_instances_private_ip ON instances (private_ip);
+CREATE INDEX IF NOT EXISTS idx_instances_public_ip ON instances (public_ip);
+CREATE INDEX IF NOT EXISTS idx_instances_instance_id ON instances (instance_id);
+"""
+
+INSTANCE_ID_PATTERN = re.compile(r'^(i|mi)-[0-9a-f]{8,17}$')
+IP_PATTERN = re.compile(r'^\d{1,3}(\.\d{1,3}){3}$')
+
+def target_kind(target: str) -> str:
+    """대상 형식 ('id', 'ip', 'glob', 'name')"""
+    if INSTANCE_ID_PATTERN.match(target):
+        return 'id'
+    if IP_PATTERN.match(target):
+        return 'ip'
+    if any(char in target for char in '*?['):
+        return 'glob'
+    return 'name'
+
+def matches_target(target: str, instance: Instance) -> bool:
+    """인스턴스가 대상과 일치하는지 확인 (인덱스 조회와 같은 규칙)"""
+    kind = target_kind(target)
+    if kind == 'id':
+        return instance.instance_id == target
+    if kind == 'ip':
+        return target in (instance.private_ip, instance.public_ip)
+    if kind == 'glob':
+        return fnmatch.fnmatchcase(instance.name or '', target)
+    return (instance.name or '').lower() == target.lower()
+
+class InstanceIndex:
+    """조회했던 인스턴스의 이름/IP/ID 와 위치(프로필, 계정, 리전) 인덱스"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or Path.home() / '.bssm' / 'cache' / 'index.db'
+        self._conn = None
+        self._lock = threading.RLock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(SCHEMA)
+            try:
+                os.chmod(self.path, 0o600)
+            except OSError:
+                pass
+            self._conn = conn
+        return self._conn
+
+    def replace(self, profile: str, account: Optional[str], region: Optional[str],
+                instances: List[Instance], complete: bool = True):
+        """(프로필, 계정, 리전) 조회 결과 반영
+
+        complete 가 False 면 (--filter 로 일부만 조회한 경우) 기존 행은 지우지 않는다.
+        """
+        now = time.time()
+        rows = [
+            (profile, account or '', region or '', instance.instance_id, instance.name,
+             instance.private_ip, instance.public_ip, json.dumps(instance.to_dict()), now)
+            for instance in instances
+        ]
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    if complete:
+                        conn.execute(
+                            'DELETE FROM instances WHERE profile = ? AND account = ? AND region = ?',
+                            (profile, account or '', region or '')
+                        )
+                    conn.executemany('INSERT OR REPLACE INTO instances VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+                    conn.execute('COMMIT')
+                except BaseException:
+                    conn.execute('ROLLBACK')
+                    raise
+        except sqlite3.Error:
+            # 인덱스는 최적화일 뿐이므로 저장 실패는 무시
+            pass
+
+    def find(self, target: str, profiles: Optional[List[str]] = None,
+             regions: Optional[List[str]] = None) -> List[Tuple[str, Instance]]:
+        """대상과 일치하는 (프로필, 인스턴스) 목록 (최근에 본 순서)
+
+        Args:
+            profiles: 찾을 프로필 (None 이면 전체)
+            regions: 찾을 리전 (None 이면 전체)
+        """
+        kind = target_kind(target)
+        if kind == 'id':
+            where, params = 'instance_id = ?', [target]
+        elif kind == 'ip':
+            where, params = '(private_ip = ? OR public_ip = ?)', [target, target]
+        elif kind == 'glob':
+            where, params = 'name GLOB ?', [target]
+        else:
+            where, params = 'name = ? COLLATE NOCASE', [target]
+
+        for column, values in (('profile', profiles), ('region', regions)):
+            if values:
+                where += f" AND {column} IN ({', '.join('?' * len(values))})"
+                params.extend(values)
+
+        try:
+            with self._lock:
+                rows = self._connect().execute(
+                    f'SELECT profile, data FROM instances WHERE {where} ORDER BY seen_at DESC, name',
+                    params
+                ).fetchall()
+        except sqlite3.Error:
+            return []
+        return [(profile, Instance.from_dict(json.loads(data))) for profile, data in rows]
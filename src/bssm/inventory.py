@@ -0,0 +1,374 @@
+"""
+인스턴스 인벤토리 조회 (캐시, 멀티 리전, 멀티 계정)
+"""
+
+import atexit
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Iterator
+from rich import print as rprint
+from rich.markup import escape
+
+from . import trace
+from .auth import SSOAuth, assume_role, is_auth_error
+from .identity import IdentityCache
+from .cache import InventoryCache
+from .clients import get_client
+from .filters import InstanceFilter
+from .index import InstanceIndex
+from .models import Instance
+from .ratelimit import throttle_count
+from .ssm import SSMManager, list_regions, iter_instances_concurrently
+
+# 동시에 인증할 최대 계정 수
+MAX_AUTH_WORKERS = 8
+# 동시에 조회할 최대 (계정, 리전) 수
+MAX_FETCH_WORKERS = 16
+# 마지막 전체 조회 후 이 시간(초)이 지나면 다시 전체 조회 (증분 동기화로 저장해도 기준 시각은 그대로)
+FULL_SYNC_INTERVAL = 24 * 60 * 60
+# 종료할 때 백그라운드 캐시 갱신을 기다리는 최대 시간 (초). 끝나지 않은 갱신은 버리고
+# (캐시는 원자적으로 교체되므로 중간 상태로 남지 않는다) 다음 실행에서 다시 갱신한다
+REFRESH_EXIT_TIMEOUT = 2.0
+
+_refresh_threads = []
+
+def _wait_for_refreshes():
+    """종료 시 백그라운드 캐시 갱신을 최대 REFRESH_EXIT_TIMEOUT 초 기다림"""
+    deadline = time.monotonic() + REFRESH_EXIT_TIMEOUT
+    for thread in _refresh_threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+
+atexit.register(_wait_for_refreshes)
+
+class AccountTarget:
+    """조회 대상 계정 (프로필 또는 AssumeRole 세션)"""
+    
+    def __init__(self, label: str, session=None, account: Optional[str] = None,
+                 error: Optional[Exception] = None):
+        self.label = label  # 캐시 키 및 표시용 이름 (프로필 이름 등)
+        self.session = session
+        self.account = account
+        self.error = error
+
+def authenticate_profiles(profiles: List[str], region=None, offline: bool = False,
+                          max_workers: int = MAX_AUTH_WORKERS) -> List[AccountTarget]:
+    """여러 프로필을 병렬로 인증 (계정별 오류 격리, SSO 재로그인 없음)"""
+    def _authenticate(profile):
+        auth = SSOAuth(profile_name=profile, region=region)
+        try:
+            if offline:
+                return AccountTarget(profile, auth.create_session())
+            session = auth.authenticate()
+            return AccountTarget(profile, session, auth.identity['Account'])
+        except Exception as e:
+            return AccountTarget(profile, error=e)
+    
+    workers = max(1, min(max_workers, len(profiles)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bssm-auth') as executor:
+        return [target for target in executor.map(_authenticate, profiles)]
+
+def assume_role_targets(base_session, role_arn_template: str, account_ids: List[str],
+                        offline: bool = False,
+                        max_workers: int = MAX_AUTH_WORKERS) -> List[AccountTarget]:
+    """기본 세션에서 계정별 역할을 병렬로 AssumeRole (계정별 오류 격리)"""
+    base_label = base_session.profile_name
+    region = base_session.region_name
+    sts = None if offline else get_client(base_session, 'sts')
+    
+    def _assume(account_id):
+        label = f"{base_label}@{account_id}"
+        if offline:
+            return AccountTarget(label, base_session, account_id)
+        try:
+            role_arn = role_arn_template.format(account_id=account_id)
+            return AccountTarget(label, assume_role(sts, role_arn, region), account_id)
+        except Exception as e:
+            return AccountTarget(label, account=account_id, error=e)
+    
+    workers = max(1, min(max_workers, len(account_ids)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bssm-auth') as executor:
+        return [target for target in executor.map(_assume, account_ids)]
+
+class InventoryLoader:
+    """여러 계정/리전의 인스턴스 목록을 캐시 우선으로 조회 (stale-while-revalidate)"""
+    
+    def __init__(self, cache: InventoryCache, refresh: bool = False, offline: bool = False,
+                 console=None, incremental: bool = True, filters: Optional[InstanceFilter] = None,
+                 full_sync_interval: float = FULL_SYNC_INTERVAL):
+        self.cache = cache
+        self.refresh = refresh
+        self.offline = offline
+        self.console = console
+        self.incremental = incremental
+        self.full_sync_interval = full_sync_interval  # 증분 동기화 중에도 이 주기(초)로 전체 조회
+        self.filters = filters  # 서버 측 필터 (cache 도 같은 조건으로 구분되어 있어야 한다)
+        self.sessions = {}  # 계정 ID -> 세션
+        self.index = InstanceIndex()  # connect <대상> 용 이름/IP -> ID 인덱스
+        self.errors = []  # 마지막 조회의 오류 메시지
+        self.failed = set()  # 마지막 조회에서 실패한 (계정, 리전)
+        
+    def _resolve_regions(self, targets: List[AccountTarget], regions) -> Dict[AccountTarget, List[str]]:
+        """계정별 조회 대상 리전 결정"""
+        if regions == 'all':
+            # 계정마다 활성화된 리전이 다를 수 있으므로 병렬로 조회
+            workers = max(1, min(MAX_AUTH_WORKERS, len(targets)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bssm-regions') as executor:
+                resolved = executor.map(
+                    lambda target: list_regions(target.session, offline=self.offline),
+                    targets
+                )
+                return dict(zip(targets, resolved))
+        
+        return {
+            target: regions or [target.session.region_name]
+            for target in targets
+        }
+    
+    def _load_entry(self, target: AccountTarget, region: str) -> Optional[Dict]:
+        if target.account is None:
+            # 오프라인에서 프로필만 아는 경우
+            return self.cache.find_latest(target.label, region)
+        return self.cache.load(target.label, target.account, region)
+    
+    def _save(self, target: AccountTarget, manager: SSMManager, instances: List[Instance]):
+        for instance in instances:
+            instance.account = target.account
+        with trace.span('cache.write', region=manager.region, rows=len(instances)):
+            self.cache.save(
+                target.label, target.account, manager.region, instances,
+                fingerprints=getattr(manager, 'fingerprints', None),
+                **getattr(manager, 'sync_state', {})
+            )
+            self.index.replace(target.label, target.account, manager.region, instances,
+                               complete=not self.filters)
+    
+    def _sync_fn(self, snapshots: Dict[SSMManager, Optional[Dict]]):
+        """manager 별 조회 방식 결정 (스냅샷이 있으면 증분 동기화, 없으면 전체 조회)
+        
+        증분 동기화 회차와 마지막 전체 조회 시각은 manager.sync_state 에 두었다가 캐시에 저장한다.
+        """
+        def _iter(manager):
+            entry = snapshots.get(manager)
+            if (entry is None or not self.incremental
+                    or self.cache.full_sync_age(entry) > self.full_sync_interval):
+                manager.sync_state = {}
+                return manager.iter_instances()
+            sync_round = entry.get('sync_round', 0) + 1
+            manager.sync_state = {
+                'full_synced_at': entry.get('full_synced_at', entry.get('fetched_at')),
+                'sync_round': sync_round,
+            }
+            return manager.iter_sync(entry['instances'], entry.get('fingerprints') or {},
+                                     sync_round=sync_round)
+        return _iter
+    
+    def _refresh_in_background(self, snapshots: Dict[SSMManager, Optional[Dict]],
+                               targets: Dict[SSMManager, AccountTarget]):
+        """백그라운드 캐시 갱신 (실패한 리전은 기존 캐시 유지, 실패는 경고로 출력)"""
+        failures = []
+        try:
+            collected = {manager: [] for manager in targets}
+            counts = {}
+            for manager, instance, error in iter_instances_concurrently(
+                    list(targets), MAX_FETCH_WORKERS, self._sync_fn(snapshots)):
+                target = targets[manager]
+                if error is not None:
+                    if is_auth_error(error):
+                        IdentityCache().invalidate(target.label)
+                    failures.append(f"[{target.label}] [{manager.region}] {error}")
+                elif instance is None:
+                    region_instances = collected.pop(manager)
+                    region_instances.sort(key=lambda x: x.name.lower())
+                    self._save(target, manager, region_instances)
+                    counts.setdefault(target, {})[manager.region] = len(region_instances)
+                else:
+                    collected[manager].append(instance)
+            for target, target_counts in counts.items():
+                self.cache.update_empty_regions(target.label, target.account, target_counts)
+        except Exception as e:
+            failures.append(str(e))
+        for failure in failures:
+            self._print(
+                f"[yellow]⚠️  백그라운드 목록 갱신 실패, 이전 캐시를 계속 사용합니다: {escape(failure)}[/yellow]"
+            )
+    
+    def _print(self, message: str):
+        """상태 메시지 출력 (NDJSON 출력 시에는 stderr 콘솔 사용)"""
+        if self.console is not None:
+            self.console.print(message)
+        else:
+            rprint(message)
+    
+    def _show_cache_age(self, entries: List[Dict]):
+        """캐시 경과 시간 표시"""
+        age = int(max(self.cache.age(entry) for entry in entries))
+        count = sum(len(entry['instances']) for entry in entries)
+        self._print(f"[dim]💾 {age}초 전에 저장된 인스턴스 목록 ({count}개)[/dim]")
+    
+    def session_for(self, instance: Instance):
+        """인스턴스가 속한 계정의 세션"""
+        session = self.sessions.get(instance.account)
+        if session is None and self.sessions:
+            session = next(iter(self.sessions.values()))
+        return session
+    
+    def load(self, targets: List[AccountTarget], regions=None) -> List[Instance]:
+        """인스턴스 목록 조회 (이름, 계정, 리전 순 정렬)
+        
+        Args:
+            targets: 조회 대상 계정 목록
+            regions: None(세션 기본 리전), 'all' 또는 리전 목록
+        """
+        with trace.span('inventory.load', accounts=len(targets)) as span:
+            if self.console is not None:
+                with self.console.status("[bold green]인스턴스 목록을 가져오는 중..."):
+                    instances = list(self.iter_load(targets, regions))
+            else:
+                instances = list(self.iter_load(targets, regions))
+            span.set(rows=len(instances))
+        
+        with trace.span('inventory.sort', rows=len(instances)):
+            instances.sort(key=lambda x: (x.name.lower(), x.account or '', x.region or ''))
+        return instances
+    
+    def iter_load(self, targets: List[AccountTarget], regions=None) -> Iterator[Instance]:
+        """인스턴스를 조회되는 대로 반환 (캐시된 항목 먼저, 정렬되지 않음)"""
+        multi_account = len(targets) > 1
+        self.errors = []
+        self.failed = set()
+        
+        # 인증 실패한 계정은 건너뛰고 나머지 계정은 계속 조회
+        for target in targets:
+            if target.error is not None:
+                self.errors.append(f"[{target.label}] 인증 실패: {str(target.error)}")
+                self._print(f"[red]❌ {escape(f'[{target.label}]')} 인증 실패: {str(target.error)}[/red]")
+        targets = [target for target in targets if target.error is None]
+        if not targets:
+            return
+        
+        for target in targets:
+            self.sessions.setdefault(target.account, target.session)
+        
+        with trace.span('inventory.resolve_regions'):
+            target_regions = self._resolve_regions(targets, regions)
+        multi_region = any(len(r) > 1 for r in target_regions.values())
+        
+        if multi_region and not self.refresh and not self.offline:
+            # 최근에 인스턴스가 없었던 리전은 건너뛰기
+            skipped = 0
+            for target in targets:
+                empty = self.cache.get_empty_regions(target.label, target.account)
+                before = len(target_regions[target])
+                target_regions[target] = [r for r in target_regions[target] if r not in empty]
+                skipped += before - len(target_regions[target])
+            if skipped:
+                self._print(f"[dim]⏭️  인스턴스가 없는 리전 {skipped}개를 건너뜁니다. (--refresh 로 다시 확인)[/dim]")
+        
+        cached_entries = []
+        stale = []
+        missing = []
+        with trace.span('cache.read'):
+            for target in targets:
+                for region in target_regions[target]:
+                    entry = self._load_entry(target, region)
+                    if entry is None or self.refresh:
+                        # --refresh 에서도 기존 캐시는 증분 동기화 스냅샷으로 사용
+                        if not self.offline:
+                            missing.append((target, region, entry))
+                        continue
+                    cached_entries.append(entry)
+                    if not self.cache.is_fresh(entry) and not self.offline:
+                        stale.append((target, region, entry))
+        
+        if cached_entries:
+            self._show_cache_age(cached_entries)
+        elif self.offline:
+            self._print("[red]❌ 캐시된 인스턴스 목록이 없습니다. --offline 없이 먼저 실행해주세요.[/red]")
+            return
+        
+        if stale:
+            # 오래된 캐시는 바로 보여주고 최신 목록은 백그라운드에서 갱신
+            # (boto3 세션은 스레드 안전하지 않으므로 클라이언트는 여기서 생성)
+            self._print("[dim]🔄 백그라운드에서 인스턴스 목록을 갱신합니다.[/dim]")
+            managers = {
+                SSMManager(target.session, region, target.account, self.filters): (target, entry)
+                for target, region, entry in stale
+            }
+            # 데몬 스레드로 실행하고 종료 시에는 _wait_for_refreshes 에서 잠깐만 기다린다
+            thread = threading.Thread(
+                target=self._refresh_in_background,
+                args=(
+                    {manager: entry for manager, (_, entry) in managers.items()},
+                    {manager: target for manager, (target, _) in managers.items()}
+                ),
+                name='bssm-cache-refresh',
+                daemon=True
+            )
+            _refresh_threads[:] = [t for t in _refresh_threads if t.is_alive()] + [thread]
+            thread.start()
+        
+        for entry in cached_entries:
+            yield from entry['instances']
+        
+        if not missing:
+            return
+        
+        throttled = throttle_count()
+        snapshots = {}
+        managers = {}
+        for target, region, entry in missing:
+            manager = SSMManager(target.session, region, target.account, self.filters)
+            managers[manager] = target
+            snapshots[manager] = entry
+        collected = {manager: [] for manager in managers}
+        counts = {}
+        fetched = 0
+        sync_stats = {'described': 0, 'unchanged': 0, 'removed': 0}
+        synced = False
+        for manager, instance, error in iter_instances_concurrently(
+                list(managers), MAX_FETCH_WORKERS, self._sync_fn(snapshots)):
+            target = managers[manager]
+            if error is not None:
+                if is_auth_error(error):
+                    # 캐시된 자격증명 정보를 믿을 수 없으므로 다음 실행에서 다시 검증
+                    IdentityCache().invalidate(target.label)
+                prefix = ""
+                if multi_account:
+                    prefix += f"[{target.label}] "
+                if multi_region:
+                    prefix += f"[{manager.region}] "
+                self.failed.add((target.account, manager.region))
+                self.errors.append(f"{prefix}인스턴스 목록을 가져오는데 실패했습니다: {str(error)}")
+                self._print(f"[red]❌ {escape(prefix)}인스턴스 목록을 가져오는데 실패했습니다: {str(error)}[/red]")
+                continue
+            if instance is None:
+                # 해당 계정/리전 조회 완료
+                region_instances = collected.pop(manager)
+                region_instances.sort(key=lambda x: x.name.lower())
+                self._save(target, manager, region_instances)
+                counts.setdefault(target, {})[manager.region] = len(region_instances)
+                if snapshots[manager] is not None and hasattr(manager, 'sync_stats'):
+                    synced = True
+                    for key, value in manager.sync_stats.items():
+                        sync_stats[key] += value
+                continue
+            
+            instance.account = target.account
+            collected[manager].append(instance)
+            fetched += 1
+            yield instance
+        
+        if multi_region:
+            for target, target_counts in counts.items():
+                self.cache.update_empty_regions(target.label, target.account, target_counts)
+        if counts:
+            self._print(f"[green]✅ 총 {fetched}개의 SSM 연결 가능한 인스턴스를 찾았습니다.[/green]")
+        throttled = throttle_count() - throttled
+        if throttled:
+            self._print(f"[dim]🐢 API 스로틀링 {throttled}회 (호출 속도를 낮춰 재시도했습니다)[/dim]")
+        if synced and self.incremental:
+            self._print(
+                f"[dim]🔁 증분 동기화: EC2 조회 {sync_stats['described']}개, "
+                f"재사용 {sync_stats['unchanged']}개, 제거 {sync_stats['removed']}개[/dim]"
+            )
@@ -0,0 +1,73 @@
+"""
+인스턴스 데이터 모델
+"""
+
+import sys
+from typing import Dict, Optional
+
+# (속성 이름, 캐시/NDJSON 에서 사용하는 키)
+INSTANCE_FIELDS = (
+    ('instance_id', 'InstanceId'),
+    ('name', 'Name'),
+    ('state', 'State'),
+    ('instance_type', 'InstanceType'),
+    ('private_ip', 'PrivateIpAddress'),
+    ('public_ip', 'PublicIpAddress'),
+    ('launch_time', 'LaunchTime'),
+    ('ssm_status', 'SSMStatus'),
+    ('platform', 'Platform'),
+    ('region', 'Region'),
+    ('account', 'Account'),
+    ('tags', 'Tags'),
+)
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """반복되는 값(상태, 타입, 리전 등)은 같은 문자열 객체를 공유"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+class Instance:
+    """SSM 연결 가능한 인스턴스 한 개
+
+    인스턴스 수만큼 만들어지므로 dict 대신 __slots__ 를 사용하고,
+    값의 종류가 적은 필드는 intern 하여 메모리를 줄인다.
+    """
+
+    __slots__ = tuple(attr for attr, _ in INSTANCE_FIELDS)
+
+    def __init__(self, instance_id: str, name: str, state: str, instance_type: str,
+                 private_ip: str = 'N/A', public_ip: str = 'N/A', launch_time: Optional[str] = None,
+                 ssm_status: str = 'Online', platform: str = 'Unknown',
+                 region: Optional[str] = None, account: Optional[str] = None,
+                 tags: Optional[Dict[str, str]] = None):
+        self.instance_id = instance_id
+        self.name = name
+        self.state = _intern(state)
+        self.instance_type = _intern(instance_type)
+        self.private_ip = private_ip
+        self.public_ip = public_ip
+        self.launch_time = launch_time
+        self.ssm_status = _intern(ssm_status)
+        self.platform = _intern(platform)
+        self.region = _intern(region)
+        self.account = _intern(account)
+        # 태그 키 -> 값 (None 이면 태그를 저장하지 않던 이전 버전 캐시의 행)
+        self.tags = None if tags is None else {_intern(key): _intern(value) for key, value in tags.items()}
+
+    def __repr__(self):
+        return f"Instance({self.instance_id!r}, name={self.name!r}, region={self.region!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, Instance):
+            return NotImplemented
+        return all(getattr(self, attr) == getattr(other, attr) for attr in self.__slots__)
+
+    __hash__ = None
+
+    def to_dict(self) -> Dict:
+        """캐시 저장/NDJSON 출력용 dict (이전 버전과 같은 키)"""
+        return {key: getattr(self, attr) for attr, key in INSTANCE_FIELDS}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Instance':
+        """to_dict() 결과(캐시 항목)에서 복원"""
+        return cls(**{attr: data.get(key) for attr, key in INSTANCE_FIELDS if key in data})
@@ -0,0 +1,341 @@
+"""
+인스턴스 목록 로컬 조회 (--where)
+
+조회된(또는 캐시된) 인벤토리를 AWS 호출 없이 태그와 필드로 거른다. --filter 가 AWS 에
+보내는 조건이라면 --where 는 이미 가진 목록에서 찾는 조건이다.
+
+    tag:env=prod                 태그 값 (tag: 는 생략 가능, 예약된 키가 아니면 태그로 취급)
+    service=pay*                 * 로 끝나면 접두사 일치
+    tag:team=payments,search     값 중 하나 (OR)
+    tag:backup                   태그가 있는지 (값 무관, tag:backup=* 와 같음)
+    name=web-*  state=running  type=c6g*  platform=linux  region=us-east-1
+    account=1234  ip=10.1.*  id=i-0123  ssm=online
+
+조건은 AND, OR, NOT 과 괄호로 묶고, 연산자 없이 나열하면 AND 로 본다.
+--where 를 여러 번 주면 모두 만족해야 한다. 태그 키는 AWS 와 같이 대소문자를 구분하고,
+값과 연산자, 필드 이름은 구분하지 않는다.
+
+    bssm list --where 'tag:env=prod AND (service=pay* OR team=search) AND NOT state=stopped'
+"""
+
+import re
+from bisect import bisect_left
+from typing import List, Dict, Iterable, Optional, Tuple, Union
+
+from . import trace
+from .models import Instance
+
+# 필드 키 -> Instance 속성 (ip 는 사설/공인 IP 중 하나와 일치)
+FIELD_KEYS = {
+    'name': ('name',),
+    'id': ('instance_id',),
+    'instance_id': ('instance_id',),
+    'state': ('state',),
+    'type': ('instance_type',),
+    'instance_type': ('instance_type',),
+    'platform': ('platform',),
+    'region': ('region',),
+    'account': ('account',),
+    'ip': ('private_ip', 'public_ip'),
+    'private_ip': ('private_ip',),
+    'public_ip': ('public_ip',),
+    'ssm': ('ssm_status',),
+}
+OPERATORS = {'and', 'or', 'not'}
+
+TOKEN_PATTERN = re.compile(r"""\s*(\(|\)|(?:[^\s()"']|"[^"]*"|'[^']*')+)""")
+QUOTED_PATTERN = re.compile(r""""([^"]*)"|'([^']*)'""")
+
+def _unquote(token: str) -> str:
+    return QUOTED_PATTERN.sub(lambda m: m.group(1) if m.group(1) is not None else m.group(2), token)
+
+def _tokenize(expression: str) -> List[str]:
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = TOKEN_PATTERN.match(expression, position)
+        if match is None:
+            raise ValueError(f"'{expression}' 의 따옴표가 닫히지 않았습니다.")
+        tokens.append(match.group(1))
+        position = match.end()
+    return tokens
+
+class Term:
+    """KEY=VALUE[,VALUE...] 조건 하나
+
+    keys 는 인덱스 키 ('tag:<키>' 또는 Instance 속성), values 는 소문자로 바꾼 값이고
+    prefixes 는 * 로 끝난 값의 접두사 ('' 이면 값이 있기만 하면 일치).
+    """
+
+    __slots__ = ('keys', 'values', 'prefixes')
+
+    def __init__(self, keys: Tuple[str, ...], values: List[str], prefixes: List[str]):
+        self.keys = keys
+        self.values = values
+        self.prefixes = prefixes
+
+    @classmethod
+    def parse(cls, token: str) -> 'Term':
+        key, sep, value = _unquote(token).partition('=')
+        key = key.strip()
+        if not key:
+            raise ValueError(f"'{token}' 형식이 잘못되었습니다. (KEY=VALUE)")
+
+        if key.startswith('tag:'):
+            keys = (key,)
+        elif key.lower() in FIELD_KEYS:
+            keys = FIELD_KEYS[key.lower()]
+        else:
+            keys = (f"tag:{key}",)
+        if keys == ('tag:',):
+            raise ValueError(f"'{token}' 에 태그 키가 없습니다.")
+
+        if not sep:
+            if not keys[0].startswith('tag:'):
+                raise ValueError(f"'{key}' 는 태그가 아니므로 값이 필요합니다. ({key}=VALUE)")
+            return cls(keys, [], [''])
+
+        items = [item.strip().lower() for item in value.split(',') if item.strip()]
+        if not items:
+            raise ValueError(f"'{token}' 에 값이 없습니다. (KEY=VALUE)")
+        values = [item for item in items if not item.endswith('*')]
+        prefixes = [item[:-1] for item in items if item.endswith('*')]
+        return cls(keys, values, prefixes)
+
+    def _candidates(self, instance: Instance) -> Iterable[Optional[str]]:
+        for key in self.keys:
+            if key.startswith('tag:'):
+                yield (instance.tags or {}).get(key[4:])
+            else:
+                yield getattr(instance, key)
+
+    def matches(self, instance: Instance) -> bool:
+        for candidate in self._candidates(instance):
+            if candidate is None:
+                continue
+            candidate = str(candidate).lower()
+            if candidate in self.values or any(candidate.startswith(prefix) for prefix in self.prefixes):
+                return True
+        return False
+
+class Query:
+    """--where 조건 (AND/OR/NOT 트리)
+
+    트리의 노드는 Term 또는 ('and' | 'or', [노드...]), ('not', 노드) 이다.
+    """
+
+    def __init__(self, root=None):
+        self.root = root
+
+    @classmethod
+    def parse(cls, expressions: Iterable[str]) -> 'Query':
+        """--where 식 목록 파싱 (여러 개면 AND, 형식이 잘못되면 ValueError)"""
+        nodes = [_Parser(expression).parse() for expression in expressions if expression.strip()]
+        if not nodes:
+            return cls()
+        return cls(nodes[0] if len(nodes) == 1 else ('and', nodes))
+
+    def __bool__(self):
+        return self.root is not None
+
+    @property
+    def uses_tags(self) -> bool:
+        """태그 조건이 있는지 (태그 없이 캐시된 행(tags 가 None)은 태그 조건에 맞지 않는다)"""
+        return any(key.startswith('tag:') for term in _terms(self.root) for key in term.keys)
+
+    def matches(self, instance: Instance) -> bool:
+        """인스턴스 한 개가 조건을 만족하는지 (인덱스 없이 스트리밍 출력할 때 사용)"""
+        return self.root is None or _matches(self.root, instance)
+
+def _terms(node) -> Iterable[Term]:
+    if node is None:
+        return
+    if isinstance(node, Term):
+        yield node
+        return
+    op, operand = node
+    for child in ([operand] if op == 'not' else operand):
+        yield from _terms(child)
+
+def _matches(node, instance: Instance) -> bool:
+    if isinstance(node, Term):
+        return node.matches(instance)
+    op, operand = node
+    if op == 'not':
+        return not _matches(operand, instance)
+    if op == 'and':
+        return all(_matches(child, instance) for child in operand)
+    return any(_matches(child, instance) for child in operand)
+
+class _Parser:
+    """재귀 하강 파서 (우선순위 NOT > AND > OR)"""
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.tokens = _tokenize(expression)
+        self.position = 0
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _next(self) -> Optional[str]:
+        token = self._peek()
+        self.position += 1
+        return token
+
+    def _is(self, token: Optional[str], operator: str) -> bool:
+        return token is not None and token.lower() == operator
+
+    def parse(self):
+        node = self._or()
+        if self._peek() is not None:
+            raise ValueError(f"'{self.expression}' 에서 '{self._peek()}' 를 해석할 수 없습니다.")
+        return node
+
+    def _or(self):
+        children = [self._and()]
+        while self._is(self._peek(), 'or'):
+            self._next()
+            children.append(self._and())
+        return children[0] if len(children) == 1 else ('or', children)
+
+    def _and(self):
+        children = [self._not()]
+        while True:
+            token = self._peek()
+            if token is None or token == ')' or self._is(token, 'or'):
+                break
+            if self._is(token, 'and'):
+                self._next()
+            children.append(self._not())
+        return children[0] if len(children) == 1 else ('and', children)
+
+    def _not(self):
+        token = self._next()
+        if token is None:
+            raise ValueError(f"'{self.expression}' 가 조건 없이 끝났습니다.")
+        if self._is(token, 'not'):
+            return ('not', self._not())
+        if token == '(':
+            node = self._or()
+            if self._next() != ')':
+                raise ValueError(f"'{self.expression}' 의 괄호가 닫히지 않았습니다.")
+            return node
+        if token == ')' or token.lower() in OPERATORS:
+            raise ValueError(f"'{self.expression}' 에서 '{token}' 앞에 조건이 필요합니다.")
+        return Term.parse(token)
+
+class QueryIndex:
+    """인벤토리 한 개에 대한 태그/필드 역색인 (키 -> 값 -> 행 위치)
+
+    키별 posting list 는 처음 조회할 때 한 번 만든다. 10만 행 기준 태그 키 하나에 20ms 안팎
+    (이름/IP 처럼 값이 모두 다른 키는 약 0.1초) 이고, 이후 같은 키의 조건은 posting list 를
+    합치기만 하므로 ms 단위로 끝난다.
+    결과는 원래 목록의 순서를 유지한다.
+    """
+
+    def __init__(self, instances: List[Instance]):
+        self.instances = instances
+        self.postings = {}  # 인덱스 키 -> 소문자 값 -> 행 위치 (하나면 int, 여러 개면 list)
+        self._sorted_values = {}  # 인덱스 키 -> 정렬된 값 (접두사 조회용)
+
+    def _postings(self, key: str) -> Dict[str, Union[int, List[int]]]:
+        postings = self.postings.get(key)
+        if postings is not None:
+            return postings
+
+        postings = {}
+        with trace.span('query.build_index', key=key, rows=len(self.instances)):
+            if key.startswith('tag:'):
+                tag = key[4:]
+                values = ((instance.tags or {}).get(tag) for instance in self.instances)
+            else:
+                values = (getattr(instance, key) for instance in self.instances)
+            # 원래 값으로 먼저 모은 뒤 소문자로 합친다 (intern 된 값이 많아 변환 횟수가 줄어든다)
+            # 행 하나뿐인 값(이름, IP 등)은 리스트 대신 위치만 저장하여, 10만 개의 리스트를
+            # 만들면서 GC 가 반복해서 도는 것을 피한다
+            by_value = {}
+            for position, value in enumerate(values):
+                if value is None:
+                    continue
+                posting = by_value.get(value)
+                if posting is None:
+                    by_value[value] = position
+                elif type(posting) is int:
+                    by_value[value] = [posting, position]
+                else:
+                    posting.append(position)
+            for value, posting in by_value.items():
+                value = str(value).lower()
+                existing = postings.get(value)
+                if existing is None:
+                    postings[value] = posting
+                else:
+                    merged = existing if type(existing) is list else [existing]
+                    merged.extend(posting if type(posting) is list else (posting,))
+                    postings[value] = merged
+        self.postings[key] = postings
+        return postings
+
+    @staticmethod
+    def _add(positions: set, posting):
+        if type(posting) is int:
+            positions.add(posting)
+        elif posting is not None:
+            positions.update(posting)
+
+    def _term(self, term: Term) -> set:
+        positions = set()
+        for key in term.keys:
+            postings = self._postings(key)
+            for value in term.values:
+                self._add(positions, postings.get(value))
+            if not term.prefixes:
+                continue
+            values = self._sorted_values.get(key)
+            if values is None:
+                values = self._sorted_values[key] = sorted(postings)
+            for prefix in term.prefixes:
+                for i in range(bisect_left(values, prefix), len(values)):
+                    if not values[i].startswith(prefix):
+                        break
+                    self._add(positions, postings[values[i]])
+        return positions
+
+    def _eval(self, node) -> set:
+        if isinstance(node, Term):
+            return self._term(node)
+        op, operand = node
+        if op == 'not':
+            return set(range(len(self.instances))) - self._eval(operand)
+        if op == 'or':
+            positions = set()
+            for child in operand:
+                positions |= self._eval(child)
+            return positions
+
+        # AND: NOT 조건은 전체 집합을 만들지 않고 나머지 결과에서 빼기
+        included = [self._eval(child) for child in operand
+                    if isinstance(child, Term) or child[0] != 'not']
+        excluded = [child[1] for child in operand if not isinstance(child, Term) and child[0] == 'not']
+        if included:
+            included.sort(key=len)
+            positions = included[0].intersection(*included[1:])
+        else:
+            positions = set(range(len(self.instances)))
+        for child in excluded:
+            if not positions:
+                break
+            positions -= self._eval(child)
+        return positions
+
+    def select(self, query: Query) -> List[Instance]:
+        """조건을 만족하는 인스턴스 (원래 순서)"""
+        if not query:
+            return self.instances
+        with trace.span('query.select', rows=len(self.instances)) as span:
+            positions = sorted(self._eval(query.root))
+            span.set(matches=len(positions))
+        instances = self.instances
+        return [instances[position] for position in positions]
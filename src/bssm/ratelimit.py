@@ -0,0 +1,203 @@
+"""
+AWS API 호출 속도 제한 (프로세스 공용)
+
+여러 계정/리전을 동시에 조회하거나 run, tunnel, agent 가 함께 호출하면 계정의
+API 한도를 넘어 ThrottlingException 이 나기 쉽다. 클라이언트마다 따로 재시도하면
+서로 한도를 빼앗으며 계속 실패하므로, 프로세스 전체에서 (계정, 리전, API) 별
+토큰 버킷 하나를 공유하고 (계정, 리전) 별 동시 호출 수를 제한한다.
+
+- 토큰 버킷: 스로틀링을 받기 전에는 제한하지 않는다. 스로틀링 응답을 받으면 API 별
+  상한(API_RATES)의 절반부터 초당 허용량을 제한하고, 또 스로틀링되면 절반으로 줄였다가
+  성공할 때마다 조금씩 되돌린다 (AIMD). 상한까지 회복한 뒤 UNLIMITED_AFTER 초 동안
+  스로틀링이 없으면 다시 제한을 푼다. 재시도 요청도 토큰을 쓴다.
+- 재시도: botocore standard 모드 (지수 백오프 + 지터)로 MAX_ATTEMPTS 번까지 시도.
+- 스로틀링 횟수는 throttle_count() 와 --timings 카운터로 확인할 수 있다.
+"""
+
+import threading
+import time
+from collections import Counter
+
+from . import trace
+
+# (계정, 리전) 별 동시에 진행할 수 있는 최대 API 요청 수
+MAX_IN_FLIGHT = 16
+# 재시도를 포함한 최대 시도 횟수
+MAX_ATTEMPTS = 10
+# 스로틀링 이후 API 별 (초당 허용량 상한, 버스트 크기). 없는 API 는 DEFAULT_RATE
+DEFAULT_RATE = (20.0, 20)
+API_RATES = {
+    ('ssm', 'DescribeInstanceInformation'): (10.0, 20),
+    ('ssm', 'SendCommand'): (5.0, 10),
+    ('ssm', 'GetCommandInvocation'): (20.0, 40),
+    ('ssm', 'StartSession'): (3.0, 5),
+    ('ec2', 'DescribeInstances'): (20.0, 100),
+    ('ec2', 'DescribeRegions'): (5.0, 10),
+}
+# 스로틀링 후 줄일 수 있는 최소 초당 허용량
+MIN_RATE = 0.5
+# 스로틀링 시 허용량에 곱하는 값과, 성공할 때마다 되돌리는 양 (최대 허용량 대비 비율)
+THROTTLE_DECREASE = 0.5
+RECOVERY_STEP = 0.01
+# 동시에 진행 중이던 요청이 한꺼번에 스로틀링되어도 한 번만 줄이도록 두는 간격 (초)
+THROTTLE_COOLDOWN = 1.0
+# 상한까지 회복한 뒤 이 시간 동안 스로틀링이 없으면 제한 해제 (초)
+UNLIMITED_AFTER = 60.0
+
+THROTTLING_ERROR_CODES = {
+    'Throttling', 'ThrottlingException', 'ThrottledException', 'RequestLimitExceeded',
+    'TooManyRequestsException', 'RequestThrottled', 'RequestThrottledException',
+}
+
+class TokenBucket:
+    """스로틀링에 따라 초당 허용량이 바뀌는 토큰 버킷 (스레드 안전)
+
+    rate 가 None 이면 제한하지 않는 상태 (아직 스로틀링되지 않음)
+    """
+
+    def __init__(self, max_rate: float, burst: int, clock=time.monotonic, sleep=time.sleep):
+        self.max_rate = max_rate
+        self.rate = None
+        self.burst = burst
+        self.tokens = float(burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._last_throttle = None
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        # 제한 중에는 1초 분량까지만 모아 두어 대기 후 한꺼번에 몰리지 않게 한다
+        capacity = min(self.burst, max(1.0, self.rate))
+        self.tokens = min(capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """토큰 하나 사용 (부족하면 차례가 올 때까지 대기, 대기한 시간 반환)
+
+        토큰을 먼저 빌려 쓰고(음수 허용) 부족한 만큼 기다리므로 요청 순서대로 처리된다.
+        """
+        if self.rate is None:
+            return 0.0
+        with self._lock:
+            if self.rate is None:
+                return 0.0
+            self._refill(self._clock())
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            self._sleep(wait)
+        return wait
+
+    def on_throttle(self):
+        """스로틀링 응답: 허용량을 줄이고 남은 토큰을 비운다"""
+        with self._lock:
+            now = self._clock()
+            if self.rate is None:
+                self.rate = self.max_rate * THROTTLE_DECREASE
+                self._updated = now
+            elif self._last_throttle is None or now - self._last_throttle >= THROTTLE_COOLDOWN:
+                self._refill(now)
+                self.rate = max(MIN_RATE, self.rate * THROTTLE_DECREASE)
+            self._last_throttle = now
+            self.tokens = min(self.tokens, 0.0)
+
+    def on_success(self):
+        """정상 응답: 허용량을 조금씩 되돌리고, 충분히 안정되면 제한 해제"""
+        if self.rate is None:
+            return
+        with self._lock:
+            if self.rate is None:
+                return
+            now = self._clock()
+            if self.rate < self.max_rate:
+                self._refill(now)
+                self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_STEP)
+            elif now - self._last_throttle >= UNLIMITED_AFTER:
+                self.rate = None
+                self.tokens = float(self.burst)
+
+class RateLimiter:
+    """(계정, 리전, API) 별 토큰 버킷과 (계정, 리전) 별 동시 호출 제한"""
+
+    def __init__(self, max_in_flight: int = MAX_IN_FLIGHT):
+        self.max_in_flight = max_in_flight
+        self.buckets = {}
+        self.throttled = Counter()  # (계정, 리전, 서비스.API) -> 스로틀링 응답 수
+        self._slots = {}
+        self._lock = threading.Lock()
+        self._held = threading.local()
+
+    def bucket(self, account: str, region: str, service: str, operation: str) -> TokenBucket:
+        key = (account, region, service, operation)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self.buckets.get(key)
+                if bucket is None:
+                    rate, burst = API_RATES.get((service, operation), DEFAULT_RATE)
+                    bucket = self.buckets[key] = TokenBucket(rate, burst)
+        return bucket
+
+    def _slot(self, account: str, region: str) -> threading.BoundedSemaphore:
+        key = (account, region)
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._slots[key] = threading.BoundedSemaphore(self.max_in_flight)
+            return slot
+
+    def throttle_count(self) -> int:
+        """지금까지 받은 스로틀링 응답 수 (재시도로 복구된 것 포함)"""
+        with self._lock:
+            return sum(self.throttled.values())
+
+    def attach(self, client, account: str):
+        """클라이언트의 요청(재시도 포함)마다 토큰과 동시 호출 자리를 얻도록 훅 등록"""
+        region = client.meta.region_name or ''
+        service = client.meta.service_model.endpoint_prefix
+        slot = self._slot(account, region)
+
+        def _before_send(event_name, **kwargs):
+            operation = event_name.rsplit('.', 1)[-1]
+            self.bucket(account, region, service, operation).acquire()
+            slot.acquire()
+            self._held.slot = slot
+            # before-send 는 응답을 가로챌 수 있는 이벤트이므로 반드시 None 반환
+
+        def _response_received(event_name, parsed_response=None, **kwargs):
+            # 요청 실패(연결 오류 등)에도 항상 호출된다
+            held = getattr(self._held, 'slot', None)
+            if held is not None:
+                self._held.slot = None
+                held.release()
+
+            operation = event_name.rsplit('.', 1)[-1]
+            bucket = self.bucket(account, region, service, operation)
+            code = ((parsed_response or {}).get('Error') or {}).get('Code')
+            if code in THROTTLING_ERROR_CODES:
+                bucket.on_throttle()
+                with self._lock:
+                    self.throttled[(account, region, f"{service}.{operation}")] += 1
+                trace.incr(f"throttled.{service}.{operation}")
+            elif code is None and parsed_response is not None:
+                bucket.on_success()
+
+        service_id = client.meta.service_model.service_id.hyphenize()
+        client.meta.events.register(f'before-send.{service_id}', _before_send)
+        client.meta.events.register(f'response-received.{service_id}', _response_received)
+        return client
+
+_limiter = RateLimiter()
+
+def get_limiter() -> RateLimiter:
+    """프로세스 공용 RateLimiter"""
+    return _limiter
+
+def client_config():
+    """재시도 설정 (스로틀링은 botocore standard 모드로 백오프하며 재시도)"""
+    from botocore.config import Config as BotoConfig
+    return BotoConfig(retries={'mode': 'standard', 'max_attempts': MAX_ATTEMPTS})
+
+def throttle_count() -> int:
+    return _limiter.throttle_count()
@@ -0,0 +1,137 @@
+"""
+인스턴스 검색 인덱스 (타이핑하는 대로 좁혀지는 검색용)
+"""
+
+from array import array
+from typing import List, Optional, Iterable
+
+from . import trace
+from .models import Instance
+
+# 검색 대상 필드 (Instance 속성)
+SEARCH_FIELDS = ('name', 'instance_id', 'private_ip', 'instance_type', 'platform')
+
+def _trigrams(text: str) -> Iterable[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class SearchIndex:
+    """trigram 역색인 기반 인스턴스 검색
+
+    행은 미리 정해둔 기본 순위(즐겨찾기 > 최근 접속 > 원래 순서) 로 저장하고
+    posting list 도 같은 순서로 만들기 때문에, 후보를 앞에서부터 거르기만 해도
+    기본 순위가 유지된다. 검색어를 이어서 입력하는 경우에는 직전 결과 안에서만
+    다시 거른다.
+    """
+
+    def __init__(self, instances: List[Instance], favorites: Optional[Iterable[str]] = None,
+                 history: Optional[List[str]] = None):
+        favorites = set(favorites or ())
+        recent = {instance_id: rank for rank, instance_id in enumerate(history or ())}
+
+        def _rank(position):
+            instance_id = instances[position].instance_id
+            return (
+                0 if instance_id in favorites else 1,
+                recent.get(instance_id, len(recent)),
+                position
+            )
+
+        self.instances = [instances[i] for i in sorted(range(len(instances)), key=_rank)]
+        self.favorites = favorites
+        self.recent = recent
+
+        # 검색용 소문자 문자열 (이름은 별도로 보관해서 이름 일치를 우선 정렬)
+        self.names = [str(instance.name or '').lower() for instance in self.instances]
+        self.haystacks = [
+            '\x00'.join(str(getattr(instance, field) or '').lower() for field in SEARCH_FIELDS)
+            for instance in self.instances
+        ]
+
+        # trigram 역색인은 build() 에서 만든다 (5만 행 기준 약 1초이므로 UI 는 백그라운드에서 호출)
+        # 만들어지기 전에는 전체 문자열 검사로 동작한다
+        self.postings = None
+
+        self._last_query = None
+        self._last_matches = None
+        self.last_count = len(self.instances)
+
+    def build(self):
+        """trigram 역색인 생성"""
+        postings = {}
+        with trace.span('search.build_index', rows=len(self.haystacks)):
+            for position, haystack in enumerate(self.haystacks):
+                for gram in _trigrams(haystack):
+                    posting = postings.get(gram)
+                    if posting is None:
+                        posting = postings[gram] = array('i')
+                    posting.append(position)
+        self.postings = postings
+        return self
+
+    def __len__(self):
+        return len(self.instances)
+
+    def _candidates(self, terms: List[str]) -> Iterable[int]:
+        """검색어 후보 위치 (기본 순위 순서)"""
+        postings = self.postings
+        if postings is None:
+            return range(len(self.instances))
+
+        # 가장 짧은 posting list 만 사용하고 나머지는 부분 문자열 검사로 확인
+        shortest = None
+        for term in terms:
+            for gram in _trigrams(term):
+                posting = postings.get(gram)
+                if posting is None:
+                    return ()
+                if shortest is None or len(posting) < len(shortest):
+                    shortest = posting
+        return range(len(self.instances)) if shortest is None else shortest
+
+    def match(self, query: str) -> List[int]:
+        """검색어와 일치하는 행 위치 목록 (공백으로 구분한 모든 단어 포함, 기본 순위 순서)"""
+        terms = query.lower().split()
+        if not terms:
+            return list(range(len(self.instances)))
+
+        key = ' '.join(terms)
+        if self._last_query and key.startswith(self._last_query):
+            # 직전 검색어를 이어서 입력한 경우 직전 결과 안에서만 거르며,
+            # 직전 결과는 마지막 단어를 제외한 단어를 이미 모두 포함하고 있다
+            matches = self._last_matches
+            check = terms[len(self._last_query.split()) - 1:]
+        else:
+            matches = self._candidates(terms)
+            check = terms
+
+        haystacks = self.haystacks
+        # 단어마다 한 번씩 걸러야 리스트 컴프리헨션 한 번의 비용으로 끝난다
+        for term in check:
+            matches = [position for position in matches if term in haystacks[position]]
+
+        self._last_query = key
+        self._last_matches = matches
+        return matches
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Instance]:
+        """검색 결과 (이름이 검색어로 시작 > 이름에 포함 > 다른 필드에 포함, 같은 등급은 기본 순위)"""
+        matches = self.match(query)
+        self.last_count = len(matches)
+        terms = query.lower().split()
+        if terms:
+            first = terms[0]
+            names = self.names
+            ranked = [position for position in matches if names[position].startswith(first)]
+            if not limit or len(ranked) < limit:
+                ranked += [
+                    position for position in matches
+                    if first in names[position] and not names[position].startswith(first)
+                ]
+            if not limit or len(ranked) < limit:
+                ranked += [position for position in matches if first not in names[position]]
+        else:
+            ranked = matches
+
+        if limit:
+            ranked = ranked[:limit]
+        return [self.instances[position] for position in ranked]
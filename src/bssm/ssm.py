@@ -2,106 +2,346 @@
 AWS SSM 연결 관리
 """
 
+import json
+import os
+import queue
+import shutil
+import signal
 import subprocess
 import sys
-from typing import List, Dict, Optional
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple, Iterator, Callable
 from rich import print as rprint
 
+from . import trace
+from .filters import InstanceFilter
+from .models import Instance
+from .clients import get_client
+
+# 동시에 조회할 최대 리전 수
+MAX_REGION_WORKERS = 8
+# describe_instances 한 번에 조회할 인스턴스 수
+EC2_BATCH_SIZE = 100
+# 리전 하나에서 동시에 실행할 describe_instances 호출 수
+EC2_BATCH_WORKERS = 4
+# 값이 바뀌면 EC2 세부 정보를 다시 조회해야 하는 SSM 필드
+# (LastPingDateTime 은 정상 노드도 몇 분마다 바뀌므로 제외. 중지/시작된 노드는
+#  Online 목록에서 빠졌다가 새 ID 로 다시 나타나므로 재조회된다)
+SYNC_FINGERPRINT_FIELDS = (
+    'IPAddress', 'ComputerName', 'PlatformType', 'PlatformName',
+    'PlatformVersion', 'AgentVersion', 'RegistrationDate'
+)
+# 지문에는 SSM 정보만 있어 이름/태그/EC2 상태가 바뀐 것은 알 수 없으므로, 증분 동기화마다
+# 지문이 같은 인스턴스도 1/REVALIDATE_SLICES 씩 돌아가며 다시 조회한다
+# (REVALIDATE_SLICES 번 동기화하면 모든 인스턴스를 한 번씩 다시 조회한 셈이 된다)
+REVALIDATE_SLICES = 12
+
+# aws CLI 없이 직접 실행하는 Session Manager 플러그인
+SESSION_MANAGER_PLUGIN = 'session-manager-plugin'
+# 이 버전부터 StartSession 응답을 명령줄 대신 환경 변수로 받을 수 있다
+PLUGIN_ENV_RESPONSE_VERSION = (1, 2, 497, 0)
+START_SESSION_RESPONSE_ENV = 'AWS_SSM_START_SESSION_RESPONSE'
+
+def ssm_fingerprint(info: Dict) -> str:
+    """증분 동기화용 SSM 인스턴스 정보 지문"""
+    return '|'.join(str(info.get(field, '')) for field in SYNC_FINGERPRINT_FIELDS)
+
+def revalidate_slice(instance_id: str, sync_round: int) -> bool:
+    """sync_round 번째 증분 동기화에서 지문과 관계없이 다시 조회할 인스턴스인지"""
+    return zlib.crc32(instance_id.encode('utf-8')) % REVALIDATE_SLICES == sync_round % REVALIDATE_SLICES
+
 class SSMManager:
-    def __init__(self, session):
+    def __init__(self, session, region: Optional[str] = None, account: Optional[str] = None,
+                 filters: Optional[InstanceFilter] = None):
         self.session = session
-        self.ssm_client = session.client('ssm')
-        self.ec2_client = session.client('ec2')
+        self.filters = filters or InstanceFilter({})
+        # 같은 계정/리전의 클라이언트와 속도 제한은 프로세스 전체에서 공유한다
+        self.ssm_client = get_client(session, 'ssm', region, account)
+        self.ec2_client = get_client(session, 'ec2', region, account)
+        self.region = self.ssm_client.meta.region_name
+        
+    def _session_env(self) -> Optional[Dict[str, str]]:
+        """aws CLI 에 넘길 환경 변수 (AssumeRole 등 프로필이 없는 세션인 경우)"""
+        credentials = self.session.get_credentials()
+        if credentials is None or getattr(credentials, 'method', None) != 'explicit':
+            return None
         
-    def get_instances(self) -> List[Dict]:
+        frozen = credentials.get_frozen_credentials()
+        env = dict(os.environ)
+        env.pop('AWS_PROFILE', None)
+        env['AWS_ACCESS_KEY_ID'] = frozen.access_key
+        env['AWS_SECRET_ACCESS_KEY'] = frozen.secret_key
+        if frozen.token:
+            env['AWS_SESSION_TOKEN'] = frozen.token
+        return env
+        
+    def get_instances(self) -> List[Instance]:
         """SSM 연결 가능한 EC2 인스턴스 목록 가져오기 (페이지네이션 지원)"""
         try:
-            # SSM 관리 인스턴스 목록 (페이지네이션 처리)
-            ssm_instances = {}
-            next_token = None
+            instances = self.fetch_instances()
             
-            while True:
-                if next_token:
-                    ssm_response = self.ssm_client.describe_instance_information(
-                        NextToken=next_token,
-                        MaxResults=50  # 한 번에 최대 50개씩
-                    )
-                else:
-                    ssm_response = self.ssm_client.describe_instance_information(
-                        MaxResults=50
-                    )
-                
-                # 온라인 상태인 인스턴스만 수집
-                for instance in ssm_response['InstanceInformationList']:
-                    if instance['PingStatus'] == 'Online':
-                        ssm_instances[instance['InstanceId']] = instance
-                
-                # 다음 페이지가 있는지 확인
-                next_token = ssm_response.get('NextToken')
-                if not next_token:
-                    break
+            # 총 개수 로그 출력
+            rprint(f"[green]✅ 총 {len(instances)}개의 SSM 연결 가능한 인스턴스를 찾았습니다.[/green]")
+            return instances
             
-            if not ssm_instances:
-                return []
+        except Exception as e:
+            rprint(f"[red]❌ 인스턴스 목록을 가져오는데 실패했습니다: {str(e)}[/red]")
+            return []
+    
+    def fetch_instances(self) -> List[Instance]:
+        """인스턴스 목록 조회 (출력 없음, 실패 시 예외 발생)"""
+        with trace.span('ssm.fetch_instances', region=self.region):
+            instances = list(self.iter_instances())
+        
+        # 이름순으로 정렬
+        with trace.span('ssm.sort', rows=len(instances)):
+            instances.sort(key=lambda x: x.name.lower())
+        return instances
+    
+    def describe_instance(self, instance_id: str) -> Optional[Dict]:
+        """인스턴스 하나의 SSM 정보 (온라인이 아니거나 없으면 None, API 호출 한 번)"""
+        with trace.span('ssm.describe_instance', instance_id=instance_id):
+            response = self.ssm_client.describe_instance_information(
+                Filters=[{'Key': 'InstanceIds', 'Values': [instance_id]}]
+            )
+        for info in response['InstanceInformationList']:
+            if info['InstanceId'] == instance_id and info['PingStatus'] == 'Online':
+                return info
+        return None
+    
+    def iter_ssm_pages(self) -> Iterator[List[Dict]]:
+        """SSM 관리 인스턴스 목록을 페이지 단위로 반환 (페이지네이션 처리)
+        
+        온라인 상태와 --filter 조건은 Filters 로 보내 AWS 에서 거른다.
+        """
+        next_token = None
+        filters = self.filters.ssm_filters()
+        
+        while True:
+            if next_token:
+                ssm_response = self.ssm_client.describe_instance_information(
+                    Filters=filters,
+                    NextToken=next_token,
+                    MaxResults=50  # 한 번에 최대 50개씩
+                )
+            else:
+                ssm_response = self.ssm_client.describe_instance_information(
+                    Filters=filters,
+                    MaxResults=50
+                )
             
-            # EC2 인스턴스 세부 정보 (배치 처리로 최적화)
-            all_instances = []
-            instance_ids = list(ssm_instances.keys())
+            trace.incr('ssm.pages')
+            trace.incr('ssm.instances', len(ssm_response['InstanceInformationList']))
+            yield ssm_response['InstanceInformationList']
             
-            # EC2 describe_instances는 한 번에 많은 인스턴스를 처리할 수 있지만
-            # 너무 많으면 타임아웃이 날 수 있으므로 100개씩 배치 처리
-            batch_size = 100
-            for i in range(0, len(instance_ids), batch_size):
-                batch_ids = instance_ids[i:i + batch_size]
+            # 다음 페이지가 있는지 확인
+            next_token = ssm_response.get('NextToken')
+            if not next_token:
+                break
+    
+    def iter_instances(self, max_workers: int = EC2_BATCH_WORKERS) -> Iterator[Instance]:
+        """SSM 연결 가능한 인스턴스를 조회되는 대로 반환 (정렬되지 않음)
+        
+        SSM 페이지에서 ID가 100개 모일 때마다 EC2 조회를 바로 시작하므로
+        SSM 페이지네이션과 EC2 describe_instances 호출이 겹쳐서 진행된다.
+        """
+        return self.iter_sync([], {}, max_workers)
+    
+    def iter_sync(self, previous: List[Instance], fingerprints: Dict[str, str],
+                  max_workers: int = EC2_BATCH_WORKERS, sync_round: Optional[int] = None) -> Iterator[Instance]:
+        """이전 스냅샷과 비교하여 새로 생기거나 바뀐 인스턴스만 EC2 조회 (증분 동기화)
+        
+        SSM 목록은 항상 전체를 조회하지만 describe_instances 는 새 ID 또는 SSM 정보
+        지문이 바뀐 ID 에 대해서만 호출하고, 사라진 ID 는 결과에서 제외한다.
+        sync_round 를 주면 지문이 같아도 그 회차의 몫(revalidate_slice)은 다시 조회하여
+        이름/태그 변경과 지난번에 필터로 제외된 인스턴스의 변경을 따라잡는다.
+        조회가 끝나면 self.fingerprints 와 self.sync_stats 가 채워진다.
+        """
+        previous_by_id = {row.instance_id: row for row in previous}
+        # 태그를 저장하지 않던 이전 버전 캐시의 행은 바뀐 것으로 보고 다시 조회
+        legacy = {row.instance_id for row in previous if row.tags is None}
+        self.fingerprints = {}
+        unchanged = []
+        # EC2 에서만 거를 수 있는 조건이면 지난번에 제외된 인스턴스는 다시 조회하지 않는다
+        skip_excluded = self.filters.ec2_only()
+        
+        def _changed_batches():
+            batch = {}
+            for page in self.iter_ssm_pages():
+                # 온라인 상태인 인스턴스만 수집
+                for info in page:
+                    if info['PingStatus'] != 'Online':
+                        continue
+                    instance_id = info['InstanceId']
+                    fingerprint = ssm_fingerprint(info)
+                    self.fingerprints[instance_id] = fingerprint
+                    
+                    row = previous_by_id.get(instance_id)
+                    if (fingerprints.get(instance_id) == fingerprint and instance_id not in legacy
+                            and (row is not None or skip_excluded)
+                            and (sync_round is None or not revalidate_slice(instance_id, sync_round))):
+                        if row is not None:
+                            unchanged.append(row)
+                    else:
+                        # 원본 응답 대신 행 생성에 필요한 값만 보관
+                        batch[instance_id] = (info['PingStatus'], info.get('PlatformType', 'Unknown'))
                 
-                # EC2 인스턴스 정보 조회 (InstanceIds 사용시 MaxResults 불가)
-                ec2_response = self.ec2_client.describe_instances(
-                    InstanceIds=batch_ids
-                )
+                # EC2 describe_instances는 한 번에 많은 인스턴스를 처리할 수 있지만
+                # 너무 많으면 타임아웃이 날 수 있으므로 100개씩 배치 처리
+                while len(batch) >= EC2_BATCH_SIZE:
+                    batch_ids = [*batch][:EC2_BATCH_SIZE]
+                    yield {i: batch.pop(i) for i in batch_ids}
+                # 배치가 차지 않아도 페이지마다 한 번씩 완료된 결과를 반환할 기회를 준다
+                yield None
+            
+            if batch:
+                yield batch
+        
+        described = 0
+        for instance in self._iter_described(_changed_batches(), max_workers):
+            described += 1
+            yield instance
+        yield from unchanged
+        
+        self.sync_stats = {
+            'described': described,
+            'unchanged': len(unchanged),
+            'removed': len(previous_by_id.keys() - self.fingerprints.keys())
+        }
+    
+    def _iter_described(self, batches: Iterator[Optional[Dict[str, Tuple[str, str]]]],
+                        max_workers: int) -> Iterator[Instance]:
+        """SSM 정보 배치를 받는 대로 EC2 조회를 시작하고 완료된 순서대로 반환"""
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bssm-ec2')
+        pending = set()
+        try:
+            for batch in batches:
+                if batch:
+                    pending.add(executor.submit(self._describe_batch, batch))
                 
-                # 인스턴스 정보 처리
-                for reservation in ec2_response['Reservations']:
-                    for instance in reservation['Instances']:
-                        all_instances.append(instance)
+                # 다음 SSM 페이지를 받기 전에 완료된 배치 먼저 반환
+                for future in [f for f in pending if f.done()]:
+                    pending.discard(future)
+                    yield from future.result()
             
-            # 수집된 모든 인스턴스 정보 처리
-            instances = []
-            for instance in all_instances:
+            for future in as_completed(pending):
+                pending.discard(future)
+                yield from future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+    
+    def _describe_batch(self, ssm_instances: Dict[str, Tuple[str, str]]) -> List[Instance]:
+        """EC2 세부 정보를 조회하여 인스턴스 행 생성 (최대 100개)
+        
+        ssm_instances: 인스턴스 ID -> (PingStatus, PlatformType)
+        """
+        # EC2 인스턴스 정보 조회 (InstanceIds 사용시 MaxResults 불가)
+        with trace.span('ec2.describe_batch', region=self.region, size=len(ssm_instances)):
+            ec2_response = self.ec2_client.describe_instances(
+                InstanceIds=list(ssm_instances),
+                Filters=self.filters.ec2_filters()
+            )
+        trace.incr('ec2.batches')
+        
+        instances = []
+        for reservation in ec2_response['Reservations']:
+            for instance in reservation['Instances']:
                 instance_id = instance['InstanceId']
                 
                 # SSM에 등록되지 않은 인스턴스는 제외
                 if instance_id not in ssm_instances:
                     continue
                 
-                # 인스턴스 이름 찾기
-                name = instance_id
-                for tag in instance.get('Tags', []):
-                    if tag['Key'] == 'Name':
-                        name = tag['Value']
-                        break
+                # 태그는 모두 보관 (--where 조회용), 이름은 Name 태그
+                tags = {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}
+                name = tags.get('Name', instance_id)
                 
-                instances.append({
-                    'InstanceId': instance_id,
-                    'Name': name,
-                    'State': instance['State']['Name'],
-                    'InstanceType': instance['InstanceType'],
-                    'PrivateIpAddress': instance.get('PrivateIpAddress', 'N/A'),
-                    'PublicIpAddress': instance.get('PublicIpAddress', 'N/A'),
-                    'LaunchTime': instance['LaunchTime'],
-                    'SSMStatus': ssm_instances[instance_id]['PingStatus'],
-                    'Platform': ssm_instances[instance_id].get('PlatformType', 'Unknown')
-                })
-            
-            # 이름순으로 정렬
-            instances.sort(key=lambda x: x['Name'].lower())
-            
-            # 총 개수 로그 출력
-            rprint(f"[green]✅ 총 {len(instances)}개의 SSM 연결 가능한 인스턴스를 찾았습니다.[/green]")
-            return instances
-            
-        except Exception as e:
-            rprint(f"[red]❌ 인스턴스 목록을 가져오는데 실패했습니다: {str(e)}[/red]")
-            return []
+                ping_status, platform = ssm_instances[instance_id]
+                instances.append(Instance(
+                    instance_id=instance_id,
+                    name=name,
+                    state=instance['State']['Name'],
+                    instance_type=instance['InstanceType'],
+                    private_ip=instance.get('PrivateIpAddress', 'N/A'),
+                    public_ip=instance.get('PublicIpAddress', 'N/A'),
+                    # 캐시(JSON)에 저장된 값과 같은 형태로 보관
+                    launch_time=str(instance['LaunchTime']),
+                    ssm_status=ping_status,
+                    platform=platform,
+                    region=self.region,
+                    tags=tags
+                ))
+        # 원본 응답은 행을 만든 직후 버린다
+        del ec2_response
+        return instances
+
+    def _plugin_env(self, extra: Dict[str, str]) -> Dict[str, str]:
+        env = self._session_env() or dict(os.environ)
+        env.update(extra)
+        return env
+    
+    def plugin_command(self, request: Dict) -> Tuple[List[str], Dict[str, str], str]:
+        """StartSession API 를 호출하고 session-manager-plugin 실행 명령을 만든다
+        
+        aws CLI 의 `ssm start-session` 과 같은 인자로 플러그인을 직접 실행하므로
+        aws CLI 프로세스(Python 인터프리터, botocore import, 자격증명 확인)를 거치지 않는다.
+        
+        Args:
+            request: start_session 파라미터 (Target, DocumentName, Parameters)
+        
+        Returns:
+            (명령, 환경 변수, 세션 ID)
+        """
+        plugin = find_session_manager_plugin()
+        if plugin is None:
+            # 세션을 먼저 만들면 플러그인 없이 남으므로 API 호출 전에 확인
+            raise FileNotFoundError(SESSION_MANAGER_PLUGIN)
+        
+        with trace.span('ssm.start_session_api', target=request.get('Target')):
+            response = self.ssm_client.start_session(**request)
+        
+        profile = ''
+        if self._session_env() is None and getattr(self.session, 'profile_name', None) not in (None, 'default'):
+            profile = self.session.profile_name
+        
+        extra = {}
+        start_session_response = json.dumps(response)
+        if plugin_supports_env_response(plugin):
+            # 세션 토큰이 프로세스 목록(ps)에 보이지 않도록 환경 변수로 전달
+            extra[START_SESSION_RESPONSE_ENV] = start_session_response
+            start_session_response = START_SESSION_RESPONSE_ENV
+        
+        cmd = [
+            plugin, start_session_response, self.region or '', 'StartSession', profile,
+            json.dumps(request), self.ssm_client.meta.endpoint_url
+        ]
+        return cmd, self._plugin_env(extra), response['SessionId']
+    
+    def terminate_session(self, session_id: str):
+        """세션 종료 (이미 종료된 세션이면 무시)"""
+        try:
+            self.ssm_client.terminate_session(SessionId=session_id)
+        except Exception:
+            pass
+    
+    def _run_session(self, request: Dict) -> int:
+        """세션을 만들고 플러그인을 실행 (종료 코드 반환)"""
+        cmd, env, session_id = self.plugin_command(request)
+        try:
+            # 세션 시작 (인터랙티브, 구간에는 사용자가 세션을 쓴 시간도 포함된다)
+            trace.mark('ssm.session_spawn')
+            with trace.span('ssm.session', instance_id=request['Target']):
+                # Ctrl+C 등은 원격 셸로 전달되도록 플러그인이 처리한다
+                with _ignore_user_signals():
+                    return subprocess.call(cmd, env=env)
+        except OSError:
+            self.terminate_session(session_id)
+            raise
     
     def start_session(self, instance_id: str):
         """SSM 세션 시작"""
@@ -109,20 +349,9 @@ class SSMManager:
             rprint(f"[green]🚀 {instance_id}에 연결 중...[/green]")
             rprint("[yellow]💡 세션을 종료하려면 'exit' 또는 Ctrl+D를 입력하세요.[/yellow]")
             
-            # AWS CLI를 통해 SSM 세션 시작
-            cmd = [
-                'aws', 'ssm', 'start-session',
-                '--target', instance_id
-            ]
-            
-            # 프로필이 default가 아닌 경우 추가
-            if hasattr(self.session, 'profile_name') and self.session.profile_name != 'default':
-                cmd.extend(['--profile', self.session.profile_name])
+            returncode = self._run_session({'Target': instance_id})
             
-            # 세션 시작 (인터랙티브)
-            result = subprocess.run(cmd)
-            
-            if result.returncode == 0:
+            if returncode == 0:
                 rprint(f"[green]✅ {instance_id} 세션이 종료되었습니다.[/green]")
             else:
                 rprint(f"[red]❌ 세션 연결에 실패했습니다.[/red]")
@@ -130,8 +359,7 @@ class SSMManager:
         except KeyboardInterrupt:
             rprint(f"\n[yellow]👋 {instance_id} 세션이 중단되었습니다.[/yellow]")
         except FileNotFoundError:
-            rprint("[red]❌ AWS CLI가 설치되어 있지 않거나 PATH에 없습니다.[/red]")
-            rprint("[yellow]💡 AWS CLI를 설치해주세요: https://aws.amazon.com/cli/[/yellow]")
+            _print_plugin_missing()
         except Exception as e:
             rprint(f"[red]❌ 세션 시작 중 오류가 발생했습니다: {str(e)}[/red]")
     
@@ -140,19 +368,104 @@ class SSMManager:
         try:
             rprint(f"[green]🔗 포트 포워딩 시작: localhost:{local_port} -> {instance_id}:{remote_port}[/green]")
             
-            cmd = [
-                'aws', 'ssm', 'start-session',
-                '--target', instance_id,
-                '--document-name', 'AWS-StartPortForwardingSession',
-                '--parameters', f'portNumber={remote_port},localPortNumber={local_port}'
-            ]
-            
-            if hasattr(self.session, 'profile_name') and self.session.profile_name != 'default':
-                cmd.extend(['--profile', self.session.profile_name])
-            
-            subprocess.run(cmd)
+            self._run_session(port_forward_request(instance_id, local_port, remote_port))
             
         except KeyboardInterrupt:
             rprint(f"\n[yellow]👋 포트 포워딩이 중단되었습니다.[/yellow]")
+        except FileNotFoundError:
+            _print_plugin_missing()
+        except Exception as e:
+            rprint(f"[red]❌ 포트 포워딩 중 오류가 발생했습니다: {str(e)}[/red]")
+
+def port_forward_request(instance_id: str, local_port: int, remote_port: int) -> Dict:
+    """포트 포워딩 세션의 start_session 파라미터"""
+    return {
+        'Target': instance_id,
+        'DocumentName': 'AWS-StartPortForwardingSession',
+        'Parameters': {'portNumber': [str(remote_port)], 'localPortNumber': [str(local_port)]}
+    }
+
+def find_session_manager_plugin() -> Optional[str]:
+    """session-manager-plugin 실행 파일 경로 (없으면 None)"""
+    return shutil.which(SESSION_MANAGER_PLUGIN)
+
+@lru_cache(maxsize=None)
+def plugin_supports_env_response(plugin: str) -> bool:
+    """StartSession 응답을 환경 변수로 받을 수 있는 플러그인 버전인지 확인"""
+    try:
+        result = subprocess.run([plugin, '--version'], capture_output=True, text=True, timeout=5)
+        version = tuple(int(part) for part in result.stdout.strip().split('.'))
+    except (OSError, ValueError, subprocess.SubprocessError):
+        return False
+    return version >= PLUGIN_ENV_RESPONSE_VERSION
+
+@contextmanager
+def _ignore_user_signals():
+    """플러그인이 실행되는 동안 Ctrl+C, Ctrl+\\, Ctrl+Z 무시 (aws CLI 와 같은 동작)"""
+    signals = [getattr(signal, name) for name in ('SIGINT', 'SIGQUIT', 'SIGTSTP') if hasattr(signal, name)]
+    previous = {}
+    try:
+        for signum in signals:
+            previous[signum] = signal.signal(signum, signal.SIG_IGN)
+    except ValueError:
+        # 메인 스레드가 아니면 시그널 처리기를 바꿀 수 없다
+        pass
+    try:
+        yield
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+def _print_plugin_missing():
+    rprint("[red]❌ Session Manager Plugin이 설치되어 있지 않거나 PATH에 없습니다.[/red]")
+    rprint("[yellow]💡 설치 방법: https://docs.aws.amazon.com/systems-manager/latest/userguide/"
+           "session-manager-working-with-install-plugin.html[/yellow]")
+
+def list_regions(session, offline: bool = False) -> List[str]:
+    """조회 대상 리전 목록 (계정에서 활성화된 리전 우선)"""
+    if not offline:
+        try:
+            response = get_client(session, 'ec2').describe_regions(AllRegions=False)
+            return sorted(region['RegionName'] for region in response['Regions'])
+        except Exception:
+            pass
+    # 권한이 없거나 오프라인이면 botocore 에 내장된 리전 목록 사용
+    return sorted(session.get_available_regions('ssm'))
+
+def iter_instances_concurrently(
+    managers: List[SSMManager],
+    max_workers: int = MAX_REGION_WORKERS,
+    iter_fn: Optional[Callable[[SSMManager], Iterator[Instance]]] = None
+) -> Iterator[Tuple[SSMManager, Optional[Instance], Optional[Exception]]]:
+    """여러 SSMManager 의 iter_instances() 를 병렬로 실행하여 조회되는 대로 반환
+    
+    boto3 세션은 스레드 안전하지 않으므로 클라이언트(SSMManager)는
+    호출하는 쪽에서 미리 만들어 전달한다. iter_fn 을 주면 iter_instances() 대신
+    iter_fn(manager) 를 사용한다 (예: 증분 동기화).
+    
+    각 manager 의 마지막 항목은 (manager, None, None) 또는 (manager, None, 오류) 이다.
+    """
+    if not managers:
+        return
+    
+    results = queue.Queue()
+    
+    def _run(manager):
+        try:
+            for instance in (iter_fn(manager) if iter_fn else manager.iter_instances()):
+                results.put((manager, instance, None))
+            results.put((manager, None, None))
         except Exception as e:
-            rprint(f"[red]❌ 포트 포워딩 중 오류가 발생했습니다: {str(e)}[/red]")
\ No newline at end of file
+            results.put((manager, None, e))
+    
+    workers = max(1, min(max_workers, len(managers)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bssm-fetch') as executor:
+        for manager in managers:
+            executor.submit(_run, manager)
+        
+        remaining = len(managers)
+        while remaining:
+            item = results.get()
+            if item[1] is None:
+                remaining -= 1
+            yield item
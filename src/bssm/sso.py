@@ -0,0 +1,218 @@
+"""
+AWS SSO 로그인 (OIDC 디바이스 인증) 및 토큰 갱신
+
+`aws sso login` 을 실행하지 않고 sso-oidc API 로 직접 디바이스 인증을 진행한 뒤,
+aws CLI/botocore 와 같은 위치와 형식(~/.aws/sso/cache/<sha1>.json)으로 토큰을 저장한다.
+따라서 bssm 이 받은 토큰은 aws CLI 와 다른 도구에서도 그대로 사용된다.
+
+클라이언트 등록 시 scope 를 요청하므로 refresh token 을 받을 수 있고, 토큰 만료가
+REFRESH_WINDOW 이내로 다가오면 브라우저 없이 refresh token 으로 미리 갱신한다.
+"""
+
+import hashlib
+import time
+import webbrowser
+from pathlib import Path
+from typing import List, Dict, Optional
+
+from rich import print as rprint
+
+from . import trace
+from .fileutil import atomic_write_json, file_lock, read_json
+
+SSO_CACHE_DIR = Path.home() / '.aws' / 'sso' / 'cache'
+# 갱신 잠금 파일 위치 (aws CLI 캐시 디렉토리에 다른 파일을 만들지 않는다)
+LOCK_DIR = Path.home() / '.bssm' / 'sso'
+# 만료까지 남은 시간이 이보다 짧으면 미리 갱신 (초, botocore 와 같은 값)
+REFRESH_WINDOW = 15 * 60
+# sso_registration_scopes 가 없을 때 요청할 scope (refresh token 발급에 필요)
+DEFAULT_SCOPES = ['sso:account:access']
+CLIENT_NAME = 'bssm'
+DEVICE_CODE_GRANT = 'urn:ietf:params:oauth:grant-type:device_code'
+# SlowDownException 을 받으면 폴링 간격에 더하는 시간 (초)
+SLOW_DOWN_DELAY = 5
+
+def _format_time(timestamp: float) -> str:
+    """토큰 캐시의 시각 형식 (UTC, aws CLI 와 같은 형식)"""
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(timestamp))
+
+def _parse_time(value) -> float:
+    """토큰 캐시의 시각을 epoch 초로 변환 (읽을 수 없으면 0)"""
+    from botocore.utils import parse_timestamp
+    try:
+        return parse_timestamp(value).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+class SSOLogin:
+    """프로필의 SSO 설정 (sso-session 또는 이전 방식) 으로 토큰 발급/갱신"""
+
+    def __init__(self, start_url: str, region: str, session_name: Optional[str] = None,
+                 scopes: Optional[List[str]] = None, cache_dir: Optional[Path] = None):
+        self.start_url = start_url
+        self.region = region
+        self.session_name = session_name
+        self.scopes = scopes or DEFAULT_SCOPES
+        self.cache_dir = cache_dir or SSO_CACHE_DIR
+        self._client = None
+
+    @classmethod
+    def from_session(cls, session) -> Optional['SSOLogin']:
+        """boto3 세션의 프로필 설정에서 생성 (SSO 프로필이 아니면 None)"""
+        botocore_session = session._session
+        profile = botocore_session.get_scoped_config()
+        session_name = profile.get('sso_session')
+        if session_name:
+            config = botocore_session.full_config.get('sso_sessions', {}).get(session_name) or {}
+            scopes = [s.strip() for s in config.get('sso_registration_scopes', '').split(',') if s.strip()]
+        else:
+            config, scopes = profile, None
+        if not config.get('sso_start_url') or not config.get('sso_region'):
+            return None
+        return cls(config['sso_start_url'], config['sso_region'], session_name, scopes)
+
+    @property
+    def cache_path(self) -> Path:
+        """토큰 캐시 파일 (botocore SSOTokenLoader 와 같은 키)"""
+        key = self.session_name or self.start_url
+        return self.cache_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+
+    def load_token(self) -> Optional[Dict]:
+        token = read_json(self.cache_path)
+        if not isinstance(token, dict) or 'accessToken' not in token:
+            return None
+        return token
+
+    def _save_token(self, token: Dict):
+        atomic_write_json(self.cache_path, token)
+
+    @staticmethod
+    def remaining(token: Optional[Dict]) -> float:
+        """토큰 만료까지 남은 시간 (초, 없으면 0)"""
+        if not token:
+            return 0.0
+        return _parse_time(token.get('expiresAt')) - time.time()
+
+    def _oidc(self):
+        """sso-oidc 클라이언트 (서명 없는 요청)"""
+        if self._client is None:
+            from botocore import UNSIGNED
+            from botocore.config import Config as BotoConfig
+            from .clients import get_pool
+            self._client = get_pool().new_session().client(
+                'sso-oidc', region_name=self.region, config=BotoConfig(signature_version=UNSIGNED)
+            )
+        return self._client
+
+    def ensure_token(self, interactive: bool = False, force: bool = False) -> Optional[Dict]:
+        """유효한 토큰 반환 (곧 만료되면 refresh token 으로 갱신, 필요하면 로그인)
+
+        Args:
+            interactive: refresh 할 수 없을 때 디바이스 인증(브라우저 로그인)까지 진행
+            force: 캐시의 토큰이 유효해 보여도 새로 발급 (서버가 토큰을 거부한 경우)
+
+        Returns:
+            토큰 (interactive 가 아니고 갱신할 수 없으면 None)
+        """
+        # 같은 SSO 세션을 쓰는 다른 bssm 프로세스/스레드와 동시에 갱신하지 않도록 잠금
+        with file_lock(LOCK_DIR / self.cache_path.stem):
+            token = self.load_token()
+            if not force and self.remaining(token) > REFRESH_WINDOW:
+                return token
+
+            refreshed = self._refresh(token)
+            if refreshed is not None:
+                return refreshed
+            if not force and self.remaining(token) > 0:
+                return token
+            if not interactive:
+                return None
+            return self._login(token)
+
+    def _registration(self, token: Optional[Dict]) -> Dict:
+        """클라이언트 등록 정보 (토큰 캐시에 있고 만료 전이면 재사용)"""
+        if token and token.get('clientId') and _parse_time(token.get('registrationExpiresAt')) > time.time():
+            return {
+                'clientId': token['clientId'],
+                'clientSecret': token['clientSecret'],
+                'registrationExpiresAt': token['registrationExpiresAt'],
+            }
+        response = self._oidc().register_client(
+            clientName=f"{CLIENT_NAME}-{int(time.time())}", clientType='public', scopes=self.scopes
+        )
+        return {
+            'clientId': response['clientId'],
+            'clientSecret': response['clientSecret'],
+            'registrationExpiresAt': _format_time(response['clientSecretExpiresAt']),
+        }
+
+    def _token_entry(self, response: Dict, registration: Dict, previous: Optional[Dict] = None) -> Dict:
+        """create_token 응답을 토큰 캐시 형식으로 변환 후 저장"""
+        token = {
+            'startUrl': self.start_url,
+            'region': self.region,
+            'accessToken': response['accessToken'],
+            'expiresAt': _format_time(time.time() + response['expiresIn']),
+        }
+        token.update(registration)
+        refresh_token = response.get('refreshToken') or (previous or {}).get('refreshToken')
+        if refresh_token:
+            token['refreshToken'] = refresh_token
+        self._save_token(token)
+        return token
+
+    def _refresh(self, token: Optional[Dict]) -> Optional[Dict]:
+        """refresh token 으로 갱신 (할 수 없거나 실패하면 None)"""
+        if not token or not token.get('refreshToken') or not token.get('clientId'):
+            return None
+        if _parse_time(token.get('registrationExpiresAt')) <= time.time():
+            return None
+        try:
+            with trace.span('auth.sso_refresh'):
+                response = self._oidc().create_token(
+                    grantType='refresh_token',
+                    clientId=token['clientId'],
+                    clientSecret=token['clientSecret'],
+                    refreshToken=token['refreshToken']
+                )
+        except Exception:
+            return None
+        return self._token_entry(response, self._registration(token), token)
+
+    def _login(self, token: Optional[Dict]) -> Dict:
+        """디바이스 인증: 브라우저에서 승인할 때까지 create_token 폴링"""
+        oidc = self._oidc()
+        registration = self._registration(token)
+        authorization = oidc.start_device_authorization(
+            clientId=registration['clientId'],
+            clientSecret=registration['clientSecret'],
+            startUrl=self.start_url
+        )
+
+        url = authorization.get('verificationUriComplete') or authorization['verificationUri']
+        rprint("[blue]🌐 브라우저에서 다음 주소를 열고 요청을 승인해주세요:[/blue]")
+        rprint(f"   {url}")
+        rprint(f"   코드: [bold]{authorization['userCode']}[/bold]")
+        try:
+            webbrowser.open(url, new=2)
+        except Exception:
+            pass
+
+        interval = authorization.get('interval') or 1
+        deadline = time.time() + authorization['expiresIn']
+        while time.time() < deadline:
+            time.sleep(interval)
+            try:
+                response = oidc.create_token(
+                    grantType=DEVICE_CODE_GRANT,
+                    clientId=registration['clientId'],
+                    clientSecret=registration['clientSecret'],
+                    deviceCode=authorization['deviceCode']
+                )
+            except oidc.exceptions.AuthorizationPendingException:
+                continue
+            except oidc.exceptions.SlowDownException:
+                interval += SLOW_DOWN_DELAY
+                continue
+            return self._token_entry(response, registration)
+        raise TimeoutError("SSO 로그인 승인 시간이 지났습니다.")
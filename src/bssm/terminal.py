@@ -0,0 +1,108 @@
+"""
+터미널 키 입력 처리 (인터랙티브 검색/페이지 이동용)
+"""
+
+import codecs
+import os
+import sys
+from contextlib import contextmanager
+
+# ESC 시퀀스 -> 키 이름
+_ESCAPE_SEQUENCES = {
+    '[A': 'up', '[B': 'down', '[C': 'right', '[D': 'left',
+    '[5~': 'pgup', '[6~': 'pgdn', '[H': 'home', '[F': 'end',
+    'OA': 'up', 'OB': 'down', 'OH': 'home', 'OF': 'end',
+}
+
+# Windows msvcrt 확장 키 코드 -> 키 이름
+_WINDOWS_KEYS = {
+    'H': 'up', 'P': 'down', 'K': 'left', 'M': 'right',
+    'I': 'pgup', 'Q': 'pgdn', 'G': 'home', 'O': 'end',
+}
+
+def is_interactive() -> bool:
+    """키 입력을 직접 받을 수 있는 터미널인지 확인"""
+    return sys.stdin.isatty() and sys.stdout.isatty() and os.environ.get('TERM') != 'dumb'
+
+@contextmanager
+def raw_mode():
+    """입력 버퍼링/에코를 끄고 키를 하나씩 읽는 모드"""
+    if os.name == 'nt':
+        yield KeyReader()
+        return
+
+    import termios
+    import tty
+
+    fd = sys.stdin.fileno()
+    old_settings = termios.tcgetattr(fd)
+    try:
+        tty.setcbreak(fd)
+        yield KeyReader()
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+
+class KeyReader:
+    """키 하나를 읽어 이름('up', 'enter', 'backspace' ...) 또는 문자로 반환"""
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+
+    def read_key(self) -> str:
+        if os.name == 'nt':
+            return self._read_key_windows()
+        return self._read_key_posix()
+
+    def _read_key_windows(self) -> str:
+        import msvcrt
+
+        ch = msvcrt.getwch()
+        if ch in ('\x00', '\xe0'):
+            return _WINDOWS_KEYS.get(msvcrt.getwch(), '')
+        return self._normalize(ch)
+
+    def _read_key_posix(self) -> str:
+        import select
+
+        fd = sys.stdin.fileno()
+        ch = self._read_char(fd)
+        if ch != '\x1b':
+            return self._normalize(ch)
+
+        # ESC 단독 입력과 방향키 등의 ESC 시퀀스 구분
+        sequence = ''
+        while select.select([fd], [], [], 0.03)[0]:
+            sequence += self._read_char(fd)
+            if sequence in _ESCAPE_SEQUENCES:
+                return _ESCAPE_SEQUENCES[sequence]
+            if len(sequence) > 3:
+                break
+        return 'esc' if not sequence else ''
+
+    def _read_char(self, fd) -> str:
+        # 한글 등 멀티바이트 문자는 완성될 때까지 읽는다
+        while True:
+            data = os.read(fd, 1)
+            if not data:
+                return '\x04'
+            ch = self._decoder.decode(data)
+            if ch:
+                return ch
+
+    @staticmethod
+    def _normalize(ch: str) -> str:
+        if ch in ('\r', '\n'):
+            return 'enter'
+        if ch in ('\x7f', '\x08'):
+            return 'backspace'
+        if ch == '\x03':
+            return 'ctrl-c'
+        if ch == '\x04':
+            return 'ctrl-d'
+        if ch == '\x15':
+            return 'ctrl-u'
+        if ch == '\x1b':
+            return 'esc'
+        if ch == '\t':
+            return 'tab'
+        return ch
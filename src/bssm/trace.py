@@ -0,0 +1,332 @@
+"""
+구간별 실행 시간 기록 (--timings / --trace / BSSM_TRACE)
+
+인증, SSM 페이지네이션, EC2 배치 조회, 정렬, 렌더링, 세션 시작 같은 구간을
+span 으로 감싸 시작/종료 시각을 기록하고, boto3 세션의 이벤트 훅으로 AWS API
+호출마다 걸린 시간과 재시도 횟수를 모은다. 끝나면 요약 표를 stderr 에 출력하거나
+Chrome trace 형식(chrome://tracing, https://ui.perfetto.dev)의 JSON 으로 저장한다.
+
+기록을 켜지 않으면 span() 은 아무 일도 하지 않는 공용 객체를 반환하므로
+호출하는 쪽에서 따로 확인할 필요가 없다.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+from typing import List, Dict, Optional
+
+# 현재 기록 중인 Tracer (기록하지 않으면 None)
+_tracer = None
+
+class _NullSpan:
+    """기록하지 않을 때 사용하는 span"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class Span:
+    """구간 하나 (with 블록을 벗어날 때 Tracer 에 기록)"""
+
+    __slots__ = ('tracer', 'name', 'attrs', 'start', 'end', 'thread', 'path')
+
+    def __init__(self, tracer: 'Tracer', name: str, attrs: Dict):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.start = None
+        self.end = None
+        self.thread = None
+        self.path = (name,)  # 같은 스레드에서 감싸고 있는 구간 이름 + 자기 이름
+
+    def set(self, **attrs):
+        """구간에 값 추가 (페이지 수, 인스턴스 수 등)"""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        stack = self.tracer._stack()
+        if stack:
+            self.path = stack[-1].path + (self.name,)
+        stack.append(self)
+        self.thread = threading.current_thread()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        self.tracer._stack().pop()
+        self.tracer._record(self)
+        return False
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.perf_counter()) - self.start
+
+class Tracer:
+    """span, AWS API 호출, 카운터 기록"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+        self.api_calls = []  # (서비스.API, 시작, 종료, 재시도 횟수, 오류 코드, 스레드)
+        self.marks = []  # (이름, 시각, 스레드)
+        self.counters = Counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def span(self, name: str, attrs: Dict) -> Span:
+        return Span(self, name, attrs)
+
+    def mark(self, name: str):
+        with self._lock:
+            self.marks.append((name, time.perf_counter(), threading.current_thread()))
+
+    def incr(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] += value
+
+    # --- botocore 이벤트 훅 ---
+
+    @staticmethod
+    def _operation(event_name: str) -> str:
+        # 'after-call.ssm.DescribeInstanceInformation' -> 'ssm.DescribeInstanceInformation'
+        return event_name.split('.', 1)[1]
+
+    def _before_call(self, context=None, **kwargs):
+        if context is not None:
+            context['bssm_trace_start'] = time.perf_counter()
+        # before-call 은 응답을 가로챌 수 있는 이벤트이므로 반드시 None 반환
+
+    def _finish_call(self, event_name: str, context: Optional[Dict], retries: int, error: Optional[str]):
+        end = time.perf_counter()
+        start = (context or {}).get('bssm_trace_start', end)
+        with self._lock:
+            self.api_calls.append(
+                (self._operation(event_name), start, end, retries, error, threading.current_thread())
+            )
+
+    def _after_call(self, event_name, http_response=None, parsed=None, context=None, **kwargs):
+        parsed = parsed or {}
+        retries = parsed.get('ResponseMetadata', {}).get('RetryAttempts', 0)
+        error = None
+        if http_response is not None and http_response.status_code >= 300:
+            error = parsed.get('Error', {}).get('Code') or str(http_response.status_code)
+        self._finish_call(event_name, context, retries, error)
+
+    def _after_call_error(self, event_name, exception=None, context=None, **kwargs):
+        self._finish_call(event_name, context, 0, type(exception).__name__)
+
+    def instrument(self, session):
+        """boto3 세션에 API 호출 시간 기록 훅 등록 (클라이언트를 만들기 전에 호출해야 한다)"""
+        events = session.events
+        events.register('before-call', self._before_call, unique_id='bssm-trace-before-call')
+        events.register('after-call', self._after_call, unique_id='bssm-trace-after-call')
+        events.register('after-call-error', self._after_call_error, unique_id='bssm-trace-after-call-error')
+        return session
+
+    # --- 집계/출력 ---
+
+    def _elapsed_ms(self, value: float) -> float:
+        return (value - self.started) * 1000
+
+    def span_summary(self) -> List[Dict]:
+        """감싸는 구간별로 span 집계 (처음 시작한 순서, 하위 구간은 상위 구간 바로 아래)"""
+        summary = {}
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+        for span in spans:
+            item = summary.setdefault(span.path, {
+                'name': span.name, 'path': '/'.join(span.path), 'depth': len(span.path) - 1,
+                'count': 0, 'total_ms': 0.0, 'max_ms': 0.0
+            })
+            duration = span.duration * 1000
+            item['count'] += 1
+            item['total_ms'] += duration
+            item['max_ms'] = max(item['max_ms'], duration)
+        
+        # 상위 구간이 기록되기 전(진행 중)이면 하위 구간을 최상위로 표시
+        order = {path: position for position, path in enumerate(summary)}
+        
+        def _sort_key(path):
+            return tuple(order.get(path[:i + 1], -1) for i in range(len(path)))
+        
+        return [summary[path] for path in sorted(summary, key=_sort_key)]
+
+    def api_summary(self) -> List[Dict]:
+        """API 별 호출 집계 (합계 시간 순)"""
+        summary = {}
+        with self._lock:
+            calls = [*self.api_calls]
+        for operation, start, end, retries, error, _ in calls:
+            item = summary.setdefault(operation, {
+                'operation': operation, 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                'retries': 0, 'errors': 0
+            })
+            duration = (end - start) * 1000
+            item['count'] += 1
+            item['total_ms'] += duration
+            item['max_ms'] = max(item['max_ms'], duration)
+            item['retries'] += retries
+            item['errors'] += 1 if error else 0
+        return sorted(summary.values(), key=lambda item: -item['total_ms'])
+
+    def print_summary(self, console=None):
+        """span/API 호출 요약 표 출력 (기본값: stderr)"""
+        from rich.console import Console
+        from rich.markup import escape
+        from rich.table import Table
+
+        console = console or Console(stderr=True)
+        total_ms = self._elapsed_ms(time.perf_counter())
+
+        spans = Table(title=f"⏱  구간별 실행 시간 (ms, 전체 {total_ms:.0f}ms)", title_justify='left')
+        spans.add_column("구간", style="cyan")
+        spans.add_column("횟수", justify="right")
+        spans.add_column("합계", justify="right", style="green")
+        spans.add_column("최대", justify="right")
+        for item in self.span_summary():
+            spans.add_row(
+                '  ' * item['depth'] + escape(item['name']), str(item['count']),
+                f"{item['total_ms']:.1f}", f"{item['max_ms']:.1f}"
+            )
+        with self._lock:
+            marks = [*self.marks]
+        for name, at, _ in marks:
+            spans.add_row(f"[dim]▸ {escape(name)}[/dim]", "", f"[dim]@{self._elapsed_ms(at):.1f}[/dim]", "")
+        console.print(spans)
+
+        api = self.api_summary()
+        if api:
+            table = Table(title="🌐 AWS API 호출 (ms)", title_justify='left')
+            table.add_column("API", style="cyan", no_wrap=True)
+            table.add_column("호출", justify="right")
+            table.add_column("합계", justify="right", style="green")
+            table.add_column("평균", justify="right")
+            table.add_column("최대", justify="right")
+            table.add_column("재시도", justify="right", style="yellow")
+            table.add_column("오류", justify="right", style="red")
+            for item in api:
+                table.add_row(
+                    item['operation'], str(item['count']), f"{item['total_ms']:.1f}",
+                    f"{item['total_ms'] / item['count']:.1f}", f"{item['max_ms']:.1f}",
+                    str(item['retries'] or ''), str(item['errors'] or '')
+                )
+            console.print(table)
+
+        with self._lock:
+            counters = sorted(self.counters.items())
+        if counters:
+            console.print("[dim]" + ", ".join(f"{name}={value}" for name, value in counters) + "[/dim]")
+        console.print("[dim]💡 병렬로 실행된 구간은 합계가 전체 시간보다 클 수 있습니다.[/dim]")
+
+    def to_chrome_trace(self) -> Dict:
+        """Chrome trace 형식으로 변환 (시각은 마이크로초)"""
+        pid = os.getpid()
+        events = []
+        threads = {}
+
+        def _tid(thread):
+            threads.setdefault(thread.ident, thread.name)
+            return thread.ident
+
+        def _us(value):
+            return round((value - self.started) * 1e6, 1)
+
+        with self._lock:
+            spans = [*self.spans]
+            calls = [*self.api_calls]
+            marks = [*self.marks]
+            counters = dict(self.counters)
+
+        for span in spans:
+            events.append({
+                'name': span.name, 'cat': 'bssm', 'ph': 'X', 'pid': pid, 'tid': _tid(span.thread),
+                'ts': _us(span.start), 'dur': round(span.duration * 1e6, 1),
+                'args': {key: value if isinstance(value, (int, float, bool)) or value is None else str(value)
+                         for key, value in span.attrs.items()}
+            })
+        for operation, start, end, retries, error, thread in calls:
+            events.append({
+                'name': operation, 'cat': 'aws', 'ph': 'X', 'pid': pid, 'tid': _tid(thread),
+                'ts': _us(start), 'dur': round((end - start) * 1e6, 1),
+                'args': {'retries': retries, 'error': error}
+            })
+        for name, at, thread in marks:
+            events.append({'name': name, 'cat': 'bssm', 'ph': 'i', 's': 't', 'pid': pid,
+                           'tid': _tid(thread), 'ts': _us(at)})
+        for tid, name in threads.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}})
+
+        return {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'bssm': {
+                'total_ms': round(self._elapsed_ms(time.perf_counter()), 3),
+                'spans': self.span_summary(),
+                'api': self.api_summary(),
+                'counters': counters,
+            }
+        }
+
+    def write(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_chrome_trace(), f, ensure_ascii=False)
+
+def start() -> Tracer:
+    """기록 시작 (이미 시작했으면 기존 Tracer 반환)"""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
+
+def stop() -> Optional[Tracer]:
+    """기록 종료 (기록한 Tracer 반환)"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+def enabled() -> bool:
+    return _tracer is not None
+
+def span(name: str, **attrs):
+    """구간 기록 (with 블록으로 사용)"""
+    if _tracer is None:
+        return _NULL_SPAN
+    return _tracer.span(name, attrs)
+
+def mark(name: str):
+    """특정 시점 기록 (예: 세션 프로세스 실행 직전)"""
+    if _tracer is not None:
+        _tracer.mark(name)
+
+def incr(name: str, value: int = 1):
+    """카운터 증가 (예: SSM 페이지 수)"""
+    if _tracer is not None:
+        _tracer.incr(name, value)
+
+def instrument(session):
+    """기록 중이면 boto3 세션에 API 호출 훅 등록"""
+    if _tracer is not None:
+        _tracer.instrument(session)
+    return session
@@ -0,0 +1,523 @@
+"""
+SSM Run Command 로 인스턴스와 파일 주고받기 (bssm cp)
+
+Session Manager 연결 없이 Run Command 만 사용하므로 여러 인스턴스와 동시에 주고받을 수 있다.
+파일은 gzip 으로 압축한 뒤 조각(chunk)으로 나누어 base64 로 명령 파라미터(보내기)나
+명령 출력(가져오기)에 담고, 조각마다 sha256 을 확인한 뒤 마지막에 전체 sha256 을 확인한다.
+
+- 같은 조각을 요청하는 인스턴스는 send_command 한 번(최대 50개)으로 묶는다. 보내기는 모든
+  인스턴스에 같은 조각을, 가져오기는 인스턴스마다 같은 위치의 조각을 요청하므로 명령이 같다.
+- 한 번에 진행하는 명령 호출 수는 concurrency, 인스턴스 하나의 동시 조각 수는 window 로 제한한다.
+  결과가 올 때마다 해당 인스턴스의 다음 조각을 보내므로 느린 인스턴스가 나머지를 막지 않는다.
+- 받은 조각을 ~/.bssm/cp/ 에 기록해 두므로 (가져오는 중인 파일은 받는 파일 옆 .bssm-part)
+  실패하거나 중단된 전송은 같은 명령을 다시 실행하면 남은 조각부터 이어서 진행한다.
+
+인스턴스의 작업 파일은 REMOTE_DIR 아래에 두고 전송이 끝나면 지운다. Linux 인스턴스만 지원한다.
+"""
+
+import abc
+import base64
+import gzip
+import hashlib
+import os
+import posixpath
+import re
+import shlex
+import shutil
+import time
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple, Callable
+
+from .command import CommandResult, CommandRunner, SEND_COMMAND_MAX_TARGETS
+from .fileutil import atomic_write_json, read_json
+from .models import Instance
+
+# 보내기 조각 크기 (압축된 바이트, base64 로 약 32KB 가 되어 send_command 파라미터에 담긴다)
+PUSH_CHUNK_SIZE = 24 * 1024
+# 가져오기 조각 크기. get_command_invocation 은 표준 출력을 24,000자까지만 돌려주므로
+# base64 (약 21,900자) 와 sha256 한 줄이 그 안에 들어가야 한다
+PULL_CHUNK_SIZE = 16 * 1024
+# 조각 하나(또는 준비/완료 명령)를 다시 시도하는 최대 횟수
+MAX_RETRIES = 3
+# 기본 동시 명령 호출 수와 인스턴스 하나의 동시 조각 수
+DEFAULT_CONCURRENCY = 100
+DEFAULT_WINDOW = 4
+# 조각 명령의 최대 조회 간격 (초, 짧은 명령이므로 run 보다 자주 조회)
+MAX_POLL_INTERVAL = 3.0
+# 체크섬이 맞지 않을 때 원격 스크립트의 종료 코드
+CHECKSUM_EXIT_CODE = 3
+# 보내기 진행 상황을 저장하는 최소 간격 (초)
+CHECKPOINT_INTERVAL = 2.0
+
+REMOTE_DIR = '/tmp/bssm-cp'
+STATE_DIR = Path.home() / '.bssm' / 'cp'
+PART_SUFFIX = '.bssm-part'
+
+SHA256_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _script(*lines: str) -> str:
+    return '\n'.join(('set -e',) + lines)
+
+def _retryable(result: CommandResult) -> bool:
+    """다시 시도할 만한 실패인지 (전달 실패/시간 초과/체크섬 불일치)
+
+    스크립트 자체가 실패한 경우 (파일 없음, 권한 등) 는 다시 해도 같으므로 바로 실패 처리한다.
+    """
+    return result.status != 'Failed' or result.response_code == CHECKSUM_EXIT_CODE
+
+class Step:
+    """인스턴스에서 실행할 명령 하나 (key 가 같으면 명령도 같아 여러 인스턴스에 한 번에 보낸다)"""
+
+    __slots__ = ('key', 'command')
+
+    def __init__(self, key: Tuple, command: str):
+        self.key = key
+        self.command = command
+
+class _Job(abc.ABC):
+    """인스턴스 한 개의 전송 상태"""
+
+    def __init__(self, instance: Instance):
+        self.instance = instance
+        self.total = 0  # 전송할 바이트 (압축 후)
+        self.sent = 0  # 전송을 마친 바이트
+        self.error = None
+        self.complete = False
+        self.retries = {}  # step key -> 재시도 횟수
+        self.in_flight = set()  # 진행 중인 step key
+        if instance.platform == 'Windows':
+            self.error = "Windows 인스턴스는 지원하지 않습니다."
+
+    @property
+    def finished(self) -> bool:
+        return self.complete or self.error is not None
+
+    def _failed(self, key, message: str, retryable: bool):
+        """명령 실패 처리 (재시도 횟수가 남았으면 다음에 다시 보내고, 아니면 error 설정)"""
+        retries = self.retries.get(key, 0)
+        if retryable and retries < MAX_RETRIES:
+            self.retries[key] = retries + 1
+            return
+        self.error = message
+
+    def _command_failed(self, step: Step, result: CommandResult):
+        lines = (result.stderr or result.stdout or result.status).strip().splitlines()
+        self._failed(step.key, lines[-1] if lines else result.status, _retryable(result))
+
+    @abc.abstractmethod
+    def next_steps(self, limit: int) -> List[Step]:
+        """보낼 명령 (진행 중인 것을 포함해 최대 limit 개) 을 진행 중으로 표시하고 반환"""
+
+    @abc.abstractmethod
+    def on_result(self, step: Step, result: CommandResult):
+        """명령 결과 반영"""
+
+class PushJob(_Job):
+    """로컬 파일 하나를 인스턴스에 보내기"""
+
+    def __init__(self, instance: Instance, transfer: 'PushTransfer', done: List[int]):
+        super().__init__(instance)
+        self.transfer = transfer
+        self.total = transfer.size
+        self.path = transfer.remote_path
+        self.done = set(done)  # 인스턴스에 저장된 조각 번호
+        self.sent = sum(transfer.chunk_length(index) for index in self.done)
+
+    def next_steps(self, limit: int) -> List[Step]:
+        steps = []
+        if len(self.done) == self.transfer.chunks:
+            if ('commit',) not in self.in_flight:
+                steps.append(self.transfer.commit_step())
+        else:
+            for index in range(self.transfer.chunks):
+                if len(steps) + len(self.in_flight) >= limit:
+                    break
+                if index not in self.done and ('chunk', index) not in self.in_flight:
+                    steps.append(self.transfer.chunk_step(index))
+        self.in_flight.update(step.key for step in steps)
+        return steps
+
+    def on_result(self, step: Step, result: CommandResult):
+        self.in_flight.discard(step.key)
+        if not result.ok:
+            if step.key == ('commit',) and result.response_code == CHECKSUM_EXIT_CODE:
+                # 인스턴스의 조각이 사라졌거나 손상됨 (재부팅으로 /tmp 가 비워진 경우 등)
+                self.done.clear()
+                self.sent = 0
+            self._command_failed(step, result)
+            return
+        if step.key == ('commit',):
+            # 원격 경로가 디렉토리였으면 실제로 저장된 파일 경로
+            self.path = result.stdout.strip() or self.path
+            self.complete = True
+        else:
+            self.done.add(step.key[1])
+            self.sent += self.transfer.chunk_length(step.key[1])
+
+class PushTransfer:
+    """로컬 파일 -> 인스턴스 원격 경로 (압축/조각 나누기, 인스턴스별 진행 상황 저장)"""
+
+    def __init__(self, source: Path, remote_path: str, chunk_size: int = PUSH_CHUNK_SIZE):
+        self.source = Path(source)
+        self.remote_path = remote_path
+        self.chunk_size = chunk_size
+        raw = self.source.read_bytes()
+        # 다시 실행해도 같은 압축 결과가 나와야 이어서 보낼 수 있으므로 mtime 고정
+        self.data = gzip.compress(raw, mtime=0)
+        self.sha256 = _sha256(self.data)
+        self.size = len(self.data)
+        self.chunks = max(1, -(-self.size // chunk_size))
+        self.mode = self.source.stat().st_mode & 0o777
+        self.transfer_id = _sha256(f"push|{_sha256(raw)}|{remote_path}".encode('utf-8'))[:16]
+        self.state_path = STATE_DIR / f"{self.transfer_id}.json"
+        self.remote_dir = f"{REMOTE_DIR}/{self.transfer_id}"
+        self._state = read_json(self.state_path, {}) or {}
+
+    def chunk_length(self, index: int) -> int:
+        return len(self.data[index * self.chunk_size:(index + 1) * self.chunk_size])
+
+    def chunk_step(self, index: int) -> Step:
+        chunk = self.data[index * self.chunk_size:(index + 1) * self.chunk_size]
+        part = f'"$d/{index:06d}"'
+        return Step(('chunk', index), _script(
+            f"d={shlex.quote(self.remote_dir)}",
+            'mkdir -p "$d" && chmod 700 "$d"',
+            f"printf %s '{base64.b64encode(chunk).decode('ascii')}' | base64 -d > {part}.tmp",
+            f'if [ "$(sha256sum {part}.tmp | cut -c1-64)" != "{_sha256(chunk)}" ]; then',
+            f'  rm -f {part}.tmp; echo "chunk {index} checksum mismatch" >&2; exit {CHECKSUM_EXIT_CODE}',
+            'fi',
+            f'mv -f {part}.tmp {part}',
+        ))
+
+    def commit_step(self) -> Step:
+        """조각을 합쳐 전체 체크섬 확인 후 압축을 풀어 원격 경로에 저장"""
+        name = posixpath.basename(self.source.name)
+        return Step(('commit',), _script(
+            f"d={shlex.quote(self.remote_dir)}",
+            f"dest={shlex.quote(self.remote_path)}",
+            f'if [ -d "$dest" ]; then dest="$dest/"{shlex.quote(name)}; fi',
+            'cat "$d"/[0-9][0-9][0-9][0-9][0-9][0-9] > "$d/data.gz" 2>/dev/null || true',
+            f'if [ "$(sha256sum "$d/data.gz" | cut -c1-64)" != "{self.sha256}" ]; then',
+            f'  rm -rf "$d"; echo "checksum mismatch, please retry" >&2; exit {CHECKSUM_EXIT_CODE}',
+            'fi',
+            'gunzip -c "$d/data.gz" > "$dest.bssm-tmp"',
+            f'chmod {self.mode:o} "$dest.bssm-tmp"',
+            'mv -f "$dest.bssm-tmp" "$dest"',
+            'rm -rf "$d"',
+            'echo "$dest"',
+        ))
+
+    def jobs(self, instances: List[Instance]) -> List[PushJob]:
+        return [PushJob(instance, self, self._state.get(instance.instance_id, [])) for instance in instances]
+
+    def save(self, jobs: List[PushJob]):
+        """끝나지 않은 인스턴스의 진행 상황 저장 (모두 끝나면 삭제)"""
+        state = {
+            job.instance.instance_id: sorted(job.done)
+            for job in jobs if not job.complete and job.done
+        }
+        if state:
+            atomic_write_json(self.state_path, state)
+        else:
+            try:
+                self.state_path.unlink()
+            except OSError:
+                pass
+
+class PullJob(_Job):
+    """인스턴스의 원격 파일 하나를 가져오기
+
+    준비 명령이 원격 파일을 압축한 스냅샷을 만들고 크기/sha256 을 알려주면, 조각을 받아
+    로컬 .bssm-part 파일의 해당 위치에 쓴다. 다 받으면 전체 sha256 을 확인하고 압축을 푼다.
+    다 받은 스냅샷의 sha256 도 기록해 두어, 다시 실행했을 때 원격 파일이 그대로면 받지 않는다.
+    """
+
+    def __init__(self, instance: Instance, transfer: 'PullTransfer'):
+        super().__init__(instance)
+        self.transfer = transfer
+        self.path = transfer.local_path(instance)
+        self.part_path = Path(f"{self.path}{PART_SUFFIX}")
+        self.state_path = STATE_DIR / f"{transfer.transfer_id}-{instance.instance_id}.json"
+        state = read_json(self.state_path, {}) or {}
+        # 받다 만 파일이나 다 받은 파일이 없어졌으면 처음부터
+        self.received = bool(state.get('complete')) and self.path.exists()
+        if not (self.received or (state.get('chunks') and self.part_path.exists())):
+            state = {}
+        self.resume = bool(state)
+        self.sha256 = state.get('sha256')
+        self.total = state.get('size', 0)
+        self.done = set(state.get('chunks', []))
+        self.prepared = False
+        self.cleaned = False
+        self.cleanup_error = None  # 원격 스냅샷 정리 실패 (전송 결과에는 영향 없음)
+        self.unchanged = False  # 지난번에 받은 파일과 같아서 받지 않음
+        self.sent = sum(self.chunk_length(index) for index in self.done)
+
+    @property
+    def chunks(self) -> int:
+        return max(1, -(-self.total // self.transfer.chunk_size))
+
+    def chunk_length(self, index: int) -> int:
+        return max(0, min(self.transfer.chunk_size, self.total - index * self.transfer.chunk_size))
+
+    @property
+    def finished(self) -> bool:
+        # 완료 후 원격 스냅샷 정리까지 끝나야 끝난 것으로 본다 (정리 실패는 cleanup_error 에 기록)
+        return (self.complete and self.cleaned) or self.error is not None
+
+    def next_steps(self, limit: int) -> List[Step]:
+        steps = []
+        if not self.prepared:
+            # 다 받은 뒤에는 남은 스냅샷(정리 실패 등)을 쓰지 않고 원격 파일에서 새로 만든다
+            resume = self.resume and not self.received
+            if ('prepare', resume) not in self.in_flight:
+                steps.append(self.transfer.prepare_step(resume))
+        elif self.complete:
+            if ('cleanup',) not in self.in_flight:
+                steps.append(self.transfer.cleanup_step())
+        else:
+            for index in range(self.chunks):
+                if len(steps) + len(self.in_flight) >= limit:
+                    break
+                if index not in self.done and ('chunk', index) not in self.in_flight:
+                    steps.append(self.transfer.chunk_step(index))
+        self.in_flight.update(step.key for step in steps)
+        return steps
+
+    def on_result(self, step: Step, result: CommandResult):
+        self.in_flight.discard(step.key)
+        if step.key == ('cleanup',):
+            self.cleaned = True
+            if not result.ok:
+                lines = (result.stderr or result.stdout or result.status).strip().splitlines()
+                self.cleanup_error = lines[-1] if lines else result.status
+            return
+        if not result.ok:
+            self._command_failed(step, result)
+            return
+        if step.key[0] == 'prepare':
+            self._prepared(result.stdout)
+        else:
+            self._received(step.key[1], result)
+
+    def _prepared(self, stdout: str):
+        # 마지막 두 줄이 크기와 sha256 (로그인 배너 등 앞에 붙은 출력은 무시)
+        lines = [line.strip() for line in stdout.strip().splitlines() if line.strip()]
+        if len(lines) < 2 or not lines[-2].isdigit() or not SHA256_PATTERN.match(lines[-1]):
+            # 이 인스턴스만 실패 처리 (다시 해도 같은 출력이므로 재시도하지 않음)
+            self.error = f"원격 파일 정보를 읽을 수 없습니다: {(stdout.strip() or '(출력 없음)')[-200:]}"
+            return
+        size, sha256 = lines[-2], lines[-1]
+        self.prepared = True
+        if self.received and self.sha256 == sha256:
+            # 지난번에 다 받은 파일과 같음
+            self.unchanged = True
+            self.sent = self.total
+            self.complete = True
+            return
+        if self.received or self.sha256 != sha256 or self.total != int(size):
+            # 스냅샷이 새로 만들어졌으면 받은 조각은 버리고 처음부터
+            self.done.clear()
+            self.sent = 0
+            self.sha256, self.total = sha256, int(size)
+            self.part_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.part_path, 'wb') as f:
+                f.truncate(self.total)
+            self.save()
+        self.received = False
+        self._finish_if_done()
+
+    def _received(self, index: int, result: CommandResult):
+        sha256, _, encoded = result.stdout.strip().partition('\n')
+        try:
+            chunk = base64.b64decode(encoded.strip(), validate=True)
+        except ValueError:
+            chunk = b''
+        if _sha256(chunk) != sha256.strip() or len(chunk) != self.chunk_length(index):
+            # 출력이 잘렸거나 손상됨
+            self._failed(('chunk', index), f"chunk {index} checksum mismatch", True)
+            return
+        with open(self.part_path, 'r+b') as f:
+            f.seek(index * self.transfer.chunk_size)
+            f.write(chunk)
+        self.done.add(index)
+        self.sent += len(chunk)
+        self.save()
+        self._finish_if_done()
+
+    def _finish_if_done(self):
+        if len(self.done) < self.chunks:
+            return
+        if _file_sha256(self.part_path) != self.sha256:
+            self._discard()
+            self.error = "전체 체크섬이 맞지 않습니다. 다시 실행해주세요."
+            return
+        tmp_path = Path(f"{self.path}.bssm-tmp")
+        with gzip.open(self.part_path, 'rb') as source, open(tmp_path, 'wb') as target:
+            shutil.copyfileobj(source, target, 1024 * 1024)
+        os.replace(tmp_path, self.path)
+        self._discard()
+        self.complete = True
+        atomic_write_json(self.state_path, {'sha256': self.sha256, 'size': self.total, 'complete': True})
+
+    def _discard(self):
+        for path in (self.part_path, self.state_path):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def save(self):
+        atomic_write_json(self.state_path, {'sha256': self.sha256, 'size': self.total, 'chunks': sorted(self.done)})
+
+class PullTransfer:
+    """인스턴스 원격 경로 -> 로컬 디렉토리 (<디렉토리>/<인스턴스 ID>/<파일 이름>)"""
+
+    def __init__(self, remote_path: str, destination: Path, chunk_size: int = PULL_CHUNK_SIZE):
+        self.remote_path = remote_path
+        self.destination = Path(destination)
+        self.chunk_size = chunk_size
+        self.name = posixpath.basename(remote_path.rstrip('/')) or 'file'
+        self.transfer_id = _sha256(
+            f"pull|{remote_path}|{self.destination.resolve()}|{chunk_size}".encode('utf-8')
+        )[:16]
+        self.remote_dir = f"{REMOTE_DIR}/{self.transfer_id}"
+
+    def local_path(self, instance: Instance) -> Path:
+        return self.destination / instance.instance_id / self.name
+
+    def prepare_step(self, resume: bool) -> Step:
+        """원격 파일의 압축 스냅샷을 만들고 크기/sha256 출력
+
+        이어 받는 경우에는 이미 있는 스냅샷을 그대로 사용하여 받은 조각이 계속 유효하게 한다.
+        """
+        snapshot = '"$d/data.gz"'
+        create = f'gzip -nc "$src" > "$d/data.gz.tmp" && mv -f "$d/data.gz.tmp" {snapshot}'
+        return Step(('prepare', resume), _script(
+            f"d={shlex.quote(self.remote_dir)}",
+            f"src={shlex.quote(self.remote_path)}",
+            'mkdir -p "$d" && chmod 700 "$d"',
+            f'[ -f {snapshot} ] || {{ {create}; }}' if resume else create,
+            f'stat -c %s {snapshot}',
+            f'sha256sum {snapshot} | cut -c1-64',
+        ))
+
+    def chunk_step(self, index: int) -> Step:
+        """스냅샷의 index 번째 조각의 sha256 과 base64 출력"""
+        part = f'"$d/{index:06d}.out"'
+        return Step(('chunk', index), _script(
+            f"d={shlex.quote(self.remote_dir)}",
+            f'dd if="$d/data.gz" of={part} bs={self.chunk_size} skip={index} count=1 2>/dev/null',
+            f'sha256sum {part} | cut -c1-64',
+            f"base64 {part} | tr -d '\\n'",
+            f'rm -f {part}',
+        ))
+
+    def cleanup_step(self) -> Step:
+        return Step(('cleanup',), f"rm -rf {shlex.quote(self.remote_dir)}")
+
+    def jobs(self, instances: List[Instance]) -> List[PullJob]:
+        return [PullJob(instance, self) for instance in instances]
+
+class TransferEngine:
+    """전송 작업을 Run Command 로 실행 (인스턴스별 파이프라인)
+
+    처음에 끝나지 않은 인스턴스에서 명령을 모아 (인스턴스마다 최대 window 개, 전체 최대
+    concurrency 개) 같은 명령끼리 send_command 로 보내고, 이후에는 결과가 하나 올 때마다
+    빈자리만큼 다음 명령을 바로 보낸다. 느리거나 응답하지 않는 인스턴스가 있어도 다른
+    인스턴스의 다음 조각을 기다리게 하지 않으며, 응답하지 않는 호출은 CommandRunner 의
+    제한 시간이 지나면 실패로 돌아온다.
+
+    Args:
+        client_for: 인스턴스의 SSM 클라이언트를 돌려주는 함수
+        on_progress: 명령 결과를 반영할 때마다 호출 (job)
+        on_checkpoint: 진행 상황을 저장할 때 호출 (최대 CHECKPOINT_INTERVAL 초마다, 끝날 때 한 번)
+    """
+
+    def __init__(self, client_for: Callable[[Instance], object], concurrency: int = DEFAULT_CONCURRENCY,
+                 window: int = DEFAULT_WINDOW, timeout: int = 300, poll_workers: int = 16,
+                 on_progress: Optional[Callable[[_Job], None]] = None,
+                 on_checkpoint: Optional[Callable[[], None]] = None, clock=time.monotonic):
+        self.client_for = client_for
+        self.concurrency = concurrency
+        self.window = window
+        self.timeout = timeout
+        self.on_progress = on_progress or (lambda job: None)
+        self.on_checkpoint = on_checkpoint or (lambda: None)
+        self.clock = clock
+        self.runner = CommandRunner(max_workers=poll_workers, max_poll_interval=MAX_POLL_INTERVAL)
+        self.commands = 0  # send_command 호출 수
+        self.invocations = 0  # 인스턴스별 명령 실행 수
+
+    def _collect(self, jobs: List[_Job], budget: int) -> Dict[Tuple, Tuple[Step, List[_Job]]]:
+        """지금 보낼 명령 (step key -> (명령, 인스턴스 작업 목록), 최대 budget 개)"""
+        batch = {}
+        # 인스턴스마다 한 개씩 돌아가며 배정하여 concurrency 가 인스턴스 수보다 작아도 고르게 진행
+        for level in range(1, self.window + 1):
+            for job in jobs:
+                if budget <= 0:
+                    return batch
+                if job.finished:
+                    continue
+                for step in job.next_steps(min(level, len(job.in_flight) + budget)):
+                    batch.setdefault(step.key, (step, []))[1].append(job)
+                    budget -= 1
+        return batch
+
+    def _dispatch(self, jobs: List[_Job], invocations: List, pending: Dict) -> bool:
+        """빈자리만큼 다음 명령 전송 (보낸 명령이나 전송 실패가 있으면 True)"""
+        batch = self._collect(jobs, self.concurrency - len(pending))
+        for step, step_jobs in batch.values():
+            by_client = {}
+            for job in step_jobs:
+                by_client.setdefault((job.instance.account, job.instance.region), []).append(job)
+            for group in by_client.values():
+                by_id = {job.instance.instance_id: job for job in group}
+                sent, failures = self.runner.send(
+                    self.client_for(group[0].instance), [job.instance for job in group], [step.command],
+                    timeout=self.timeout, comment=f"bssm cp {step.key[0]}"
+                )
+                self.commands += -(-len(group) // SEND_COMMAND_MAX_TARGETS)
+                for result in failures:
+                    job = by_id[result.instance.instance_id]
+                    job.on_result(step, result)
+                    self.on_progress(job)
+                for invocation in sent:
+                    pending[(invocation.command_id, invocation.instance.instance_id)] = (
+                        step, by_id[invocation.instance.instance_id]
+                    )
+                invocations.extend(sent)
+                self.invocations += len(sent)
+        return bool(batch)
+
+    def run(self, jobs: List[_Job]):
+        """모든 작업이 끝날 때까지 실행 (결과는 각 job 에 기록)"""
+        pending = {}  # (command_id, 인스턴스 ID) -> (명령, 작업)
+        checkpoint = self.clock()
+        try:
+            while True:
+                invocations = []
+                # 전송 실패만 있었던 경우에도 재시도할 명령이 남았을 수 있으므로 다시 돌아온다
+                if not self._dispatch(jobs, invocations, pending) and not pending:
+                    break
+                # 반복 중에 invocations 에 추가한 호출은 iter_results 가 이어서 조회한다
+                for result in self.runner.iter_results(invocations):
+                    step, job = pending.pop((result.command_id, result.instance.instance_id))
+                    job.on_result(step, result)
+                    self.on_progress(job)
+                    self._dispatch(jobs, invocations, pending)
+                    if self.clock() - checkpoint >= CHECKPOINT_INTERVAL:
+                        checkpoint = self.clock()
+                        self.on_checkpoint()
+        finally:
+            self.on_checkpoint()
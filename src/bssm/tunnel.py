@@ -0,0 +1,354 @@
+"""
+백그라운드 포트 포워딩 터널 관리
+
+`bssm tunnel up` 은 터널마다 감독(supervisor) 프로세스를 하나 띄운다. 감독 프로세스는
+StartSession API 로 세션을 만들어 session-manager-plugin 을 실행하고, 종료되면 점점 긴
+간격으로 새 세션을 만들어 다시 시작한다 (세션 토큰은 재사용할 수 없다). 터널 목록은
+~/.bssm/tunnels/state.json 에 저장하며, 같은 인스턴스/원격 포트 요청이 오면 새로 띄우지
+않고 살아 있는 터널을 재사용한다.
+"""
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, Dict, Optional, Callable, Tuple
+
+from .fileutil import atomic_write_json, file_lock, read_json
+
+# 재시작 대기 시간 (초, 실패할 때마다 두 배)
+RESTART_BACKOFF = 1.0
+MAX_RESTART_BACKOFF = 60.0
+# 이 시간 이상 정상 동작한 뒤 종료되면 대기 시간을 처음부터 다시 센다 (초)
+STABLE_AFTER = 60.0
+# up 에서 로컬 포트가 열릴 때까지 기다리는 시간 (초)
+READY_TIMEOUT = 20.0
+
+def tunnel_key(instance_id: str, remote_port: int) -> str:
+    """터널 식별자 (같은 인스턴스/원격 포트는 하나의 터널을 공유)"""
+    return f"{instance_id}:{remote_port}"
+
+def pid_alive(pid: Optional[int]) -> bool:
+    """프로세스가 살아 있는지 확인"""
+    if not pid:
+        return False
+    if os.name == 'nt':
+        import ctypes
+        # PROCESS_QUERY_LIMITED_INFORMATION
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def port_open(port: int, host: str = '127.0.0.1', timeout: float = 0.2) -> bool:
+    """로컬 포트가 연결을 받고 있는지 확인"""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+def find_free_port(preferred: Optional[int] = None) -> int:
+    """사용 가능한 로컬 포트 (preferred 가 비어 있으면 그대로 사용)"""
+    for port in ([preferred] if preferred else []) + [0]:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            try:
+                sock.bind(('127.0.0.1', port))
+            except OSError:
+                continue
+            return sock.getsockname()[1]
+    raise OSError("사용 가능한 로컬 포트가 없습니다.")
+
+def check_local_port(entry: Dict, local_port: Optional[int]):
+    """재사용할 터널이 요청한 로컬 포트를 쓰는지 확인 (다르면 ValueError)"""
+    if local_port and entry['local_port'] != local_port:
+        raise ValueError(
+            f"{entry['key']} 터널이 이미 localhost:{entry['local_port']} 에서 실행 중입니다. "
+            f"localhost:{local_port} 로 바꾸려면 먼저 bssm tunnel down {entry['key']} 을 실행하세요."
+        )
+
+class TunnelManager:
+    """터널 상태 파일 관리 및 감독 프로세스 실행/종료"""
+
+    def __init__(self, base_dir: Optional[Path] = None):
+        self.base_dir = base_dir or Path.home() / '.bssm' / 'tunnels'
+        self.state_file = self.base_dir / 'state.json'
+
+    def _read(self) -> Dict[str, Dict]:
+        data = read_json(self.state_file, {})
+        return data if isinstance(data, dict) else {}
+
+    def _update(self, fn: Callable[[Dict[str, Dict]], object]):
+        """잠금을 잡은 상태에서 상태 파일 수정 (fn 의 반환값을 그대로 반환)"""
+        with file_lock(self.state_file):
+            data = self._read()
+            result = fn(data)
+            atomic_write_json(self.state_file, data)
+            return result
+
+    def log_path(self, key: str) -> Path:
+        return self.base_dir / f"{key.replace(':', '_')}.log"
+
+    def read_entry(self, key: str) -> Optional[Dict]:
+        """터널 항목 (up 이 기록을 마칠 때까지 기다린 뒤 읽는다)"""
+        with file_lock(self.state_file):
+            return self._read().get(key)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """살아 있는 터널 (없으면 None)"""
+        entry = self._read().get(key)
+        if entry is None or not pid_alive(entry.get('pid')):
+            return None
+        return entry
+
+    def entries(self) -> List[Dict]:
+        """터널 목록 (감독 프로세스가 죽은 항목은 정리하고 dead 로 표시해서 반환)"""
+        dead = []
+
+        def _prune(data):
+            for key, entry in [*data.items()]:
+                if not pid_alive(entry.get('pid')):
+                    dead.append(dict(entry, status='dead'))
+                    del data[key]
+            return [*data.values()]
+
+        alive = self._update(_prune)
+        for entry in alive:
+            if entry.get('status') == 'running' and not port_open(entry['local_port']):
+                entry['status'] = 'starting'
+        return sorted(alive + dead, key=lambda e: e['local_port'])
+
+    def find(self, target: str) -> List[Dict]:
+        """터널 ID, 인스턴스 ID, 이름 또는 로컬 포트로 터널 찾기"""
+        return [
+            entry for entry in self._read().values()
+            if target in (entry['key'], entry['instance_id'], entry.get('name'), str(entry['local_port']))
+        ]
+
+    def up(self, instance_id: str, remote_port: int, request_fn: Callable[[int], Dict],
+           local_port: Optional[int] = None, name: Optional[str] = None, env: Optional[Dict] = None,
+           **info) -> Tuple[Dict, bool]:
+        """터널 시작 (같은 인스턴스/원격 포트 터널이 살아 있으면 재사용)
+
+        Args:
+            request_fn: 로컬 포트를 받아 포트 포워딩 start_session 파라미터를 반환하는 함수
+            env: 감독 프로세스와 플러그인에 넘길 환경 변수 (AssumeRole 자격증명 등)
+            info: 상태 파일에 함께 기록할 값 (profile, region, account 등.
+                  감독 프로세스는 profile/region 으로 세션을 만든다)
+
+        Returns:
+            (터널 항목, 재사용 여부)
+
+        Raises:
+            ValueError: 살아 있는 터널이 local_port 와 다른 로컬 포트를 쓰고 있음
+        """
+        key = tunnel_key(instance_id, remote_port)
+
+        def _start(data):
+            existing = data.get(key)
+            if existing is not None and pid_alive(existing.get('pid')):
+                check_local_port(existing, local_port)
+                return existing, True
+
+            port = local_port or find_free_port(remote_port)
+            entry = dict(
+                info,
+                key=key,
+                instance_id=instance_id,
+                name=name,
+                local_port=port,
+                remote_port=remote_port,
+                request=request_fn(port),
+                status='starting',
+                restarts=0,
+                started_at=time.time()
+            )
+            entry['pid'] = self._spawn(key, env)
+            data[key] = entry
+            return entry, False
+
+        return self._update(_start)
+
+    def _spawn(self, key: str, env: Optional[Dict]) -> int:
+        """감독 프로세스 실행 (터미널과 분리)"""
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        kwargs = {}
+        if os.name == 'nt':
+            kwargs['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP | 0x00000008  # DETACHED_PROCESS
+        else:
+            kwargs['start_new_session'] = True
+
+        if getattr(sys, 'frozen', False):
+            # PyInstaller 실행 파일은 sys.executable 이 bssm 자신이라 -m 을 쓸 수 없다
+            command = [sys.executable, 'tunnel', '_supervise', key]
+        else:
+            command = [sys.executable, '-m', 'bssm.tunnel', key]
+        with open(self.log_path(key), 'ab') as log:
+            process = subprocess.Popen(
+                command,
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=log,
+                env=env,
+                close_fds=True,
+                **kwargs
+            )
+        return process.pid
+
+    def wait_ready(self, entry: Dict, timeout: float = READY_TIMEOUT) -> bool:
+        """로컬 포트가 열릴 때까지 대기"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if port_open(entry['local_port']):
+                return True
+            if not pid_alive(entry.get('pid')):
+                return False
+            time.sleep(0.2)
+        return False
+
+    def down(self, key: str) -> bool:
+        """터널 종료 (상태 파일에서 먼저 지워 감독 프로세스가 다시 시작하지 않게 한다)"""
+        entry = self._update(lambda data: data.pop(key, None))
+        if entry is None:
+            return False
+
+        pid = entry.get('pid')
+        if pid_alive(pid):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+        return True
+
+    def set_status(self, key: str, pid: int, **fields) -> bool:
+        """감독 프로세스가 자기 터널 상태 갱신 (항목이 없거나 다른 프로세스 소유면 False)"""
+        def _set(data):
+            entry = data.get(key)
+            if entry is None or entry.get('pid') != pid:
+                return False
+            entry.update(fields)
+            return True
+        return self._update(_set)
+
+def _ssm_manager(entry: Dict):
+    """터널 항목의 프로필/리전으로 SSMManager 생성
+
+    role_arn 이 있으면 source_profile 자격증명으로 다시 AssumeRole 한다. AssumeRole 임시
+    자격증명은 기본 1시간이면 만료되므로, up 할 때 받은 자격증명을 계속 쓰지 않고 재시작할
+    때마다 새로 받는다.
+    """
+    from .auth import assume_role
+    from .clients import get_client, get_pool
+    from .ssm import SSMManager
+    
+    region = entry.get('region')
+    if entry.get('role_arn'):
+        base = get_pool().session(entry.get('source_profile'), region)
+        session = assume_role(get_client(base, 'sts'), entry['role_arn'], region)
+    else:
+        session = get_pool().session(entry.get('profile'), region)
+    return SSMManager(session, region, entry.get('account'))
+
+def supervise(key: str):
+    """감독 프로세스 본체: 포트 포워딩이 종료되면 대기 후 새 세션으로 다시 시작
+
+    자격증명이 만료되어 세션을 만들 수 없으면 상태를 failed 로 바꿔 ls 에 표시하고, 다시
+    로그인하면 이어서 동작하도록 계속 재시도한다.
+    """
+    from .auth import is_auth_error
+    from .clients import get_pool
+    
+    manager = TunnelManager()
+    pid = os.getpid()
+    state = {'stop': False, 'child': None}
+    ssm_manager = None
+
+    def _terminate_child():
+        child = state['child']
+        if child is None or child.poll() is not None:
+            return
+        try:
+            if os.name == 'nt':
+                child.terminate()
+            else:
+                # 플러그인이 띄운 하위 프로세스까지 함께 종료
+                os.killpg(child.pid, signal.SIGTERM)
+        except OSError:
+            pass
+
+    def _stop(signum, frame):
+        state['stop'] = True
+        _terminate_child()
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    backoff = RESTART_BACKOFF
+    while not state['stop']:
+        entry = manager.read_entry(key)
+        if entry is None or entry.get('pid') != pid:
+            # down 되었거나 다른 감독 프로세스로 교체됨
+            break
+
+        started = time.time()
+        kwargs = {} if os.name == 'nt' else {'start_new_session': True}
+        session_id = None
+        error = None
+        try:
+            if ssm_manager is None or entry.get('role_arn'):
+                ssm_manager = _ssm_manager(entry)
+            cmd, env, session_id = ssm_manager.plugin_command(entry['request'])
+            state['child'] = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, env=env, **kwargs)
+        except Exception as e:
+            # 자격증명 만료, 네트워크 오류, 플러그인 없음 등
+            print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] 실행 실패: {e}", flush=True)
+            code = None
+            if is_auth_error(e):
+                # 다음 재시작에서 (SSO 재로그인 후의) 새 자격증명으로 세션부터 다시 만든다
+                error = f"자격증명 만료: {e}"
+                ssm_manager = None
+                get_pool().invalidate(entry.get('source_profile') or entry.get('profile'))
+        else:
+            manager.set_status(key, pid, status='running', child_pid=state['child'].pid, error=None)
+            code = state['child'].wait()
+            state['child'] = None
+        if session_id is not None:
+            # 플러그인이 강제 종료되면 세션이 유휴 시간 초과까지 남으므로 직접 종료
+            ssm_manager.terminate_session(session_id)
+
+        if state['stop']:
+            break
+
+        if time.time() - started >= STABLE_AFTER:
+            backoff = RESTART_BACKOFF
+
+        restarts = entry.get('restarts', 0) + 1
+        if not manager.set_status(key, pid, status='failed' if error else 'restarting',
+                                  restarts=restarts, last_exit=code, error=error):
+            break
+        print(
+            f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] 포트 포워딩 종료 (code={code}), "
+            f"{backoff:.0f}초 후 재시작 ({restarts}번째)",
+            flush=True
+        )
+
+        deadline = time.time() + backoff
+        while not state['stop'] and time.time() < deadline:
+            time.sleep(0.2)
+        backoff = min(backoff * 2, MAX_RESTART_BACKOFF)
+
+    _terminate_child()
+
+if __name__ == '__main__':
+    supervise(sys.argv[1])
@@ -2,16 +2,55 @@
 사용자 인터페이스 관리
 """
 
-from typing import List, Dict, Optional
-from rich.console import Console
+import threading
+from typing import List, Optional
+from rich.cells import cell_len
+from rich.console import Console, Group
+from rich.live import Live
+from rich.markup import escape
 from rich.table import Table
 from rich.panel import Panel
 from rich.prompt import Prompt, IntPrompt
 from rich.text import Text
 from rich import print as rprint
 
+from . import trace
+from .models import Instance
+from .search import SearchIndex
+from .terminal import is_interactive, raw_mode
+
 console = Console()
 
+# 컬럼 폭 계산에 사용할 표본 행 수
+WIDTH_SAMPLE_SIZE = 200
+
+# (헤더, Instance 속성, 스타일, 최소 폭, 최대 폭)
+_COLUMN_SPECS = (
+    ("이름", 'name', "green", 12, 48),
+    ("Instance ID", 'instance_id', "blue", 19, 19),
+    ("계정", 'account', "white", 12, 12),
+    ("리전", 'region', "white", 9, 16),
+    ("상태", 'state', "yellow", 7, 13),
+    ("타입", 'instance_type', "magenta", 8, 16),
+    ("Private IP", 'private_ip', "cyan", 10, 15),
+    ("플랫폼", 'platform', "white", 6, 10),
+)
+
+def state_markup(state: Optional[str]) -> str:
+    """상태에 따른 색상"""
+    if state == 'running':
+        return "[green]running[/green]"
+    if state == 'stopped':
+        return "[red]stopped[/red]"
+    return f"[yellow]{state}[/yellow]"
+
+def _sample(instances: List[Instance], size: int = WIDTH_SAMPLE_SIZE) -> List[Instance]:
+    """전체에서 고르게 뽑은 표본 행"""
+    if len(instances) <= size:
+        return instances
+    step = len(instances) / size
+    return [instances[int(i * step)] for i in range(size)]
+
 class UI:
     def __init__(self):
         self.console = console
@@ -25,45 +64,232 @@ class UI:
         )
         self.console.print(panel)
     
-    def show_instances_table(self, instances: List[Dict]):
-        """인스턴스 목록 테이블 표시"""
+    def page_size(self) -> int:
+        """한 화면에 표시할 행 수 (제목/헤더/테두리/안내 줄 제외)"""
+        return max(5, self.console.size.height - 10)
+    
+    def _columns(self, instances: List[Instance], favorites: Optional[set] = None) -> List[tuple]:
+        """컬럼 구성과 폭 계산
+        
+        폭은 전체 행이 아닌 표본 행으로 계산하므로 인스턴스 수와 관계없이 일정한 시간이 걸리고,
+        페이지를 넘겨도 컬럼 폭이 바뀌지 않는다. 표본보다 긴 값은 말줄임표로 자른다.
+        """
+        sample = _sample(instances)
+        # 여러 계정/리전을 조회한 경우에만 계정/리전 컬럼 표시
+        show_account = len({instance.account for instance in instances}) > 1
+        show_region = len({instance.region for instance in instances}) > 1
+        
+        columns = [("번호", None, "cyan", len(str(len(instances))), 4, 7)]
+        for header, key, style, min_width, max_width in _COLUMN_SPECS:
+            if (key == 'account' and not show_account) or (key == 'region' and not show_region):
+                continue
+            width = max((cell_len(str(getattr(instance, key) or '')) for instance in sample), default=0)
+            if key == 'name' and favorites:
+                width += 2  # ⭐ 표시
+            columns.append((header, key, style, width, min_width, max_width))
+        
+        columns = [
+            (header, key, style, min(max(width, min_width, cell_len(header)), max_width))
+            for header, key, style, width, min_width, max_width in columns
+        ]
+        
+        # 터미널 폭을 넘으면 이름, 플랫폼, 타입 순으로 줄인다 (컬럼마다 테두리/여백 3칸)
+        for shrink_key, floor in (('name', 8), ('platform', 4), ('instance_type', 5)):
+            overflow = sum(width for _, _, _, width in columns) + 3 * len(columns) + 1 - self.console.width
+            if overflow <= 0:
+                break
+            columns = [
+                (header, key, style, max(floor, width - overflow) if key == shrink_key else width)
+                for header, key, style, width in columns
+            ]
+        return columns
+    
+    def _instances_table(self, instances: List[Instance], title: str, columns: List[tuple],
+                         start: int = 1, cursor: Optional[int] = None,
+                         favorites: Optional[set] = None, caption: Optional[str] = None) -> Table:
+        """인스턴스 테이블 생성 (start: 첫 행 번호, cursor: 강조할 행)"""
+        table = Table(title=title, caption=caption)
+        for header, key, style, width in columns:
+            # 터미널이 좁아도 번호와 Instance ID 는 잘리지 않게 유지
+            min_width = width if key in (None, 'instance_id') else None
+            table.add_column(header, style=style, width=width, min_width=min_width,
+                             no_wrap=True, overflow="ellipsis")
+        
+        for i, instance in enumerate(instances):
+            row = []
+            for _, key, _, _ in columns:
+                if key is None:
+                    row.append(str(start + i))
+                elif key == 'state':
+                    row.append(state_markup(instance.state))
+                elif key == 'name' and favorites and instance.instance_id in favorites:
+                    row.append(f"⭐ {instance.name}")
+                else:
+                    row.append(getattr(instance, key) or '')
+            table.add_row(*row, style="reverse" if i == cursor else None)
+        
+        return table
+    
+    def _page_table(self, instances: List[Instance], columns: List[tuple], page: int, limit: int) -> Table:
+        """page 번째 페이지(1부터) 테이블"""
+        pages = max(1, -(-len(instances) // limit))
+        start = (page - 1) * limit
+        return self._instances_table(
+            instances[start:start + limit],
+            title=f"SSM 연결 가능한 인스턴스 ({len(instances)}개)",
+            columns=columns,
+            start=start + 1,
+            caption=f"페이지 {page}/{pages}" if pages > 1 else None
+        )
+    
+    def show_instances_table(self, instances: List[Instance], limit: Optional[int] = None,
+                             page: Optional[int] = None):
+        """인스턴스 목록 테이블 표시
+        
+        limit 을 지정하면 해당 페이지만 출력한다. 지정하지 않으면 터미널에서는 한 화면씩
+        키보드로 넘겨 보고, 파이프 등에서는 페이지 단위로 나누어 전체를 출력한다.
+        """
         if not instances:
             rprint("[yellow]📝 SSM 연결 가능한 인스턴스가 없습니다.[/yellow]")
             return
         
-        table = Table(title=f"SSM 연결 가능한 인스턴스 ({len(instances)}개)")
-        table.add_column("번호", style="cyan", width=4)
-        table.add_column("이름", style="green", min_width=20)
-        table.add_column("Instance ID", style="blue", min_width=19)
-        table.add_column("상태", style="yellow", width=10)
-        table.add_column("타입", style="magenta", width=12)
-        table.add_column("Private IP", style="cyan", width=15)
-        table.add_column("플랫폼", style="white", width=8)
+        with trace.span('ui.columns', rows=len(instances)):
+            columns = self._columns(instances)
         
-        for i, instance in enumerate(instances):
-            # 상태에 따른 색상
-            state = instance['State']
-            if state == 'running':
-                state_color = "[green]running[/green]"
-            elif state == 'stopped':
-                state_color = "[red]stopped[/red]"
-            else:
-                state_color = f"[yellow]{state}[/yellow]"
+        if limit:
+            pages = max(1, -(-len(instances) // limit))
+            page = page or 1
+            if not 1 <= page <= pages:
+                rprint(f"[red]❌ 잘못된 페이지입니다. 1-{pages} 사이의 숫자를 입력하세요.[/red]")
+                return
+            with trace.span('ui.render', rows=min(limit, len(instances))):
+                self.console.print(self._page_table(instances, columns, page, limit))
+            return
+        
+        limit = self.page_size()
+        if len(instances) > limit and is_interactive():
+            self.page_instances(instances, columns, limit, page or 1)
+            return
+        
+        # 한 번에 테이블 하나로 만들면 행 수에 비례해 첫 출력까지 오래 걸리므로 페이지 단위로 출력
+        chunk = max(limit, 100)
+        with trace.span('ui.render', rows=len(instances)):
+            for start in range(0, len(instances), chunk):
+                self.console.print(self._instances_table(
+                    instances[start:start + chunk],
+                    title=f"SSM 연결 가능한 인스턴스 ({len(instances)}개)" if start == 0 else None,
+                    columns=columns,
+                    start=start + 1
+                ))
+    
+    def page_instances(self, instances: List[Instance], columns: List[tuple], limit: int, page: int = 1):
+        """키보드로 페이지를 넘기며 보는 테이블 (현재 페이지만 렌더링)"""
+        pages = max(1, -(-len(instances) // limit))
+        page = min(max(page, 1), pages)
+        hint = "[dim]←→/PgUp PgDn 이동 · Home/End 처음/끝 · q 종료[/dim]"
+        
+        def _render():
+            return Group(self._page_table(instances, columns, page, limit), Text.from_markup(hint))
+        
+        with raw_mode() as keys, Live(_render(), console=self.console, auto_refresh=False) as live:
+            trace.mark('ui.first_paint')
+            while True:
+                key = keys.read_key()
+                if key in ('q', 'esc', 'enter', 'ctrl-c', 'ctrl-d'):
+                    break
+                if key in ('right', 'down', 'pgdn', ' ', 'n'):
+                    new_page = min(page + 1, pages)
+                elif key in ('left', 'up', 'pgup', 'p'):
+                    new_page = max(page - 1, 1)
+                elif key in ('home', 'g'):
+                    new_page = 1
+                elif key in ('end', 'G'):
+                    new_page = pages
+                else:
+                    continue
+                if new_page != page:
+                    page = new_page
+                    live.update(_render(), refresh=True)
             
-            table.add_row(
-                str(i + 1),
-                instance['Name'],
-                instance['InstanceId'],
-                state_color,
-                instance['InstanceType'],
-                instance['PrivateIpAddress'],
-                instance['Platform']
+            # 종료 후에는 안내 줄 없이 마지막으로 본 페이지만 남긴다
+            live.update(self._page_table(instances, columns, page, limit), refresh=True)
+    
+    def search_instance(self, instances: List[Instance], favorites: Optional[List[str]] = None,
+                        history: Optional[List[str]] = None) -> Optional[Instance]:
+        """타이핑하는 대로 좁혀지는 인스턴스 검색/선택 UI
+        
+        이름, Instance ID, IP, 타입, 플랫폼으로 검색하며 즐겨찾기와 최근 접속한
+        인스턴스가 먼저 표시된다.
+        """
+        index = SearchIndex(instances, favorites=favorites, history=history)
+        # trigram 색인은 백그라운드에서 만들고, 완성 전에는 전체 검사로 검색
+        threading.Thread(target=index.build, name='bssm-search-index', daemon=True).start()
+        
+        favorite_ids = set(favorites or ())
+        with trace.span('ui.columns', rows=len(instances)):
+            columns = self._columns(instances, favorites=favorite_ids)
+        limit = self.page_size()
+        
+        query = ''
+        cursor = 0
+        results = index.search(query, limit=limit)
+        
+        def _render():
+            title = (
+                f"🔍 {escape(query)}▏ ({index.last_count}/{len(index)}개)  "
+                "[dim]↑↓ 이동 · Enter 연결 · Esc 취소[/dim]"
+            )
+            if not results:
+                return Text.from_markup(f"{title}\n[yellow]일치하는 인스턴스가 없습니다.[/yellow]")
+            return self._instances_table(
+                results, title=title, columns=columns, cursor=cursor, favorites=favorite_ids
             )
         
-        self.console.print(table)
+        selected = None
+        with raw_mode() as keys, Live(_render(), console=self.console, auto_refresh=False,
+                                      transient=True) as live:
+            trace.mark('ui.first_paint')
+            while True:
+                key = keys.read_key()
+                if key in ('esc', 'ctrl-c', 'ctrl-d'):
+                    break
+                if key == 'enter':
+                    selected = results[cursor] if results else None
+                    break
+                
+                if key == 'up':
+                    cursor = max(0, cursor - 1)
+                elif key == 'down':
+                    cursor = min(max(0, len(results) - 1), cursor + 1)
+                else:
+                    if key == 'backspace':
+                        query = query[:-1]
+                    elif key == 'ctrl-u':
+                        query = ''
+                    elif len(key) == 1 and key.isprintable():
+                        query += key
+                    else:
+                        continue
+                    with trace.span('ui.search', query_length=len(query)):
+                        results = index.search(query, limit=limit)
+                    cursor = 0
+                
+                with trace.span('ui.redraw'):
+                    live.update(_render(), refresh=True)
+        
+        if selected is None:
+            rprint("[yellow]👋 선택이 취소되었습니다.[/yellow]")
+            return None
+        
+        rprint(f"[green]✅ 선택된 인스턴스:[/green] {selected.name} ({selected.instance_id})")
+        return selected
     
-    def select_instance(self, instances: List[Dict]) -> Optional[Dict]:
-        """인스턴스 선택 UI"""
+    def select_instance(self, instances: List[Instance], favorites: Optional[List[str]] = None,
+                        history: Optional[List[str]] = None) -> Optional[Instance]:
+        """인스턴스 선택 UI (터미널이면 검색 UI, 아니면 번호 입력)"""
+        if instances and is_interactive():
+            return self.search_instance(instances, favorites=favorites, history=history)
+        
         self.show_instances_table(instances)
         
         if not instances:
@@ -81,7 +307,7 @@ class UI:
                 selected = instances[choice - 1]
                 
                 # 선택 확인
-                rprint(f"[green]✅ 선택된 인스턴스:[/green] {selected['Name']} ({selected['InstanceId']})")
+                rprint(f"[green]✅ 선택된 인스턴스:[/green] {selected.name} ({selected.instance_id})")
                 return selected
             else:
                 rprint(f"[red]❌ 잘못된 번호입니다. 1-{len(instances)} 사이의 숫자를 입력하세요.[/red]")
@@ -94,6 +320,64 @@ class UI:
             rprint(f"[red]❌ 입력 오류: {str(e)}[/red]")
             return None
     
+    def show_command_result(self, result, group: int, max_lines: int = 20):
+        """run 결과 한 건과 출력 내용 표시 (출력 종류마다 처음 한 번)"""
+        icon = "✅" if result.ok else "❌"
+        color = "green" if result.ok else "red"
+        line = (
+            f"[{color}]{icon} {escape(result.instance.name)}[/{color}] "
+            f"[dim]({result.instance.instance_id})[/dim] {result.status} (종료 코드 {result.response_code})"
+        )
+        self.console.print(f"{line} [dim]· 출력 #{group}[/dim]")
+        output = (result.stdout + result.stderr).rstrip('\n')
+        if output:
+            lines = output.split('\n')
+            for text in lines[:max_lines]:
+                self.console.print(f"    {escape(text)}", highlight=False)
+            if len(lines) > max_lines:
+                self.console.print(f"    [dim]... {len(lines) - max_lines}줄 더[/dim]")
+    
+    def show_command_summary(self, groups, max_names: int = 5, max_failed_names: int = 20):
+        """run 결과를 출력이 같은 인스턴스끼리 묶어서 표시 (실패한 묶음은 이름을 더 많이 표시)"""
+        if not groups:
+            return
+        
+        table = Table(title=f"출력 종류별 인스턴스 ({len(groups)}종류)")
+        table.add_column("출력", style="cyan", width=6)
+        table.add_column("상태", style="yellow")
+        table.add_column("인스턴스 수", style="magenta", justify="right")
+        table.add_column("인스턴스", style="green")
+        
+        for number, first, results in groups:
+            limit = max_names if first.ok else max_failed_names
+            names = ", ".join(escape(result.instance.name) for result in results[:limit])
+            if len(results) > limit:
+                names += f" 외 {len(results) - limit}개"
+            status = f"{first.status} ({first.response_code})"
+            table.add_row(f"#{number}", status if first.ok else f"[red]{status}[/red]", str(len(results)), names)
+        
+        self.console.print(table)
+    
+    def transfer_progress(self):
+        """bssm cp 진행 표시 (인스턴스별 막대와 전체 막대, 터미널이 아니면 표시하지 않음)"""
+        from rich.progress import Progress, BarColumn, DownloadColumn, TextColumn, TransferSpeedColumn
+        return Progress(
+            TextColumn("{task.description}", style="green"),
+            BarColumn(),
+            DownloadColumn(),
+            TransferSpeedColumn(),
+            console=self.console,
+            disable=not is_interactive()
+        )
+    
+    def show_transfer_result(self, job, message: str):
+        """bssm cp 인스턴스 한 개의 결과"""
+        name = f"{escape(job.instance.name)} [dim]({job.instance.instance_id})[/dim]"
+        if job.error is None:
+            self.console.print(f"[green]✅[/green] {name} {escape(message)}")
+        else:
+            self.console.print(f"[red]❌[/red] {name} [red]{escape(job.error)}[/red]")
+    
     def show_error(self, message: str):
         """에러 메시지 표시"""
         panel = Panel(
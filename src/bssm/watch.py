@@ -0,0 +1,271 @@
+"""
+인스턴스 목록 실시간 보기 (bssm watch)
+
+주기적으로 인스턴스 목록을 조회하여 이전 결과와 인스턴스 ID 별로 비교하고, 바뀐 행만
+다시 만들어 rich.live 화면을 갱신한다. 바뀐 것이 없으면 화면을 다시 그리지 않는다.
+
+SSM/EC2 API 에는 '마지막 조회 이후 바뀐 것만' 요청하는 조건이 없으므로, 매 조회는
+캐시를 기준 스냅샷으로 한 증분 동기화(--refresh 와 같음)로 한다. SSM 목록은 전체를
+받지만 describe_instances 는 새로 생기거나 SSM 정보가 바뀐 인스턴스에 대해서만 호출한다.
+
+그래서 변경이 보이는 시점은 종류마다 다르다.
+
+- 추가/제거 (SSM 연결 가능 목록에 생기거나 빠짐. 중지된 인스턴스는 빠진다): 다음 조회
+- 사설 IP, 플랫폼 (SSM 정보에 있음): 다음 조회
+- 이름, 인스턴스 타입, 공인 IP, EC2 상태: 조회마다 나머지의 1/REVALIDATE_SLICES 씩
+  다시 조회하므로 최대 REVALIDATE_SLICES 번째 조회, 늦어도 WATCH_FULL_SYNC_INTERVAL 이내
+  (--full-refresh 를 주면 매번 전체 조회하여 다음 조회에 보인다)
+"""
+
+import time
+from typing import List, Dict, Optional, Tuple
+
+from rich.console import Group
+from rich.live import Live
+from rich.markup import escape
+from rich.table import Table
+from rich.text import Text
+
+from .models import Instance
+from .terminal import is_interactive
+from .ui import state_markup
+
+# 바뀌면 변경으로 표시할 필드 (launch_time 등 표시하지 않는 값은 제외)
+WATCH_FIELDS = ('name', 'state', 'instance_type', 'private_ip', 'public_ip', 'platform', 'ssm_status')
+# watch 중 증분 동기화 사이사이에 전체 조회할 주기 (초, 이름/태그 변경이 늦어도 이 안에 보인다)
+WATCH_FULL_SYNC_INTERVAL = 5 * 60
+# 추가/제거/변경된 행을 강조해 두는 조회 횟수 (제거된 행은 그동안 취소선으로 남긴다)
+HIGHLIGHT_POLLS = 3
+
+# 표시 종류 -> (번호 컬럼 표시, 행 스타일)
+_MARKS = {
+    'added': ("[bold green]+[/bold green]", "green"),
+    'removed': ("[bold red]-[/bold red]", "dim strike"),
+    'changed': ("[bold yellow]~[/bold yellow]", None),
+}
+
+def changed_fields(old: Instance, new: Instance) -> List[str]:
+    """두 조회 결과에서 값이 바뀐 필드"""
+    return [field for field in WATCH_FIELDS if getattr(old, field) != getattr(new, field)]
+
+class InventoryDiff:
+    """두 조회 결과의 차이 (인스턴스 ID 기준)"""
+
+    def __init__(self, added: List[Instance], removed: List[Instance],
+                 changed: List[Tuple[Instance, Instance, List[str]]]):
+        self.added = added
+        self.removed = removed
+        self.changed = changed  # (이전, 현재, 바뀐 필드)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def summary(self) -> str:
+        return f"+{len(self.added)} -{len(self.removed)} ~{len(self.changed)}"
+
+def diff_instances(previous: Dict[str, Instance], current: Dict[str, Instance]) -> InventoryDiff:
+    """인스턴스 ID -> 인스턴스 맵 두 개 비교"""
+    changed = []
+    for instance_id in previous.keys() & current.keys():
+        fields = changed_fields(previous[instance_id], current[instance_id])
+        if fields:
+            changed.append((previous[instance_id], current[instance_id], fields))
+    return InventoryDiff(
+        added=[current[i] for i in current.keys() - previous.keys()],
+        removed=[previous[i] for i in previous.keys() - current.keys()],
+        changed=changed
+    )
+
+def _sort_key(instance: Instance):
+    return (instance.name.lower(), instance.account or '', instance.region or '')
+
+class InventoryWatcher:
+    """인스턴스 목록을 interval 초마다 조회하며 바뀐 행만 갱신
+
+    Args:
+        loader: 조회할 InventoryLoader (refresh=True 로 만들어 매번 증분 동기화)
+        targets, regions: loader.load() 인자
+        interval: 조회 주기 (초)
+        ui: 컬럼 폭 계산과 출력에 사용할 UI
+    """
+
+    def __init__(self, loader, targets, regions, interval: float, ui):
+        self.loader = loader
+        self.targets = targets
+        self.regions = regions
+        self.interval = interval
+        self.ui = ui
+        self.console = ui.console
+        self.polls = 0
+        self.instances = {}  # 인스턴스 ID -> 인스턴스
+        self.order = []  # 이름순 인스턴스 ID (추가/제거/이름 변경 시에만 다시 정렬)
+        self.marks = {}  # 인스턴스 ID -> (표시 종류, 표시한 조회 번호, 바뀐 필드, 이전 상태)
+        self.removed = {}  # 강조가 끝날 때까지 남겨 둘 제거된 인스턴스
+        self.errors = []
+        self.last_change = None
+        self.last_diff = None
+        self._rows = {}  # 인스턴스 ID -> 만들어 둔 행 (바뀐 행만 다시 만든다)
+        self._columns = None
+        self._size = None
+
+    def poll(self) -> InventoryDiff:
+        """한 번 조회하고 이전 결과와 비교 (첫 조회는 변경 없음)"""
+        current = {instance.instance_id: instance for instance in self.loader.load(self.targets, self.regions)}
+        # 조회에 실패한 (계정, 리전) 의 인스턴스는 사라진 것으로 보지 않고 이전 값 유지
+        for instance_id, instance in self.instances.items():
+            if instance_id not in current and (instance.account, instance.region) in self.loader.failed:
+                current[instance_id] = instance
+        self.errors = [*self.loader.errors]
+
+        diff = diff_instances(self.instances, current) if self.polls else InventoryDiff([], [], [])
+        self.polls += 1
+        self.instances = current
+
+        if diff:
+            self.last_change = time.time()
+            self.last_diff = diff
+            for instance in diff.added:
+                self._mark(instance.instance_id, 'added')
+            for old, new, fields in diff.changed:
+                self._mark(new.instance_id, 'changed', fields, old.state if 'state' in fields else None)
+            for instance in diff.removed:
+                self.removed[instance.instance_id] = instance
+                self._mark(instance.instance_id, 'removed')
+            for instance in diff.added:
+                self.removed.pop(instance.instance_id, None)
+        if not self.order or diff.added or diff.removed or any('name' in f for _, _, f in diff.changed):
+            self.order = sorted(current, key=lambda i: _sort_key(current[i]))
+        return diff
+
+    def _mark(self, instance_id: str, kind: str, fields: Optional[List[str]] = None,
+              previous_state: Optional[str] = None):
+        self.marks[instance_id] = (kind, self.polls, fields or [], previous_state)
+        self._rows.pop(instance_id, None)
+
+    def expire_marks(self) -> bool:
+        """강조 기간이 지난 표시 제거 (제거한 것이 있으면 True)"""
+        expired = [i for i, (_, poll, _, _) in self.marks.items() if self.polls - poll >= HIGHLIGHT_POLLS]
+        for instance_id in expired:
+            del self.marks[instance_id]
+            self.removed.pop(instance_id, None)
+            self._rows.pop(instance_id, None)
+        return bool(expired)
+
+    def _row(self, instance_id: str) -> Tuple[List[str], Optional[str]]:
+        """(셀 목록, 행 스타일)"""
+        row = self._rows.get(instance_id)
+        if row is not None:
+            return row
+        instance = self.instances.get(instance_id) or self.removed[instance_id]
+        kind, _, fields, previous_state = self.marks.get(instance_id, (None, 0, [], None))
+        marker, style = _MARKS.get(kind, ("", None))
+        cells = []
+        for _, key, _, _ in self._columns:
+            if key is None:
+                cells.append(marker)
+            elif key == 'state' and previous_state is not None:
+                cells.append(f"{state_markup(previous_state)} → {state_markup(instance.state)}")
+            elif key == 'state':
+                cells.append(state_markup(instance.state))
+            elif key in fields:
+                cells.append(f"[bold]{escape(getattr(instance, key) or '')}[/bold]")
+            else:
+                cells.append(escape(getattr(instance, key) or ''))
+        row = self._rows[instance_id] = (cells, style)
+        return row
+
+    def render(self):
+        """강조된 행을 먼저, 나머지는 이름순으로 한 화면만큼 표시"""
+        size = self.console.size
+        columns = self.ui._columns([*self.instances.values(), *self.removed.values()])
+        # 상태가 바뀐 행은 '이전 → 현재' 를 모두 보여줄 수 있게 상태 컬럼을 넓힌다
+        transitions = [
+            len(f"{previous_state} → {self.instances[i].state}")
+            for i, (_, _, _, previous_state) in self.marks.items()
+            if previous_state is not None and i in self.instances
+        ]
+        if transitions:
+            columns = [
+                (header, key, style, max(width, *transitions) if key == 'state' else width)
+                for header, key, style, width in columns
+            ]
+        if columns != self._columns or size != self._size:
+            self._columns, self._size = columns, size
+            self._rows.clear()
+
+        limit = max(1, self.ui.page_size() - len(self.errors))
+        highlighted = sorted(
+            self.marks,
+            key=lambda i: _sort_key(self.instances.get(i) or self.removed[i])
+        )
+        visible = highlighted[:limit]
+        if len(visible) < limit:
+            marked = set(self.marks)
+            visible += [i for i in self.order if i not in marked][:limit - len(visible)]
+
+        hidden = len(self.instances) + len(self.removed) - len(visible)
+        table = Table(
+            title=f"👀 SSM 연결 가능한 인스턴스 ({len(self.instances)}개)",
+            caption=f"외 {hidden}개" if hidden > 0 else None
+        )
+        for header, key, style, width in self._columns:
+            table.add_column("" if key is None else header, style=style, width=width,
+                             min_width=width if key in (None, 'instance_id') else None,
+                             no_wrap=True, overflow="ellipsis")
+        for instance_id in visible:
+            cells, style = self._row(instance_id)
+            table.add_row(*cells, style=style)
+
+        status = f"{self.interval:g}초마다 갱신"
+        if self.last_change is not None:
+            status += (
+                f" · 마지막 변경 {time.strftime('%H:%M:%S', time.localtime(self.last_change))}"
+                f" ({self.last_diff.summary()})"
+            )
+        lines = [f"[red]❌ {escape(error)}[/red]" for error in self.errors]
+        lines.append(f"[dim]{status} · Ctrl+C 종료[/dim]")
+        return Group(table, Text.from_markup("\n".join(lines)))
+
+    def _print_diff(self, diff: InventoryDiff):
+        """터미널이 아닐 때 변경 내용을 한 줄씩 출력"""
+        now = time.strftime('%H:%M:%S')
+        for instance in sorted(diff.added, key=_sort_key):
+            self.console.print(f"{now} [green]+ {escape(instance.name)}[/green] ({instance.instance_id}) {instance.state}")
+        for instance in sorted(diff.removed, key=_sort_key):
+            self.console.print(f"{now} [red]- {escape(instance.name)}[/red] ({instance.instance_id})")
+        for old, new, fields in sorted(diff.changed, key=lambda change: _sort_key(change[1])):
+            details = ", ".join(f"{field}: {getattr(old, field)} → {getattr(new, field)}" for field in fields)
+            self.console.print(f"{now} [yellow]~ {escape(new.name)}[/yellow] ({new.instance_id}) {escape(details)}")
+
+    def _wait(self, started: float):
+        time.sleep(max(0.0, self.interval - (time.time() - started)))
+
+    def run(self):
+        """Ctrl+C 를 누를 때까지 조회 반복"""
+        started = time.time()
+        with self.console.status("[bold green]인스턴스 목록을 가져오는 중..."):
+            self.poll()
+
+        if not is_interactive():
+            self.console.print(f"[blue]👀 인스턴스 {len(self.instances)}개, {self.interval:g}초마다 변경 사항을 출력합니다.[/blue]")
+            while True:
+                self._wait(started)
+                started = time.time()
+                errors = self.errors
+                diff = self.poll()
+                for error in self.errors:
+                    if error not in errors:
+                        self.console.print(f"[red]❌ {escape(error)}[/red]")
+                if diff:
+                    self._print_diff(diff)
+
+        with Live(self.render(), console=self.console, auto_refresh=False) as live:
+            while True:
+                self._wait(started)
+                started = time.time()
+                errors = self.errors
+                diff = self.poll()
+                expired = self.expire_marks()
+                # 바뀐 것이 없으면 다시 그리지 않는다 (터미널 크기가 바뀐 경우 제외)
+                if diff or expired or errors != self.errors or self.console.size != self._size:
+                    live.update(self.render(), refresh=True)
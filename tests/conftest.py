@@ -0,0 +1,25 @@
+"""공용 테스트 설정 (설치하지 않은 소스 트리에서도 테스트할 수 있도록 src 를 import 경로에 추가)"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+class FakeClock:
+    """sleep 하면 시각만 앞으로 가는 시계"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+@pytest.fixture
+def clock():
+    """CommandRunner/TransferEngine 에 clock 과 sleep 으로 넘길 가짜 시계"""
+    return FakeClock()
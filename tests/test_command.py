@@ -0,0 +1,157 @@
+"""
+CommandRunner / OutputGroups 테스트 (botocore Stubber 로 SSM 응답 재현)
+"""
+
+import botocore.session
+import pytest
+from botocore.stub import Stubber
+
+from bssm.command import (
+    CommandResult, CommandRunner, OutputGroups, DEADLINE_GRACE, SEND_COMMAND_MAX_TARGETS
+)
+from bssm.models import Instance
+
+COMMAND_ID = '11111111-2222-3333-4444-555555555555'
+
+def _instances(count, platform='Linux'):
+    return [
+        Instance(f"i-{index:017x}", f"web-{index}", 'running', 't3.micro', platform=platform, region='us-east-1')
+        for index in range(count)
+    ]
+
+def _invocation(instance, status='Success', code=0, stdout=''):
+    return {
+        'CommandId': COMMAND_ID,
+        'InstanceId': instance.instance_id,
+        'Status': status,
+        'ResponseCode': code,
+        'StandardOutputContent': stdout,
+        'StandardErrorContent': '',
+    }
+
+def _poll_params(instance):
+    return {'CommandId': COMMAND_ID, 'InstanceId': instance.instance_id}
+
+@pytest.fixture
+def ssm():
+    client = botocore.session.get_session().create_client(
+        'ssm', region_name='us-east-1', aws_access_key_id='test', aws_secret_access_key='test'
+    )
+    with Stubber(client) as stubber:
+        yield client, stubber
+        stubber.assert_no_pending_responses()
+
+@pytest.fixture
+def runner(clock):
+    # 조회 스레드를 하나만 두어 Stubber 응답 순서를 고정
+    return CommandRunner(max_workers=1, sleep=clock.sleep, clock=clock)
+
+def test_send_splits_targets_into_chunks_of_50(ssm, runner):
+    client, stubber = ssm
+    instances = _instances(SEND_COMMAND_MAX_TARGETS * 2 + 20)
+    for start in range(0, len(instances), SEND_COMMAND_MAX_TARGETS):
+        chunk = instances[start:start + SEND_COMMAND_MAX_TARGETS]
+        stubber.add_response('send_command', {'Command': {'CommandId': COMMAND_ID}}, {
+            'InstanceIds': [instance.instance_id for instance in chunk],
+            'DocumentName': 'AWS-RunShellScript',
+            'Parameters': {'commands': ['uptime'], 'executionTimeout': ['60']},
+            'TimeoutSeconds': 60,
+        })
+
+    invocations, failures = runner.send(client, instances, ['uptime'], timeout=60)
+
+    assert failures == []
+    assert len(invocations) == len(instances)
+
+def test_send_does_not_inject_run_command_parameters_into_custom_documents(ssm, runner):
+    client, stubber = ssm
+    instances = _instances(1)
+    stubber.add_response('send_command', {'Command': {'CommandId': COMMAND_ID}}, {
+        'InstanceIds': [instances[0].instance_id],
+        'DocumentName': 'Custom-Document',
+        'Parameters': {'action': ['Install']},
+        'TimeoutSeconds': 60,
+    })
+
+    runner.send(client, instances, None, document_name='Custom-Document', timeout=60,
+                parameters={'action': ['Install']})
+
+def test_send_failure_is_reported_per_instance(ssm, runner):
+    client, stubber = ssm
+    instances = _instances(2)
+    stubber.add_client_error('send_command', service_error_code='InvalidInstanceId')
+
+    invocations, failures = runner.send(client, instances, ['uptime'])
+
+    assert invocations == []
+    assert [result.status for result in failures] == ['SendFailed', 'SendFailed']
+
+def test_pending_then_success(ssm, runner):
+    client, stubber = ssm
+    instance = _instances(1)[0]
+    stubber.add_response('send_command', {'Command': {'CommandId': COMMAND_ID}})
+    stubber.add_response('get_command_invocation', _invocation(instance, 'Pending', -1), _poll_params(instance))
+    stubber.add_response('get_command_invocation', _invocation(instance, 'InProgress', -1), _poll_params(instance))
+    stubber.add_response('get_command_invocation', _invocation(instance, stdout='up 3 days\n'), _poll_params(instance))
+
+    results = list(runner.run(client, [instance], ['uptime']))
+
+    assert len(results) == 1
+    assert results[0].ok
+    assert results[0].stdout == 'up 3 days\n'
+
+def test_invocation_does_not_exist_is_retried(ssm, runner):
+    client, stubber = ssm
+    instance = _instances(1)[0]
+    stubber.add_response('send_command', {'Command': {'CommandId': COMMAND_ID}})
+    stubber.add_client_error('get_command_invocation', service_error_code='InvocationDoesNotExist')
+    stubber.add_response('get_command_invocation', _invocation(instance), _poll_params(instance))
+
+    results = list(runner.run(client, [instance], ['uptime']))
+
+    assert [result.status for result in results] == ['Success']
+
+def test_throttling_slows_down_polling_and_recovers(ssm, runner):
+    client, stubber = ssm
+    instance = _instances(1)[0]
+    stubber.add_response('send_command', {'Command': {'CommandId': COMMAND_ID}})
+    stubber.add_client_error('get_command_invocation', service_error_code='ThrottlingException')
+    stubber.add_response('get_command_invocation', _invocation(instance), _poll_params(instance))
+
+    results = list(runner.run(client, [instance], ['uptime']))
+
+    assert results[0].ok
+    assert runner.throttled == 1
+    # 스로틀링으로 2배가 된 뒤 정상 응답으로 0.9배
+    assert runner.throttle_factor == pytest.approx(1.8)
+
+def test_unfinished_invocation_times_out_after_deadline(runner):
+    instance = _instances(1)[0]
+
+    class NeverFinishes:
+        def send_command(self, **params):
+            return {'Command': {'CommandId': COMMAND_ID}}
+
+        def get_command_invocation(self, **params):
+            return _invocation(instance, 'InProgress', -1)
+
+    results = list(runner.run(NeverFinishes(), [instance], ['sleep 1000'], timeout=30))
+
+    assert [result.status for result in results] == ['TimedOut']
+    assert runner.clock() >= 30 + DEADLINE_GRACE
+
+def test_output_groups_merge_identical_outputs():
+    instances = _instances(4)
+    groups = OutputGroups()
+
+    assert groups.add(CommandResult(instances[0], COMMAND_ID, 'Success', 0, stdout='a')) == (1, True)
+    assert groups.add(CommandResult(instances[1], COMMAND_ID, 'Success', 0, stdout='b')) == (2, True)
+    assert groups.add(CommandResult(instances[2], COMMAND_ID, 'Success', 0, stdout='b')) == (2, False)
+    # 출력이 같아도 종료 코드가 다르면 다른 그룹
+    assert groups.add(CommandResult(instances[3], COMMAND_ID, 'Failed', 1, stdout='b')) == (3, True)
+
+    ordered = list(groups)
+    assert len(groups) == 3
+    # 인스턴스가 많은 그룹부터
+    assert [number for number, _, _ in ordered] == [2, 1, 3]
+    assert [result.instance for result in ordered[0][2]] == instances[1:3]
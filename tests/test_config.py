@@ -0,0 +1,46 @@
+"""
+설정 DB 테스트
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+from bssm import config as config_module
+from bssm.config import Config
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setenv('USERPROFILE', str(tmp_path))
+    return tmp_path
+
+def test_legacy_json_is_migrated_once(home):
+    (home / '.bssm').mkdir()
+    (home / '.bssm' / 'config.json').write_text(json.dumps({
+        'favorites': [{'instance_id': 'i-0123456789abcdef0', 'added_at': '2024-01-01'}],
+        'settings': {'cache_ttl': 60},
+    }))
+
+    config = Config()
+    assert [fav['instance_id'] for fav in config.get_favorites()] == ['i-0123456789abcdef0']
+    assert config.get_setting('cache_ttl') == 60
+    assert (home / '.bssm' / 'config.json.migrated').exists()
+
+    with sqlite3.connect(str(home / '.bssm' / 'config.db')) as conn:
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == config_module.SCHEMA_VERSION
+
+def test_connect_does_not_take_write_lock_once_migrated(home):
+    Config().get_favorites()
+
+    # 다른 프로세스가 쓰기 잠금을 잡고 있어도 새 연결은 기다리지 않고 읽는다
+    writer = sqlite3.connect(str(home / '.bssm' / 'config.db'), isolation_level=None)
+    writer.execute('BEGIN IMMEDIATE')
+    try:
+        config = Config()
+        config._connect().execute('PRAGMA busy_timeout = 0')
+        assert config.get_setting('cache_ttl') == 300
+    finally:
+        writer.execute('ROLLBACK')
+        writer.close()
@@ -0,0 +1,37 @@
+"""
+--where 조회 테스트
+"""
+
+import io
+
+from rich.console import Console
+
+from bssm.cli import _select_where
+from bssm.models import Instance
+from bssm.query import Query
+
+def _instance(index, tags):
+    return Instance(f"i-{index:017x}", f"web-{index}", 'running', 't3.micro', platform='Linux',
+                    region='us-east-1', account='123456789012', tags=tags)
+
+def test_uses_tags():
+    assert Query.parse(['name=web-* AND NOT env=prod']).uses_tags
+    assert Query.parse(['tag:backup']).uses_tags
+    assert not Query.parse(['name=web-* OR (state=running AND NOT region=us-west-2)']).uses_tags
+
+def test_untagged_cache_rows_are_reported_when_they_cannot_be_refreshed():
+    instances = [_instance(0, {'env': 'prod'}), _instance(1, None), _instance(2, {'env': 'dev'})]
+    out = io.StringIO()
+    # agent 목록처럼 다시 조회할 수 없는 목록
+    loader = object()
+
+    selected = _select_where(Query.parse(['env=prod']), loader, [], None, instances,
+                             Console(file=out, width=200))
+
+    assert selected == instances[:1]
+    assert '인스턴스 1개는 tag: 조건에 맞지 않는 것으로' in out.getvalue()
+
+    out = io.StringIO()
+    assert _select_where(Query.parse(['name=web-1']), loader, [], None, instances,
+                         Console(file=out, width=200)) == instances[1:2]
+    assert out.getvalue() == ''
@@ -0,0 +1,28 @@
+"""
+CLI 시작 시간 회귀 검사 (benchmarks/startup.py 와 같은 측정)
+
+금지된 모듈(boto3 등) import 는 그대로 실패로 보고, 시간 예산은 CI 머신의 편차를 고려해
+넉넉하게 둔다 (BSSM_STARTUP_BUDGET_MS 로 변경).
+"""
+
+import importlib.util
+import os
+from pathlib import Path
+
+import pytest
+
+BENCHMARK = Path(__file__).resolve().parent.parent / 'benchmarks' / 'startup.py'
+BUDGET_MS = float(os.environ.get('BSSM_STARTUP_BUDGET_MS', '1000'))
+
+spec = importlib.util.spec_from_file_location('bssm_startup_benchmark', BENCHMARK)
+startup = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(startup)
+
+@pytest.mark.parametrize('command', startup.COMMANDS, ids=' '.join)
+def test_command_starts_without_aws_imports(command, tmp_path):
+    elapsed_ms, modules = startup.measure(command, str(tmp_path))
+
+    assert modules, 'import 시간을 측정하지 못했습니다'
+    forbidden = sorted({module.split('.')[0] for module in modules} & set(startup.FORBIDDEN_MODULES))
+    assert not forbidden, f"bssm {' '.join(command)} 에서 금지된 import: {', '.join(forbidden)}"
+    assert elapsed_ms <= BUDGET_MS, f"bssm {' '.join(command)}: {elapsed_ms:.1f} ms > {BUDGET_MS:.0f} ms"
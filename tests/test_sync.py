@@ -0,0 +1,76 @@
+"""
+증분 동기화 테스트
+
+SSM/EC2 클라이언트를 가짜로 바꾼 SSMManager 로, 지문이 같은 인스턴스의 이름/태그 변경을
+돌아가며 다시 조회해 따라잡는지 확인한다.
+"""
+
+import datetime
+
+from bssm import ssm
+from bssm.cache import InventoryCache
+from bssm.filters import InstanceFilter
+from bssm.models import Instance
+
+class FakeClients:
+    def __init__(self, names):
+        self.names = names  # 인스턴스 ID -> EC2 의 현재 Name 태그
+        self.described = []
+
+    def describe_instance_information(self, Filters, MaxResults, NextToken=None):
+        return {'InstanceInformationList': [
+            {'InstanceId': instance_id, 'PingStatus': 'Online', 'PlatformType': 'Linux'}
+            for instance_id in self.names
+        ]}
+
+    def describe_instances(self, InstanceIds, Filters):
+        self.described.extend(InstanceIds)
+        return {'Reservations': [{'Instances': [
+            {'InstanceId': instance_id, 'State': {'Name': 'running'}, 'InstanceType': 't3.micro',
+             'LaunchTime': datetime.datetime(2024, 1, 1),
+             'Tags': [{'Key': 'Name', 'Value': self.names[instance_id]}]}
+            for instance_id in InstanceIds
+        ]}]}
+
+def _manager(clients, filters=None):
+    manager = ssm.SSMManager.__new__(ssm.SSMManager)
+    manager.ssm_client = manager.ec2_client = clients
+    manager.filters = filters or InstanceFilter({})
+    manager.region = 'us-east-1'
+    return manager
+
+def test_renamed_instances_are_picked_up_within_revalidate_slices():
+    ids = [f"i-{index:017x}" for index in range(60)]
+    clients = FakeClients({instance_id: f"new-{instance_id}" for instance_id in ids})
+    fingerprints = {instance_id: ssm.ssm_fingerprint({'PlatformType': 'Linux'}) for instance_id in ids}
+    rows = [Instance(instance_id, f"old-{instance_id}", 'running', 't3.micro', tags={'Name': 'old'})
+            for instance_id in ids]
+
+    for sync_round in range(1, ssm.REVALIDATE_SLICES + 1):
+        manager = _manager(clients)
+        rows = list(manager.iter_sync(rows, fingerprints, max_workers=1, sync_round=sync_round))
+        assert manager.sync_stats['described'] < len(ids)
+
+    # 회차마다 일부만 다시 조회하지만, 한 바퀴 돌면 모든 인스턴스의 이름이 바뀌어 있다
+    assert sorted(clients.described) == sorted(ids)
+    assert all(row.name == f"new-{row.instance_id}" for row in rows)
+
+def test_excluded_instances_are_revalidated_with_ec2_only_filters():
+    clients = FakeClients({'i-00000000000000001': 'web-1'})
+    fingerprints = {'i-00000000000000001': ssm.ssm_fingerprint({'PlatformType': 'Linux'})}
+    filters = InstanceFilter.parse(['name=web*'])
+
+    # 지난번에는 이름이 맞지 않아 제외된 인스턴스 (행 없이 지문만 있음)
+    found = []
+    for sync_round in range(1, ssm.REVALIDATE_SLICES + 1):
+        manager = _manager(clients, filters)
+        found += [row.name for row in manager.iter_sync([], fingerprints, max_workers=1, sync_round=sync_round)]
+    assert found == ['web-1']
+
+def test_incremental_save_keeps_full_sync_time(tmp_path):
+    cache = InventoryCache(cache_dir=tmp_path)
+    cache.save('default', '123456789012', 'us-east-1', [], full_synced_at=1.0, sync_round=3)
+    entry = cache.load('default', '123456789012', 'us-east-1')
+
+    assert entry['sync_round'] == 3
+    assert cache.age(entry) < 60 < cache.full_sync_age(entry)
@@ -0,0 +1,181 @@
+"""
+bssm cp 전송 테스트
+
+가짜 SSM 클라이언트가 원격 스크립트를 인스턴스마다 다른 디렉토리에서 bash 로 실행한다.
+원격 경로는 모두 REMOTE_ROOT 아래에 두고, 인스턴스별 디렉토리로 바꿔서 실행한다.
+"""
+
+import itertools
+import os
+import shutil
+import subprocess
+import uuid
+
+import pytest
+from botocore.exceptions import ClientError
+
+from bssm import transfer
+from bssm.command import CommandRunner
+from bssm.models import Instance
+
+REMOTE_ROOT = '/bssm-test-root'
+
+pytestmark = pytest.mark.skipif(shutil.which('bash') is None, reason='bash 가 필요합니다')
+
+class FakeSSM:
+    """send_command 를 받으면 바로 실행하고 get_command_invocation 으로 결과를 돌려준다
+
+    dead 에 있는 인스턴스는 호출이 등록되지 않은 것처럼 응답한다 (에이전트가 죽은 경우).
+    """
+
+    def __init__(self, root, dead=()):
+        self.root = root
+        self.dead = set(dead)
+        self.results = {}
+        self.sent = []  # (인스턴스 ID 목록, 주석)
+
+    def send_command(self, InstanceIds, Parameters, Comment='', **params):
+        command_id = str(uuid.uuid4())
+        self.sent.append((InstanceIds, Comment))
+        script = Parameters['commands'][0]
+        for instance_id in InstanceIds:
+            if instance_id in self.dead:
+                continue
+            host = self.root / instance_id
+            host.mkdir(parents=True, exist_ok=True)
+            process = subprocess.run(
+                ['bash', '-c', script.replace(REMOTE_ROOT, str(host))], capture_output=True, text=True
+            )
+            self.results[(command_id, instance_id)] = {
+                'Status': 'Success' if process.returncode == 0 else 'Failed',
+                'ResponseCode': process.returncode,
+                'StandardOutputContent': process.stdout[:24000],
+                'StandardErrorContent': process.stderr,
+            }
+        return {'Command': {'CommandId': command_id}}
+
+    def get_command_invocation(self, CommandId, InstanceId):
+        result = self.results.get((CommandId, InstanceId))
+        if result is None:
+            raise ClientError({'Error': {'Code': 'InvocationDoesNotExist'}}, 'GetCommandInvocation')
+        return result
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(transfer, 'STATE_DIR', tmp_path / 'state')
+    monkeypatch.setattr(transfer, 'REMOTE_DIR', f"{REMOTE_ROOT}/tmp/bssm-cp")
+
+def _instances(count):
+    return [Instance(f"i-{index:017x}", f"web-{index}", 'running', 't3.micro', platform='Linux',
+                     region='us-east-1', account='123456789012') for index in range(count)]
+
+def _engine(client, clock, **kwargs):
+    engine = transfer.TransferEngine(lambda instance: client, clock=clock, **kwargs)
+    engine.runner = CommandRunner(max_workers=4, sleep=clock.sleep, clock=clock)
+    return engine
+
+def _source(tmp_path, size=100_000):
+    source = tmp_path / 'app.bin'
+    # 압축해도 여러 조각이 되도록 무작위 바이트 포함
+    source.write_bytes(os.urandom(size // 2) + b'a' * (size // 2))
+    return source
+
+def test_push_then_pull_roundtrip(tmp_path, clock):
+    instances = _instances(3)
+    client = FakeSSM(tmp_path / 'hosts')
+    source = _source(tmp_path)
+
+    push = transfer.PushTransfer(source, f"{REMOTE_ROOT}/app.bin")
+    assert push.chunks > 1
+    jobs = push.jobs(instances)
+    _engine(client, clock, on_checkpoint=lambda: push.save(jobs)).run(jobs)
+    assert [(job.complete, job.error) for job in jobs] == [(True, None)] * 3
+    for instance in instances:
+        assert (tmp_path / 'hosts' / instance.instance_id / 'app.bin').read_bytes() == source.read_bytes()
+
+    pull = transfer.PullTransfer(f"{REMOTE_ROOT}/app.bin", tmp_path / 'pulled')
+    jobs = pull.jobs(instances)
+    _engine(client, clock).run(jobs)
+    assert [(job.complete, job.error) for job in jobs] == [(True, None)] * 3
+    for job in jobs:
+        assert job.path.read_bytes() == source.read_bytes()
+
+    # 원격 파일이 그대로면 다시 받지 않는다
+    jobs = pull.jobs(instances)
+    _engine(client, clock).run(jobs)
+    assert all(job.unchanged for job in jobs)
+
+def test_unreachable_instance_does_not_stall_others(tmp_path, clock):
+    instances = _instances(3)
+    dead = instances[0].instance_id
+    client = FakeSSM(tmp_path / 'hosts', dead={dead})
+    push = transfer.PushTransfer(_source(tmp_path), f"{REMOTE_ROOT}/app.bin")
+    jobs = push.jobs(instances)
+    finished = []
+
+    _engine(client, clock, window=2, on_progress=lambda job: job.finished and finished.append(job)).run(jobs)
+
+    assert jobs[0].error is not None and not jobs[0].complete
+    assert all(job.complete for job in jobs[1:])
+    # 살아 있는 인스턴스는 응답하지 않는 인스턴스를 기다리지 않고 먼저 끝난다
+    assert [*dict.fromkeys(finished)][-1] is jobs[0]
+    # 첫 전송 이후에는 살아 있는 인스턴스의 다음 조각이 응답하지 않는 인스턴스와 따로 나간다
+    later = list(itertools.islice(client.sent, 1, None))
+    assert any(dead not in instance_ids for instance_ids, _ in later)
+
+def test_unexpected_prepare_output_fails_only_that_instance(tmp_path, clock):
+    instances = _instances(2)
+    client = FakeSSM(tmp_path / 'hosts')
+    (tmp_path / 'hosts' / instances[1].instance_id).mkdir(parents=True)
+    (tmp_path / 'hosts' / instances[1].instance_id / 'app.log').write_text('log line\n' * 1000)
+    # 첫 번째 인스턴스는 파일 대신 쉘 배너만 출력하는 것처럼 만든다
+    original = client.send_command
+
+    def send_command(InstanceIds, Parameters, **params):
+        response = original(InstanceIds, Parameters, **params)
+        key = (response['Command']['CommandId'], instances[0].instance_id)
+        if key in client.results and params.get('Comment') == 'bssm cp prepare':
+            client.results[key] = dict(client.results[key], Status='Success', ResponseCode=0,
+                                       StandardOutputContent='Welcome to host\n')
+        return response
+
+    client.send_command = send_command
+    jobs = transfer.PullTransfer(f"{REMOTE_ROOT}/app.log", tmp_path / 'pulled').jobs(instances)
+
+    _engine(client, clock).run(jobs)
+
+    assert '원격 파일 정보를 읽을 수 없습니다' in jobs[0].error
+    assert jobs[1].complete and jobs[1].error is None
+
+def test_pull_after_failed_cleanup_gets_the_changed_file(tmp_path, clock):
+    instances = _instances(1)
+    client = FakeSSM(tmp_path / 'hosts')
+    remote = tmp_path / 'hosts' / instances[0].instance_id / 'app.log'
+    remote.parent.mkdir(parents=True)
+    remote.write_text('first\n' * 1000)
+    original = client.send_command
+
+    def send_command(InstanceIds, Parameters, **params):
+        if params.get('Comment') == 'bssm cp cleanup':
+            # 정리 명령이 실패해서 원격 스냅샷이 남은 경우
+            command_id = str(uuid.uuid4())
+            for instance_id in InstanceIds:
+                client.results[(command_id, instance_id)] = {
+                    'Status': 'Failed', 'ResponseCode': 1,
+                    'StandardOutputContent': '', 'StandardErrorContent': 'rm: Permission denied',
+                }
+            return {'Command': {'CommandId': command_id}}
+        return original(InstanceIds, Parameters, **params)
+
+    client.send_command = send_command
+    pull = transfer.PullTransfer(f"{REMOTE_ROOT}/app.log", tmp_path / 'pulled')
+    jobs = pull.jobs(instances)
+    _engine(client, clock).run(jobs)
+    assert jobs[0].complete and jobs[0].cleanup_error == 'rm: Permission denied'
+
+    remote.write_text('second\n' * 1000)
+    jobs = pull.jobs(instances)
+    _engine(client, clock).run(jobs)
+
+    assert jobs[0].complete and not jobs[0].unchanged
+    assert jobs[0].path.read_text() == 'second\n' * 1000
@@ -0,0 +1,79 @@
+"""
+bssm tunnel 감독 프로세스 테스트
+
+감독 프로세스 본체(supervise)를 현재 프로세스에서 실행하고, 세션 생성(_ssm_manager)만
+가짜로 바꾼다.
+"""
+
+import os
+
+import pytest
+from botocore.exceptions import ClientError
+
+from bssm import tunnel
+
+def test_expired_credentials_mark_tunnel_failed_and_are_resolved_again(tmp_path, monkeypatch):
+    monkeypatch.setattr(tunnel.Path, 'home', lambda: tmp_path)
+    monkeypatch.setattr(tunnel.signal, 'signal', lambda *args: None)
+    monkeypatch.setattr(tunnel, 'RESTART_BACKOFF', 0.01)
+    manager = tunnel.TunnelManager()
+    key = tunnel.tunnel_key('i-0123456789abcdef0', 5432)
+    manager._update(lambda data: data.update({key: {
+        'key': key, 'pid': os.getpid(), 'status': 'starting', 'restarts': 0,
+        'source_profile': 'base', 'role_arn': 'arn:aws:iam::123456789012:role/Ops',
+    }}))
+    seen = []
+
+    def _ssm_manager(entry):
+        seen.append(entry)
+        if len(seen) == 1:
+            raise ClientError({'Error': {'Code': 'ExpiredToken'}}, 'AssumeRole')
+        # 두 번째 재시작에서 항목을 지워 감독 프로세스를 끝낸다
+        manager._update(lambda data: data.pop(key))
+        raise OSError('stop')
+
+    monkeypatch.setattr(tunnel, '_ssm_manager', _ssm_manager)
+
+    tunnel.supervise(key)
+
+    # 재시작할 때마다 자격증명을 다시 받고, 그 사이에는 failed 로 표시된다
+    assert len(seen) == 2
+    assert seen[1]['status'] == 'failed'
+    assert 'ExpiredToken' in seen[1]['error']
+    assert seen[1]['restarts'] == 1
+
+def test_live_tunnel_is_reused_only_for_the_same_local_port(tmp_path):
+    manager = tunnel.TunnelManager(tmp_path)
+    key = tunnel.tunnel_key('i-0123456789abcdef0', 3306)
+    manager._update(lambda data: data.update({key: {
+        'key': key, 'instance_id': 'i-0123456789abcdef0', 'local_port': 3306, 'remote_port': 3306,
+        'pid': os.getpid(), 'status': 'running',
+    }}))
+
+    def request_fn(port):
+        raise AssertionError('새 터널을 시작하면 안 됩니다')
+
+    assert manager.up('i-0123456789abcdef0', 3306, request_fn)[1]
+    assert manager.up('i-0123456789abcdef0', 3306, request_fn, local_port=3306)[1]
+    with pytest.raises(ValueError, match='localhost:3306'):
+        manager.up('i-0123456789abcdef0', 3306, request_fn, local_port=13306)
+
+def test_frozen_build_spawns_supervisor_through_cli(tmp_path, monkeypatch):
+    from click.testing import CliRunner
+    from bssm.cli import cli
+
+    spawned = []
+
+    class Process:
+        def __init__(self, command, **kwargs):
+            spawned.append(command)
+            self.pid = 1234
+
+    monkeypatch.setattr(tunnel.sys, 'frozen', True, raising=False)
+    monkeypatch.setattr(tunnel.subprocess, 'Popen', Process)
+
+    assert tunnel.TunnelManager(tmp_path)._spawn('i-0123456789abcdef0:22', None) == 1234
+    assert spawned == [[tunnel.sys.executable, 'tunnel', '_supervise', 'i-0123456789abcdef0:22']]
+    # 숨은 명령이지만 실행 파일의 CLI 로 실행할 수 있어야 한다
+    assert CliRunner().invoke(cli, ['tunnel', '_supervise', '--help']).exit_code == 0
+    assert '_supervise' not in CliRunner().invoke(cli, ['tunnel', '--help']).output